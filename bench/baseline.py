@@ -0,0 +1,63 @@
+"""
+Gespeicherte Vergleichswerte für die Benchmarks (bench/baseline.json).
+Die Werte hängen von der Maschine ab, deshalb liegt die Datei nicht im
+Repository: einmal mit --save auf dem Zielgerät erzeugen, danach schlägt
+jeder Lauf fehl, der um mehr als die Toleranz schlechter ist.
+"""
+import json
+import sys
+from pathlib import Path
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+ZERO_SLACK = 0.001  # Baseline 0 (z.B. SERVFAIL-Rate): darüber zählt es als Regression
+
+
+def load(path=BASELINE_FILE):
+    try:
+        return json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def save(section, results, path=BASELINE_FILE):
+    """ results: {name: (wert, größer_ist_besser)} """
+    data = load(path)
+    data[section] = {name: value for name, (value, _) in results.items() if value is not None}
+    Path(path).write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+    print(f">>> Baseline gespeichert: {path} [{section}]")
+
+
+def check(section, results, tolerance, path=BASELINE_FILE):
+    """ Vergleicht mit der Baseline. Liefert die Liste der Regressionen. """
+    baseline = load(path).get(section)
+    if not baseline:
+        print(f">>> Keine Baseline für [{section}] - mit --save anlegen.")
+        return []
+    regressions = []
+    for name, (value, higher_is_better) in results.items():
+        base = baseline.get(name)
+        if base is None or value is None:
+            continue
+        if not base:
+            # Relativ lässt sich gegen 0 nicht rechnen: absolut vergleichen
+            if not higher_is_better and value > ZERO_SLACK:
+                regressions.append(f"{name}: {value:,.4f} statt 0")
+            continue
+        change = (value - base) / base
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {value:,.2f} statt {base:,.2f} ({worse:+.0%} schlechter)")
+    return regressions
+
+
+def report(regressions):
+    """ Gibt Regressionen laut aus und beendet mit Exit-Code 1. """
+    if not regressions:
+        print(">>> Keine Regression gegenüber der Baseline.")
+        return
+    print("!" * 60, file=sys.stderr)
+    print("!!! REGRESSION:", file=sys.stderr)
+    for line in regressions:
+        print(f"!!!   {line}", file=sys.stderr)
+    print("!" * 60, file=sys.stderr)
+    sys.exit(1)
@@ -0,0 +1,77 @@
+"""
+Vergleicht den kompakten BlocklistIndex mit dem alten flachen set():
+Speicherbedarf (tracemalloc) und Lookups pro Sekunde.
+
+    python3 bench/blocklist_bench.py                 # synthetisch, 150k Domains
+    python3 bench/blocklist_bench.py -f hosts.txt    # echte Hosts-Datei
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from blocklist import BlocklistIndex  # noqa: E402
+from domains import synthetic_domains  # noqa: E402
+
+
+def hosts_domains(path):
+    domains = []
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if line.startswith("0.0.0.0"):
+                parts = line.split()
+                if len(parts) >= 2:
+                    domains.append(parts[1])
+    return domains
+
+
+def measure(build):
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def lookups_per_sec(check, queries):
+    start = time.perf_counter()
+    for q in queries:
+        check(q)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blocklist-Benchmark: set() vs. BlocklistIndex")
+    parser.add_argument("-f", "--hosts-file", help="Hosts-Datei statt synthetischer Domains")
+    parser.add_argument("-n", "--count", type=int, default=150_000, help="Anzahl synthetischer Domains")
+    parser.add_argument("-q", "--queries", type=int, default=200_000, help="Anzahl Lookups")
+    args = parser.parse_args()
+
+    source = hosts_domains(args.hosts_file) if args.hosts_file else synthetic_domains(args.count)
+    # Strings pro Messung neu erzeugen, damit das set() seine eigenen Objekte besitzt
+    lines = "\n".join(source)
+    del source
+
+    flat, flat_mem = measure(lambda: set(lines.split("\n")))
+    index, index_mem = measure(lambda: BlocklistIndex.from_rules(lines.split("\n")))
+
+    rnd = random.Random(2)
+    blocked = rnd.sample(sorted(flat), min(len(flat), args.queries // 2))
+    queries = blocked + ["www." + d for d in blocked[: len(blocked) // 2]]
+    queries += synthetic_domains(args.queries - len(queries), seed=3)
+    rnd.shuffle(queries)
+
+    flat_qps = lookups_per_sec(flat.__contains__, queries)
+    index_qps = lookups_per_sec(index.is_blocked, queries)
+
+    print(f">>> {len(flat)} Domains, {len(queries)} Lookups")
+    print(f"{'':<18}{'Speicher':>14}{'Lookups/s':>14}")
+    print(f"{'set()':<18}{flat_mem / 1e6:>11.2f} MB{flat_qps:>14,.0f}")
+    print(f"{'BlocklistIndex':<18}{index_mem / 1e6:>11.2f} MB{index_qps:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
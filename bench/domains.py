@@ -0,0 +1,15 @@
+"""
+Synthetische Domains für die Benchmarks, gemeinsam für micro.py und
+blocklist_bench.py - gleicher Seed, gleiche Liste.
+"""
+import random
+import string
+
+
+def synthetic_domains(count, seed=1):
+    """ count zufällige Domains mit 1-3 Labels plus TLD, reproduzierbar über seed. """
+    rnd = random.Random(seed)
+    tlds = ["com", "net", "org", "de", "io"]
+    return [".".join(["".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 12)))
+                      for _ in range(rnd.randint(1, 3))] + [rnd.choice(tlds)])
+            for _ in range(count)]
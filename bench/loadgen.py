@@ -0,0 +1,278 @@
+"""
+Lastgenerator für den DNS-Resolver: spielt einen Anfrage-Mix gegen
+GhostResolver ab und misst QPS, Latenz-Perzentile, SERVFAIL-Rate und RSS.
+
+Resolver und ein Stub-Upstream (mit einstellbarer Latenz und Paketverlust)
+laufen in eigenen Prozessen, damit der Generator ihnen keine CPU wegnimmt.
+
+    python3 bench/loadgen.py                          # Zipf-Mix, 20k Anfragen
+    python3 bench/loadgen.py --latency 20 --loss 0.01 # langsamer, verlustbehafteter Upstream
+    python3 bench/loadgen.py --replay src/history.db  # echte Anfragen aus der Historie
+    python3 bench/loadgen.py --replay domains.txt     # eine Domain pro Zeile, optional "BLOCKED"
+    python3 bench/loadgen.py --target 192.168.1.2:53  # laufende Instanz (ohne Stub, ohne RSS)
+    python3 bench/loadgen.py --save                   # Ergebnis als Baseline speichern
+"""
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import random
+import sqlite3
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+import baseline  # noqa: E402
+
+
+# --- ANFRAGE-MIX ---
+def zipf_mix(count, domains, blocked_ratio, exponent=1.1, seed=1):
+    """ Zipf-verteilte Anfragen über synthetische Domains. Liefert (namen, geblockte). """
+    rnd = random.Random(seed)
+    universe, blocked = [], []
+    for rank in range(domains):
+        if rnd.random() < blocked_ratio:
+            name = f"ads{rank}.tracker{rank % 97}.net"
+            blocked.append(name)
+        else:
+            name = f"www.site{rank}.example.com"
+        universe.append(name)
+    weights = [1 / (rank + 1) ** exponent for rank in range(domains)]
+    return rnd.choices(universe, weights, k=count), blocked
+
+
+def replay_mix(path, count=None):
+    """ Anfragen aus der Query-Historie (SQLite) oder einer Textdatei. """
+    names, blocked = [], set()
+    if str(path).endswith(".db"):
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = db.execute("SELECT d.name, q.status FROM queries q JOIN domains d ON d.id = q.domain_id "
+                              "ORDER BY q.id").fetchall()
+        finally:
+            db.close()
+        for name, status in rows:
+            names.append(name)
+            if status == 1:
+                blocked.add(name)
+    else:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                parts = line.split()
+                if not parts or parts[0].startswith("#"):
+                    continue
+                names.append(parts[0])
+                if len(parts) > 1 and parts[1].upper() == "BLOCKED":
+                    blocked.add(parts[0])
+    if not names:
+        raise SystemExit(f"Keine Anfragen in {path}")
+    if count:
+        names = list(itertools.islice(itertools.cycle(names), count))
+    return names, sorted(blocked)
+
+
+def encode_question(name, qtype=1):
+    labels = [label.encode() for label in name.strip(".").split(".") if label]
+    return b"".join(bytes([len(label)]) + label for label in labels) + b"\x00" + struct.pack("!HH", qtype, 1)
+
+
+# --- STUB-UPSTREAM ---
+class _StubUpstream(asyncio.DatagramProtocol):
+    def __init__(self, latency, loss, ttl, seed):
+        self.latency = latency
+        self.loss = loss
+        self.answer = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, ttl, 4) + bytes([10, 0, 0, 1])
+        self.random = random.Random(seed)
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12 or self.random.random() < self.loss:
+            return
+        reply = data[:2] + struct.pack("!HHHHH", 0x8180, 1, 1, 0, 0) + data[12:] + self.answer
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+
+def run_stub(port, latency, loss, ttl, ready):
+    async def main():
+        await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _StubUpstream(latency, loss, ttl, os.getpid()), local_addr=("127.0.0.1", port))
+        ready.set()
+        await asyncio.Event().wait()
+    asyncio.run(main())
+
+
+# --- RESOLVER ---
+def run_resolver(port, upstream_port, blocked, timeout, ready):
+    sys.stdout = open(os.devnull, "w")   # [BLOCK]-Ausgaben nicht ins Ergebnis mischen
+    import main
+    from blocklist import BlocklistIndex
+    from frontend import start_frontend
+    from upstream import UpstreamPool
+    main.blocklist = BlocklistIndex.from_rules(blocked)
+    main.upstream_pool = UpstreamPool([("127.0.0.1", upstream_port)], timeout)
+    start_frontend(main.GhostResolver(), "127.0.0.1", port, main.upstream_pool, main.UPSTREAM_CONCURRENCY)
+    ready.set()
+    while True:
+        time.sleep(3600)
+
+
+def rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+# --- LASTGENERATOR ---
+class _Client(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.pending = {}  # txid (bytes) -> Future
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        future = self.pending.pop(data[:2], None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+
+async def generate(target, names, concurrency, timeout):
+    """ Hält concurrency Anfragen gleichzeitig offen (geschlossene Schleife). """
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(_Client, remote_addr=target)
+    questions = {name: encode_question(name) for name in set(names)}
+    counter = itertools.count()
+    latencies, rcodes = [], {}
+    timeouts = 0
+
+    async def worker():
+        nonlocal timeouts
+        while (i := next(counter)) < len(names):
+            txid = struct.pack("!H", i & 0xFFFF)
+            future = loop.create_future()
+            client.pending[txid] = future
+            started = time.perf_counter()
+            transport.sendto(txid + b"\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00" + questions[names[i]])
+            try:
+                reply = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                client.pending.pop(txid, None)
+                timeouts += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            rcode = reply[3] & 0x0F
+            rcodes[rcode] = rcodes.get(rcode, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(names)))))
+    elapsed = time.perf_counter() - started
+    transport.close()
+    return latencies, rcodes, timeouts, elapsed
+
+
+def pct(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(len(sorted_values) * p), len(sorted_values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DNS-Lasttest gegen GhostResolver")
+    parser.add_argument("--replay", help="Query-Historie (.db) oder Textdatei statt Zipf-Mix")
+    parser.add_argument("-n", "--queries", type=int, default=20_000, help="Anzahl Anfragen")
+    parser.add_argument("-c", "--concurrency", type=int, default=64, help="Gleichzeitig offene Anfragen")
+    parser.add_argument("--domains", type=int, default=10_000, help="Verschiedene Domains im Zipf-Mix")
+    parser.add_argument("--blocked", type=float, default=0.2, help="Anteil geblockter Domains im Zipf-Mix")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf-Exponent")
+    parser.add_argument("--latency", type=float, default=5.0, help="Latenz des Stub-Upstreams in ms")
+    parser.add_argument("--loss", type=float, default=0.0, help="Paketverlust des Stub-Upstreams (0..1)")
+    parser.add_argument("--ttl", type=int, default=300, help="TTL der Stub-Antworten")
+    parser.add_argument("--upstream-timeout", type=float, default=1.0, help="Upstream-Timeout des Resolvers (s)")
+    parser.add_argument("--timeout", type=float, default=3.0, help="Timeout des Lastgenerators (s)")
+    parser.add_argument("--port", type=int, default=5390, help="Port für den Resolver, Stub nutzt Port+1")
+    parser.add_argument("--target", help="Laufende Instanz host:port statt eigenem Resolver")
+    parser.add_argument("--save", action="store_true", help="Ergebnis als Baseline speichern")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte Verschlechterung (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    if args.replay:
+        names, blocked = replay_mix(args.replay, args.queries)
+    else:
+        names, blocked = zipf_mix(args.queries, args.domains, args.blocked, args.zipf)
+
+    processes = []
+    resolver_pid = None
+    if args.target:
+        host, _, port = args.target.rpartition(":")
+        target = (host or args.target, int(port) if host else 53)
+    else:
+        ctx = multiprocessing.get_context("fork")
+        target = ("127.0.0.1", args.port)
+        for run, run_args in ((run_stub, (args.port + 1, args.latency / 1000, args.loss, args.ttl)),
+                              (run_resolver, (args.port, args.port + 1, blocked, args.upstream_timeout))):
+            ready = ctx.Event()
+            process = ctx.Process(target=run, args=run_args + (ready,), daemon=True)
+            process.start()
+            processes.append(process)
+            if not ready.wait(30):
+                raise SystemExit("Resolver/Stub startet nicht")
+        resolver_pid = processes[-1].pid
+        print(f">>> Stub-Upstream: {args.latency:g} ms Latenz, {args.loss:.1%} Verlust")
+
+    rss_before = rss_bytes(resolver_pid) if resolver_pid else None
+    try:
+        latencies, rcodes, timeouts, elapsed = asyncio.run(
+            generate(target, names, args.concurrency, args.timeout))
+        rss_after = rss_bytes(resolver_pid) if resolver_pid else None
+    finally:
+        for process in processes:
+            process.terminate()
+
+    latencies.sort()
+    answered = len(latencies)
+    servfail = rcodes.get(2, 0)
+    print(f">>> {len(names)} Anfragen ({len(set(names))} verschiedene, {len(blocked)} Domains geblockt), "
+          f"{args.concurrency} parallel")
+    print(f"{'QPS':<18}{answered / elapsed:>14,.0f}")
+    for label, p in (("p50", 0.5), ("p99", 0.99), ("p999", 0.999)):
+        value = pct(latencies, p)
+        print(f"{label + ' Latenz':<18}{value * 1000 if value is not None else float('nan'):>11.2f} ms")
+    print(f"{'SERVFAIL':<18}{servfail / max(answered, 1):>13.2%}")
+    print(f"{'Ohne Antwort':<18}{timeouts / len(names):>13.2%}")
+    if rss_after is not None:
+        print(f"{'RSS':<18}{rss_after / 1e6:>11.1f} MB  (vorher {rss_before / 1e6:.1f} MB)")
+
+    results = {
+        "qps": (answered / elapsed, True),
+        "p50_ms": (pct(latencies, 0.5) * 1000 if latencies else None, False),
+        "p99_ms": (pct(latencies, 0.99) * 1000 if latencies else None, False),
+        "p999_ms": (pct(latencies, 0.999) * 1000 if latencies else None, False),
+        "servfail_rate": (servfail / max(answered, 1), False),
+    }
+    # Baseline je Konfiguration, sonst vergleicht man Äpfel mit Birnen
+    mix = f"replay={Path(args.replay).name}" if args.replay else f"zipf={args.zipf:g}"
+    setup = f"target={args.target}" if args.target else f"latency={args.latency:g}ms loss={args.loss:g}"
+    section = f"load {mix} n={args.queries} c={args.concurrency} {setup}"
+    if args.save:
+        baseline.save(section, results)
+    else:
+        baseline.report(baseline.check(section, results, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Micro-Benchmarks für die heißen Pfade: Blocklist-Lookup, Parsen der
+Blocklisten (load_gravity), /api/stats und die Resolver-Schritte für
+geblockte bzw. gecachte Anfragen. Jede Messung läuft mehrmals, gewertet
+wird der beste Lauf.
+
+    python3 bench/micro.py           # messen und mit bench/baseline.json vergleichen
+    python3 bench/micro.py --save    # aktuelle Werte als Baseline speichern
+    python3 bench/micro.py -k lookup # nur Benchmarks, deren Name "lookup" enthält
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+import baseline  # noqa: E402
+from domains import synthetic_domains  # noqa: E402
+
+
+def question_packet(name, txid=0x1234):
+    labels = b"".join(bytes([len(label)]) + label.encode() for label in name.split("."))
+    return struct.pack("!HHHHHH", txid, 0x0100, 1, 0, 0, 0) + labels + b"\x00\x00\x01\x00\x01"
+
+
+def best_of(run, repeat):
+    """ Führt run() repeat-mal aus; run liefert (anzahl, sekunden). Ergebnis in µs pro Vorgang. """
+    best = None
+    for _ in range(repeat):
+        ops, seconds = run()
+        per_op = seconds / ops * 1e6
+        best = per_op if best is None else min(best, per_op)
+    return best
+
+
+def timed(func, ops):
+    started = time.perf_counter()
+    for _ in range(ops):
+        func()
+    return ops, time.perf_counter() - started
+
+
+# --- BENCHMARKS ---
+def bench_blocklist_lookup(repeat):
+    from blocklist import BlocklistIndex
+    domains = synthetic_domains(100_000)
+    index = BlocklistIndex.from_rules(domains)
+    queries = domains[:25_000] + ["www." + d for d in domains[:25_000]] + synthetic_domains(50_000, seed=2)
+    random.Random(3).shuffle(queries)
+
+    def run():
+        started = time.perf_counter()
+        for q in queries:
+            index.is_blocked(q)
+        return len(queries), time.perf_counter() - started
+    return best_of(run, repeat)
+
+
+def bench_gravity_parse(repeat):
+    from gravity import Gravity
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hosts")
+        with open(path, "w") as f:
+            f.write("# Hosts-Datei\n127.0.0.1 localhost\n")
+            for domain in synthetic_domains(100_000):
+                f.write(f"0.0.0.0 {domain}\n")
+
+        def run():
+            started = time.perf_counter()
+            gravity = Gravity([path])
+            gravity.refresh()
+            gravity.build()
+            return 100_000, time.perf_counter() - started
+        return best_of(run, repeat)
+
+
+def _main_module():
+    sys.stdout, stdout = open(os.devnull, "w"), sys.stdout   # [BLOCK]-Ausgaben unterdrücken
+    try:
+        import main
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return main
+
+
+def bench_api_stats(repeat):
+    main = _main_module()
+    rnd = random.Random(4)
+    domains = synthetic_domains(500)
+    for i in range(main.LOG_RING_SIZE):
+        main.query_log.append(time.time(), f"192.168.1.{i % 50}", rnd.choice(domains),
+                              "BLOCKED" if i % 5 == 0 else "ALLOWED")
+    client = main.app.test_client()
+    return best_of(lambda: timed(lambda: client.get("/api/stats").data, 500), repeat)
+
+
+def _resolver_step(packet, repeat):
+    main = _main_module()
+    resolver = main.GhostResolver()
+
+    def step():
+        resolver.finish(resolver.begin(packet, "192.168.1.10"))
+    sys.stdout, stdout = open(os.devnull, "w"), sys.stdout
+    try:
+        return best_of(lambda: timed(step, 20_000), repeat)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def bench_resolve_blocked(repeat):
+    from blocklist import BlocklistIndex
+    main = _main_module()
+    main.blocklist = BlocklistIndex.from_rules(["ads.example.com"])
+    return _resolver_step(question_packet("tracker.ads.example.com"), repeat)
+
+
+def bench_resolve_cached(repeat):
+    from wire import parse_question
+    main = _main_module()
+    packet = question_packet("www.example.org")
+    question = parse_question(packet)
+    answer = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 3600, 4) + bytes([10, 0, 0, 1])
+    reply = struct.pack("!HHHHHH", 0x1234, 0x8180, 1, 1, 0, 0) + packet[12:] + answer
+    main.dns_cache.put(packet, question, reply)
+    return _resolver_step(packet, repeat)
+
+
+BENCHMARKS = {
+    "blocklist_lookup_us": bench_blocklist_lookup,
+    "gravity_parse_us_per_line": bench_gravity_parse,
+    "api_stats_us": bench_api_stats,
+    "resolve_blocked_us": bench_resolve_blocked,
+    "resolve_cached_us": bench_resolve_cached,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-Benchmarks mit Baseline-Vergleich")
+    parser.add_argument("-k", "--filter", default="", help="Nur Benchmarks, deren Name dies enthält")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Wiederholungen pro Benchmark")
+    parser.add_argument("--save", action="store_true", help="Ergebnis als Baseline speichern")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte Verschlechterung (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    known = baseline.load().get("micro", {})
+    results = {}
+    print(f"{'':<28}{'µs':>12}{'Baseline':>12}")
+    for name, bench in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        value = bench(args.repeat)
+        results[name] = (value, False)
+        base = known.get(name)
+        print(f"{name:<28}{value:>12.3f}{base if base is not None else float('nan'):>12.3f}")
+
+    if args.save:
+        # Nur die gemessenen Werte ersetzen, der Rest der Baseline bleibt
+        merged = {name: (value, False) for name, value in known.items()}
+        merged.update(results)
+        baseline.save("micro", merged)
+    else:
+        baseline.report(baseline.check("micro", results, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
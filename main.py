@@ -21,15 +21,55 @@ Auf dieser Annahme basierend habe ich den Code von Grund auf neu geschrieben, um
 Hier ist der komplette, überarbeitete und verbesserte Code:
 
 
+import os
+import re
+import sys
+import glob
+import json
+import time
+import zlib
+import errno
+import sqlite3
+import tempfile
+import threading
 import shutil
+import hashlib
+import functools
 import logging
 import argparse
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import fcntl  # Nur für Reflinks (FICLONE) unter Linux
+except ImportError:
+    fcntl = None
 
 # --- Konfiguration ---
 BACKUP_BASE_DIR_NAME = ".ghostshield_backups" # Verstecktes Verzeichnis für Backups
 LOG_FILE_NAME = "ghostshield.log"
+CHUNK_STORE_DIR_NAME = ".ghostshield_store"   # Chunk-Speicher innerhalb des Backup-Verzeichnisses
+MANIFEST_SUFFIX = ".manifest"                 # Jede Backup-Version ist ein kleines Manifest (JSON)
+INDEX_FILE_NAME = ".ghostshield_index.db"     # Index aller Elemente und Versionen (SQLite)
+RACY_MARGIN_NS = 2_000_000_000                # mtime so knapp vor dem letzten Scan: immer neu hashen
+INODES_SUFFIX = ".inodes"                     # Neben dem Manifest: Inodes der zuletzt wiederhergestellten Dateien
+VERSION_NAME_PATTERN = re.compile(r"^\d{8}_\d{6}(_\d{2})?$") # Zeitstempel einer Backup-Version (_NN: mehrere pro Sekunde)
+# Content-Defined Chunking: Dateien bis CDC_MIN_SIZE sind ein einziger Chunk,
+# größere werden an inhaltsabhängigen Stellen geschnitten (Ø ca. 1 MiB)
+CDC_MIN_SIZE = 256 * 1024
+CDC_MAX_SIZE = 4 * 1024 * 1024
+CDC_ANCHOR = b"\n"      # Schnitt-Kandidaten: hinter diesem Byte ...
+CDC_WINDOW = 48         # ... wenn die CRC32 der letzten CDC_WINDOW Bytes
+CDC_MASK = (1 << 12) - 1 # ... auf diese Bits 0 ist
+# Kopier-Engine: viele kleine Dateien sind durch Syscall-Latenz begrenzt, daher parallel
+COPY_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+COPY_BLOCK_SIZE = 8 * 1024 * 1024
+PROGRESS_INTERVAL = 2.0  # Sekunden zwischen zwei Fortschrittsmeldungen
+FICLONE = 0x40049409     # ioctl für Reflinks (Copy-on-Write, z.B. btrfs, XFS)
+# Batch-Betrieb: so viele Elemente werden gleichzeitig bearbeitet
+BATCH_JOBS = 4
+JOURNAL_FILE_NAME = ".ghostshield_journal"    # Write-Ahead-Journal des laufenden Batches (JSON-Zeilen)
 
 # --- Logger Setup ---
 log_format = '%(asctime)s - %(levelname)s - %(message)s'
@@ -46,17 +86,566 @@ def confirm_action(prompt: str) -> bool:
     response = input(f"{prompt} (j/n): ").lower().strip()
     return response == 'j'
 
+def expand_paths(patterns: list[str], list_file: str | None = None) -> list[str]:
+    """
+    Macht aus Pfaden, Glob-Mustern (auch '**') und einer Listendatei (ein Pfad
+    pro Zeile, '-' für stdin, '#' für Kommentare) eine Liste ohne Doppelte.
+    Muster ohne Treffer werden gemeldet; einfache Pfade bleiben unverändert,
+    denn unshield darf auch Pfade nennen, die gerade nicht existieren.
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                logger.warning(f"Warnung: Das Muster '{pattern}' passt auf kein Element.")
+            paths += matches
+        else:
+            paths.append(pattern)
+    if list_file is not None:
+        text = sys.stdin.read() if list_file == '-' else Path(list_file).read_text(encoding='utf-8')
+        paths += [line.strip() for line in text.splitlines() if line.strip() and not line.lstrip().startswith('#')]
+    return list(dict.fromkeys(paths))
+
+class Progress:
+    """ Zählt erledigte Dateien/Bytes und meldet regelmäßig Fortschritt und Durchsatz. """
+    def __init__(self, label: str, total_files: int, total_bytes: int):
+        self.label = label
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.files = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._lock = threading.Lock()
+
+    def add(self, nbytes: int = 0, files: int = 1):
+        with self._lock:
+            self.files += files
+            self.bytes += nbytes
+            now = time.monotonic()
+            if now - self._last_report < PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+        self._report(now)
+
+    def _report(self, now: float, final: bool = False):
+        elapsed = max(now - self.started, 1e-9)
+        state = "fertig" if final else "läuft"
+        total = f"/{self.total_bytes / 1e6:.1f}" if self.total_bytes else ""
+        logger.info(
+            f"{self.label} {state}: {self.files}/{self.total_files} Dateien, "
+            f"{self.bytes / 1e6:.1f}{total} MB in {elapsed:.1f} s "
+            f"({self.files / elapsed:.0f} Dateien/s, {self.bytes / 1e6 / elapsed:.1f} MB/s)"
+        )
+
+    def finish(self):
+        self._report(time.monotonic(), final=True)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # läuft, gehört nur jemand anderem
+    return True
+
+class CopyEngine:
+    """
+    Parallele Dateioperationen: der Baum wird mit os.scandir gelesen, ein
+    Thread-Pool kopiert bzw. löscht dann je Verzeichnis alle Dateien (große
+    Arbeitspakete, wenig Verwaltungsaufwand pro Datei). Kopiert wird möglichst
+    ohne Umweg über Python: Reflink (FICLONE, teilt die Blöcke), sonst
+    copy_file_range bzw. sendfile im Kernel, erst zuletzt read/write.
+    Gelöscht wird durch Umbenennen in einen Papierkorb auf demselben
+    Dateisystem (sofort frei) und anschließendes paralleles Löschen.
+    """
+    def __init__(self, trash_dir: Path | None = None, workers: int = COPY_WORKERS):
+        self.trash_dir = trash_dir
+        self.workers = workers
+        self.reflink = fcntl is not None
+        self.copy_file_range = hasattr(os, "copy_file_range")
+        self.sendfile = hasattr(os, "sendfile")
+
+    def scan(self, root: Path) -> list[tuple]:
+        """ (relativer_pfad, art, stat) aller Einträge unter root, Verzeichnisse vor ihrem Inhalt. """
+        entries = []
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            with os.scandir(root / relative if relative else root) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    rel = f"{relative}/{entry.name}" if relative else entry.name
+                    if entry.is_symlink():
+                        kind = "symlink"
+                    elif entry.is_dir(follow_symlinks=False):
+                        kind = "dir"
+                        stack.append(rel)
+                    elif entry.is_file(follow_symlinks=False):
+                        kind = "file"
+                    else:
+                        logger.warning(f"Überspringe Sonderdatei '{entry.path}'.")
+                        continue
+                    entries.append((rel, kind, entry.stat(follow_symlinks=False)))
+        return entries
+
+    def clone(self, in_fd: int, out_fd: int) -> bool:
+        """ Reflink der ganzen Datei; False, wenn das Dateisystem das nicht kann. """
+        if not self.reflink:
+            return False
+        try:
+            fcntl.ioctl(out_fd, FICLONE, in_fd)
+            return True
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS, errno.EXDEV):
+                self.reflink = False   # Dateisystem kann es nicht, nicht weiter versuchen
+            return False
+
+    def copy_data(self, in_fd: int, out_fd: int, size: int | None = None):
+        """
+        Kopiert ab der aktuellen Position von in_fd an die von out_fd. Mit bekannter
+        Größe endet die Schleife ohne den letzten Leerlauf-Aufruf (kleine Dateien: ein Syscall).
+        """
+        left = size if size is not None else float('inf')
+        if self.copy_file_range:
+            try:
+                while left > 0 and (copied := os.copy_file_range(in_fd, out_fd, int(min(left, COPY_BLOCK_SIZE)))):
+                    left -= copied
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM):
+                    raise
+                self.copy_file_range = False
+        if self.sendfile:
+            try:
+                offset = os.lseek(in_fd, 0, os.SEEK_CUR)
+                while left > 0 and (sent := os.sendfile(out_fd, in_fd, offset, int(min(left, COPY_BLOCK_SIZE)))):
+                    offset += sent
+                    left -= sent
+                os.lseek(in_fd, offset, os.SEEK_SET)
+                return
+            except OSError as e:
+                if e.errno not in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                self.sendfile = False
+        while left > 0 and (block := os.read(in_fd, int(min(left, COPY_BLOCK_SIZE)))):
+            os.write(out_fd, block)
+            left -= len(block)
+
+    @staticmethod
+    def _copy_xattrs(in_fd: int, out_fd: int):
+        """ Erweiterte Attribute wie bei shutil.copystat (nicht unterstützte still übergehen). """
+        try:
+            names = os.listxattr(in_fd)
+        except (AttributeError, OSError):
+            return
+        for name in names:
+            try:
+                os.setxattr(out_fd, name, os.getxattr(in_fd, name))
+            except OSError as e:
+                if e.errno not in (errno.EPERM, errno.ENOTSUP, errno.ENODATA, errno.EINVAL):
+                    raise
+
+    def copy_file(self, src, dst, src_dir_fd: int | None = None, dst_dir_fd: int | None = None) -> int:
+        """
+        Wie shutil.copy2, aber per Reflink/Kernel-Kopie und nur über Dateideskriptoren
+        (Rechte, Zeiten und xattrs per fchmod/futimens, keine erneute Pfadauflösung).
+        Mit dir_fd sind src/dst Namen in diesen Verzeichnissen. Liefert die Größe.
+        """
+        in_fd = os.open(src, os.O_RDONLY, dir_fd=src_dir_fd)
+        try:
+            st = os.fstat(in_fd)
+            out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600, dir_fd=dst_dir_fd)
+            try:
+                if not self.clone(in_fd, out_fd):
+                    self.copy_data(in_fd, out_fd, st.st_size)
+                self._copy_xattrs(in_fd, out_fd)
+                os.chmod(out_fd, st.st_mode & 0o7777)
+                os.utime(out_fd, ns=(st.st_atime_ns, st.st_mtime_ns))
+            finally:
+                os.close(out_fd)
+        finally:
+            os.close(in_fd)
+        return st.st_size
+
+    @staticmethod
+    def _walk(root: Path) -> list[tuple]:
+        """ (relatives_verzeichnis, dateien, symlinks) je Verzeichnis, Eltern vor Kindern, ohne stat(). """
+        result = []
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            files, links = [], []
+            with os.scandir(root / relative if relative else root) as it:
+                for entry in it:
+                    if entry.is_symlink():
+                        links.append(entry.name)
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append(f"{relative}/{entry.name}" if relative else entry.name)
+                    else:
+                        files.append(entry.name)
+            result.append((relative, files, links))
+        return result
+
+    def copy_tree(self, src: Path, dst: Path, label: str = "Kopieren"):
+        """ Wie shutil.copytree (Symlinks bleiben Symlinks), Verzeichnisse parallel. """
+        directories = self._walk(src)
+        progress = Progress(label, sum(len(files) for _, files, _ in directories), 0)
+
+        def copy_directory(job: tuple):
+            relative, files, _ = job
+            src_fd = os.open(src / relative, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                dst_fd = os.open(dst / relative, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    nbytes = sum(self.copy_file(name, name, src_fd, dst_fd) for name in files)
+                finally:
+                    os.close(dst_fd)
+            finally:
+                os.close(src_fd)
+            progress.add(nbytes, len(files))
+
+        for relative, _, links in directories:
+            (dst / relative).mkdir(exist_ok=not relative)
+            for name in links:
+                os.symlink(os.readlink(src / relative / name), dst / relative / name)
+        with ThreadPoolExecutor(self.workers) as pool:
+            list(pool.map(copy_directory, directories))
+        # Verzeichnis-Zeiten zuletzt, innen vor außen
+        for relative, _, _ in reversed(directories):
+            shutil.copystat(src / relative, dst / relative)
+        progress.finish()
+
+    def remove_tree(self, path: Path, label: str = "Löschen"):
+        """ Wie shutil.rmtree: erst in den Papierkorb umbenennen (gleiches Dateisystem), dann parallel löschen. """
+        target = path
+        if self.trash_dir is not None:
+            try:
+                self.trash_dir.mkdir(parents=True, exist_ok=True)
+                target = self.trash_dir / f"{os.getpid()}-{threading.get_ident()}-{time.monotonic_ns()}"
+                os.rename(path, target)
+            except OSError:
+                target = path  # anderes Dateisystem: an Ort und Stelle löschen
+        self._delete(target, label)
+
+    def purge_trash(self):
+        """
+        Löscht, was ein abgebrochenes oder fehlgeschlagenes remove_tree im Papierkorb
+        liegen ließ - dort liegen "gelöschte" Originale. Einträge laufender Prozesse bleiben.
+        """
+        if self.trash_dir is None or not self.trash_dir.is_dir():
+            return
+        for entry in os.scandir(self.trash_dir):
+            pid = entry.name.split("-", 1)[0]
+            if pid.isdigit() and int(pid) != os.getpid() and _process_alive(int(pid)):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    self._delete(Path(entry.path), "Papierkorb leeren")
+                else:
+                    os.unlink(entry.path)
+                logger.info(f"Rest eines abgebrochenen Löschvorgangs entfernt: '{entry.path}'")
+            except OSError as e:
+                logger.error(f"Fehler beim Leeren des Papierkorbs '{entry.path}': {e}")
+
+    def _delete(self, target: Path, label: str):
+        directories = self._walk(target)
+        progress = Progress(label, sum(len(files) + len(links) for _, files, links in directories), 0)
+
+        def clear_directory(job: tuple):
+            relative, files, links = job
+            fd = os.open(target / relative, os.O_RDONLY)
+            try:
+                for name in files + links:
+                    os.unlink(name, dir_fd=fd)
+            finally:
+                os.close(fd)
+            progress.add(0, len(files) + len(links))
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            list(pool.map(clear_directory, directories))
+        for relative, _, _ in reversed(directories):
+            os.rmdir(target / relative)
+        progress.finish()
+
+
+class ChunkStore:
+    """
+    Inhaltsadressierter Speicher: Jeder Chunk liegt genau einmal unter
+    chunks/<sha256[:2]>/<sha256>. Gleiche Daten (auch aus verschiedenen Dateien
+    oder Backup-Versionen) belegen also nur einmal Platz.
+    """
+    def __init__(self, root: Path, engine: CopyEngine):
+        self.root = root
+        self.engine = engine
+        self.chunk_dir = root / "chunks"
+        self.tmp_dir = root / "tmp"
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.bytes_read = 0     # Statistik seit dem Start (alle Elemente eines Batches)
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+
+    @staticmethod
+    def _find_cut(buf: bytearray) -> int:
+        """
+        Liefert die Länge des nächsten Chunks am Anfang von buf. Geschnitten wird
+        hinter einem CDC_ANCHOR, dessen Umgebung eine bestimmte CRC32 ergibt -
+        die Grenze hängt also nur vom Inhalt ab und verschiebt sich mit, wenn
+        weiter vorne Bytes eingefügt oder gelöscht werden.
+        """
+        if len(buf) <= CDC_MIN_SIZE:
+            return len(buf)
+        limit = min(len(buf), CDC_MAX_SIZE)
+        pos = CDC_MIN_SIZE
+        while True:
+            pos = buf.find(CDC_ANCHOR, pos, limit)
+            if pos < 0:
+                return limit
+            pos += 1
+            if not zlib.crc32(buf[pos - CDC_WINDOW:pos]) & CDC_MASK:
+                return pos
+
+    def iter_chunks(self, f):
+        """ Zerlegt einen geöffneten Datenstrom in Chunks (bytes). """
+        buf = bytearray()
+        eof = False
+        while buf or not eof:
+            while not eof and len(buf) < CDC_MAX_SIZE:
+                block = f.read(CDC_MAX_SIZE)
+                eof = not block
+                buf += block
+            if not buf:
+                break
+            cut = self._find_cut(buf)
+            yield bytes(buf[:cut])
+            del buf[:cut]
+
+    def put(self, data: bytes) -> str:
+        """ Legt einen Chunk ab (falls noch nicht vorhanden) und liefert seinen Hash. """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        written = 0
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            # Erst vollständig schreiben, dann umbenennen: nie halbe Chunks im Speicher
+            tmp_path = self.tmp_dir / f"{digest}.{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            written = len(data)
+        with self._lock:
+            self.bytes_read += len(data)
+            self.bytes_written += written
+        return digest
+
+    def store_file(self, path: Path) -> list[str]:
+        """ Speichert eine Datei und liefert die Liste ihrer Chunk-Hashes. """
+        with open(path, 'rb') as f:
+            return [self.put(chunk) for chunk in self.iter_chunks(f)]
+
+    def digest_file(self, path: Path) -> list[str]:
+        """ Chunk-Hashes einer Datei, ohne etwas zu speichern (für diff). """
+        with open(path, 'rb') as f:
+            return [hashlib.sha256(chunk).hexdigest() for chunk in self.iter_chunks(f)]
+
+    def restore_file(self, chunks: list[str], target: Path):
+        """
+        Setzt eine Datei Chunk für Chunk wieder zusammen (nie die ganze Datei im RAM).
+        Die Daten selbst kopiert der Kernel; eine Datei aus nur einem Chunk wird
+        nach Möglichkeit als Reflink angelegt und belegt dann keinen neuen Platz.
+        """
+        with open(target, 'wb', buffering=0) as out:
+            for digest in chunks:
+                path = self._chunk_path(digest)
+                if hashlib.sha256(path.read_bytes()).hexdigest() != digest:
+                    raise OSError(f"Chunk {digest} ist beschädigt")
+                with open(path, 'rb', buffering=0) as src:
+                    if len(chunks) == 1 and self.engine.clone(src.fileno(), out.fileno()):
+                        break
+                    self.engine.copy_data(src.fileno(), out.fileno())
+
+
+class BackupIndex:
+    """
+    Persistenter Index: Originalpfad (relativ zum Basisverzeichnis) -> Versionen
+    mit Größe, Hash und Zustand. shield/unshield aktualisieren ihn in einer
+    Transaktion, list und die Suche nach der neuesten Version kommen so ohne
+    Durchsuchen des Backup-Baums aus.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        state TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS versions (
+        id INTEGER PRIMARY KEY,
+        item_id INTEGER NOT NULL REFERENCES items(id),
+        name TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        size INTEGER,
+        hash TEXT,
+        UNIQUE (item_id, name)
+    );
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.created = not path.exists()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(self.SCHEMA)
+
+    def _item_id(self, relative: str, state: str) -> int:
+        self._db.execute(
+            "INSERT INTO items(path, state) VALUES (?, ?) ON CONFLICT(path) DO UPDATE SET state = excluded.state",
+            (relative, state))
+        return self._db.execute("SELECT id FROM items WHERE path = ?", (relative,)).fetchone()[0]
+
+    def record_version(self, relative: str, name: str, kind: str, size: int | None, digest: str | None, state: str):
+        """ Trägt eine neue Version ein und setzt den Zustand des Elements. """
+        with self._lock, self._db:
+            item_id = self._item_id(relative, state)
+            self._db.execute(
+                "INSERT OR REPLACE INTO versions(item_id, name, kind, size, hash) VALUES (?, ?, ?, ?, ?)",
+                (item_id, name, kind, size, digest))
+
+    def set_state(self, relative: str, state: str):
+        with self._lock, self._db:
+            self._db.execute("UPDATE items SET state = ? WHERE path = ?", (state, relative))
+
+    def state(self, relative: str) -> str | None:
+        """ Zuletzt eingetragener Zustand ("shielded"/"restored") oder None. """
+        with self._lock:
+            row = self._db.execute("SELECT state FROM items WHERE path = ?", (relative,)).fetchone()
+        return row[0] if row else None
+
+    def latest(self, relative: str) -> str | None:
+        """ Name der neuesten Version (über den Index, ohne Verzeichnis-Scan). """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT v.name FROM versions v JOIN items i ON i.id = v.item_id "
+                "WHERE i.path = ? ORDER BY v.name DESC LIMIT 1", (relative,)).fetchone()
+        return row[0] if row else None
+
+    def entries(self) -> list[tuple]:
+        """ (pfad, zustand, version, größe) für alle Versionen, neueste zuerst je Element. """
+        with self._lock:
+            return self._db.execute(
+                "SELECT i.path, i.state, v.name, v.size FROM items i JOIN versions v ON v.item_id = i.id "
+                "ORDER BY i.path, v.name DESC").fetchall()
+
+    def rebuild(self, states: dict, versions: list[tuple]):
+        """ Ersetzt den kompletten Inhalt in einer Transaktion. """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM versions")
+            self._db.execute("DELETE FROM items")
+            item_ids = {relative: self._item_id(relative, state) for relative, state in states.items()}
+            self._db.executemany(
+                "INSERT INTO versions(item_id, name, kind, size, hash) VALUES (?, ?, ?, ?, ?)",
+                [(item_ids[relative], name, kind, size, digest) for relative, name, kind, size, digest in versions])
+
+
+class BatchJournal:
+    """
+    Write-Ahead-Journal eines Batches: eine Kopfzeile (Befehl, Elemente) und je
+    Schritt eine Zeile, die auf der Platte steht (fsync), bevor der Schritt
+    etwas Zerstörendes tut. Bricht ein Batch ab, bleibt die Datei liegen und
+    'resume' setzt jedes Element beim letzten Schritt fort; fertige Elemente
+    werden übersprungen. Ein durchgelaufener Batch löscht sie nur, wenn kein
+    Element nach einem zerstörenden Schritt (DESTRUCTIVE_STEPS) hängen blieb.
+    """
+    # Ab diesen Schritten ist das Original bzw. die Attrappe womöglich schon halb gelöscht
+    DESTRUCTIVE_STEPS = ("backed_up", "restoring")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.steps = {}   # Element -> letzter Schritt außer "failed"
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self) -> dict | None:
+        """
+        Kopf des unterbrochenen Batches plus 'steps' (Element -> letzter Eintrag
+        außer "failed", denn ein Fehlschlag nach "backed_up" muss dort fortsetzen), sonst None.
+        """
+        try:
+            lines = self.path.read_text(encoding='utf-8').splitlines()
+        except FileNotFoundError:
+            return None
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass  # beim Absturz halb geschriebene letzte Zeile
+        if not records or "command" not in records[0]:
+            return None
+        header = records[0]
+        header["steps"] = {record["item"]: record for record in records[1:]
+                           if "item" in record and record["step"] != "failed"}
+        return header
+
+    def _append(self, record: dict):
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def start(self, command: str, items: list[str], jobs: int, steps: dict, resume: bool = False, **options):
+        """ Beginnt einen neuen Batch oder hängt beim Fortsetzen an den alten an. """
+        self.steps = {item: record["step"] for item, record in steps.items()}
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._append({"command": command, "items": items, "jobs": jobs,
+                          "started": datetime.now().isoformat(timespec='seconds'), **options})
+
+    def record(self, item: str, step: str, **data):
+        self._append({"item": item, "step": step, **data})
+        if step != "failed":
+            with self._lock:
+                self.steps[item] = step
+
+    def half_done(self) -> list[str]:
+        """ Elemente, die nach einem zerstörenden Schritt nicht fertig wurden. """
+        with self._lock:
+            return [item for item, step in self.steps.items() if step in self.DESTRUCTIVE_STEPS]
+
+    def close(self, finished: bool):
+        self._file.close()
+        self._file = None
+        if finished:
+            self.path.unlink(missing_ok=True)
+
+
 class GhostShield:
-    def __init__(self, target_base_dir: Path):
+    def __init__(self, target_base_dir: Path, incremental: bool = True):
         """
         Initialisiert GhostShield.
         :param target_base_dir: Das Basisverzeichnis, in dem die Backups für alle geschützten Elemente gespeichert werden.
                                 Wenn GhostShield.py im selben Ordner wie die zu schützenden Dateien liegt,
                                 kann man '.' als target_base_dir verwenden.
+        :param incremental: Unveränderte Dateien (laut stat) aus der letzten Version übernehmen statt neu zu lesen.
         """
         self.target_base_dir = target_base_dir.resolve()
+        self.incremental = incremental
         self.backup_root_dir = self.target_base_dir / BACKUP_BASE_DIR_NAME
         self._ensure_backup_root_dir_exists()
+        self.engine = CopyEngine(self.backup_root_dir / CHUNK_STORE_DIR_NAME / "trash")
+        self.engine.purge_trash()
+        self.store = ChunkStore(self.backup_root_dir / CHUNK_STORE_DIR_NAME, self.engine)
+        self.index = BackupIndex(self.backup_root_dir / INDEX_FILE_NAME)
+        if self.index.created:
+            # Neuer Index: vorhandene Backups (z.B. von älteren Versionen) einmal übernehmen
+            self.reindex()
 
     def _ensure_backup_root_dir_exists(self):
         """ Stellt sicher, dass das Backup-Root-Verzeichnis existiert. """
@@ -70,195 +659,622 @@ class GhostShield:
     def _get_backup_path_for_original(self, original_path: Path) -> Path:
         """
         Generiert den Pfad für das Backup eines bestimmten Originalpfades.
-        Backups werden unter BACKUP_BASE_DIR_NAME/relativer_pfad_zum_original/zeitstempel abgelegt.
+        Backups werden als Manifest unter BACKUP_BASE_DIR_NAME/relativer_pfad_zum_original/zeitstempel.manifest
+        abgelegt, die Daten selbst liegen im Chunk-Speicher.
         """
         relative_path = original_path.relative_to(self.target_base_dir)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return self.backup_root_dir / relative_path / timestamp
+        item_backup_dir = self.backup_root_dir / relative_path
+        # Zweimal in derselben Sekunde: nicht die frühere Version überschreiben, sondern _01, _02, ... anhängen (sortiert hinter ".manifest")
+        name = timestamp
+        counter = 0
+        while (item_backup_dir / (name + MANIFEST_SUFFIX)).exists() or (item_backup_dir / name).exists():
+            counter += 1
+            if counter > 99:
+                raise OSError(f"Zu viele Backup-Versionen von '{original_path}' in derselben Sekunde.")
+            name = f"{timestamp}_{counter:02d}"
+        return item_backup_dir / (name + MANIFEST_SUFFIX)
+
+    def _build_manifest(self, original_path: Path, previous: dict | None = None, dry_run: bool = False) -> tuple[dict, dict]:
+        """
+        Speichert alle Dateien unterhalb von original_path im Chunk-Speicher und
+        beschreibt sie in einem Manifest (Pfad, Typ, Rechte, mtime, Inode, Chunks).
+        Die Dateien werden parallel gelesen und zerlegt.
+
+        Mit previous (Manifest der letzten Version) arbeitet es inkrementell:
+        Stimmen Größe, mtime und Inode, wird die Datei gar nicht gelesen und
+        übernimmt die Chunks der letzten Version. Nur "verdächtige" Dateien
+        (gleiche Größe, aber andere mtime/Inode, oder mtime nach Beginn des
+        letzten Scans) werden neu gehasht. Die Chunk-Liste ist dabei der
+        Inhalts-Hash der Datei. Mit dry_run wird nichts gespeichert.
+        Liefert (manifest, änderungen).
+        """
+        def read_chunks(path: Path) -> list[str]:
+            return self.store.digest_file(path) if dry_run else self.store.store_file(path)
+
+        def entry(relative: str, kind: str, st: os.stat_result) -> tuple[dict, str]:
+            path = original_path if relative == "." else original_path / relative
+            old = old_entries.get(relative)
+            if kind == "symlink":
+                item = {"path": relative, "type": "symlink", "target": os.readlink(path)}
+                if old is None:
+                    return item, "added"
+                return item, "unchanged" if old == item else "modified"
+            item = {"path": relative, "type": kind, "mode": st.st_mode & 0o7777, "mtime_ns": st.st_mtime_ns}
+            if kind != "file":
+                return item, "added" if old is None else "unchanged" if old["type"] == kind else "modified"
+            item.update(size=st.st_size, ino=st.st_ino)
+            progress.add(st.st_size)
+            if old is None or old["type"] != "file" or old["size"] != st.st_size:
+                # Neu oder sicher geändert: für diff reicht das, gehasht wird nur beim Sichern
+                item["chunks"] = None if dry_run else self.store.store_file(path)
+                return item, "added" if old is None else "modified"
+            if old["mtime_ns"] == st.st_mtime_ns and old.get("ino") == st.st_ino and old["mtime_ns"] < racy_ns:
+                item["chunks"] = old["chunks"]
+                return item, "unchanged"
+            item["chunks"] = read_chunks(path)
+            return item, "hashed" if item["chunks"] == old["chunks"] else "modified"
+
+        root_kind = "dir" if original_path.is_dir() else "file"
+        if previous is not None and previous.get("type") != root_kind:
+            previous = None
+        old_entries = {item["path"]: item for item in previous["entries"]} if previous else {}
+        # Was während des letzten Scans (oder kurz davor) geändert wurde, kann dieselbe mtime haben
+        # Die Kernel-Uhr für mtime ist grob und kann hinterherhinken, daher mit Sicherheitsabstand
+        racy_ns = previous.get("scanned_ns", 0) - RACY_MARGIN_NS if previous else 0
+        scanned_ns = time.time_ns()
+        scanned = [(".", root_kind, original_path.stat())]
+        if root_kind == "dir":
+            scanned += self.engine.scan(original_path)
+        progress = Progress("Vergleichen" if dry_run else "Sichern", sum(1 for _, kind, _ in scanned if kind == "file"),
+                            sum(st.st_size for _, kind, st in scanned if kind == "file"))
+        with ThreadPoolExecutor(self.engine.workers) as pool:
+            results = list(pool.map(lambda args: entry(*args), scanned))
+        progress.finish()
+
+        changes = {"added": [], "modified": [], "deleted": [], "unchanged": 0, "hashed": 0}
+        for item, status in results:
+            if status in ("unchanged", "hashed"):
+                changes["unchanged"] += 1
+                changes["hashed"] += status == "hashed"
+            else:
+                changes[status].append(item["path"])
+        current = {item["path"] for item, _ in results}
+        changes["deleted"] = [relative for relative in old_entries if relative not in current]
+        manifest = {
+            "version": 1,
+            "type": root_kind,
+            "source": str(original_path),
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "scanned_ns": scanned_ns,
+            "entries": [item for item, _ in results],
+        }
+        return manifest, changes
+
+    def _previous_manifest(self, original_path: Path) -> dict | None:
+        """ Manifest der neuesten Version (None bei alten Voll-Kopien oder ohne Backup). """
+        try:
+            latest = self._find_latest_backup_path(original_path)
+            if latest is None or not latest.name.endswith(MANIFEST_SUFFIX):
+                return None
+            manifest = json.loads(latest.read_text(encoding='utf-8'))
+            inodes_path = latest.with_name(latest.name + INODES_SUFFIX)
+            if inodes_path.exists():
+                inodes = json.loads(inodes_path.read_text(encoding='utf-8'))
+                for item in manifest["entries"]:
+                    if item["path"] in inodes:
+                        item["ino"] = inodes[item["path"]]
+            return manifest
+        except (OSError, ValueError) as e:
+            logger.warning(f"Warnung: Letzte Version von '{original_path}' nicht lesbar ({e}), sichere vollständig.")
+            return None
+
+    def _write_manifest(self, manifest_path: Path, manifest: dict) -> str:
+        """ Schreibt das Manifest atomar und liefert seinen SHA-256. """
+        data = json.dumps(manifest, separators=(',', ':')).encode('utf-8')
+        tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        # Inodes einer früheren Wiederherstellung gehören nicht zu diesem Manifest
+        manifest_path.with_name(manifest_path.name + INODES_SUFFIX).unlink(missing_ok=True)
+        os.replace(tmp_path, manifest_path)
+        return hashlib.sha256(data).hexdigest()
+
+    def _relative_key(self, original_path: Path) -> str:
+        return original_path.relative_to(self.target_base_dir).as_posix()
+
+    def _restore_manifest(self, manifest_path: Path, original_path: Path):
+        """ Baut das Element aus Manifest und Chunk-Speicher wieder auf (Dateien parallel). """
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        entries = manifest["entries"]
+        files = [item for item in entries if item["type"] == "file"]
+        progress = Progress("Wiederherstellen", len(files), sum(item["size"] for item in files))
+
+        def target_of(item: dict) -> Path:
+            return original_path if item["path"] == "." else original_path / item["path"]
+
+        inodes = {}
+
+        def restore(item: dict):
+            target = target_of(item)
+            self.store.restore_file(item["chunks"], target)
+            os.chmod(target, item["mode"])
+            os.utime(target, ns=(item["mtime_ns"], item["mtime_ns"]))
+            inodes[item["path"]] = os.stat(target).st_ino
+            progress.add(item["size"])
+
+        # Verzeichnisse stehen im Manifest vor ihrem Inhalt
+        for item in entries:
+            if item["type"] == "dir":
+                target_of(item).mkdir(exist_ok=True)
+            elif item["type"] == "symlink":
+                os.symlink(item["target"], target_of(item))
+        with ThreadPoolExecutor(self.engine.workers) as pool:
+            list(pool.map(restore, files))
+        # Verzeichnis-Zeiten erst zum Schluss setzen, das Befüllen würde sie wieder ändern
+        for item in reversed(entries):
+            if item["type"] == "dir":
+                os.chmod(target_of(item), item["mode"])
+                os.utime(target_of(item), ns=(item["mtime_ns"], item["mtime_ns"]))
+        # Wiederhergestellte Dateien haben neue Inodes; ohne diese Notiz würde das
+        # nächste inkrementelle shield jede Datei für verdächtig halten und neu hashen
+        inodes_path = manifest_path.with_name(manifest_path.name + INODES_SUFFIX)
+        tmp_path = inodes_path.with_name(inodes_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(inodes, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, inodes_path)
+        progress.finish()
 
     def _find_latest_backup_path(self, original_path: Path) -> Path | None:
         """
         Findet den Pfad zum neuesten Backup für ein gegebenes Original.
+        Zuerst über den Index, sonst (z.B. nach einem Absturz) über die Versionen auf der Platte.
         """
         relative_path = original_path.relative_to(self.target_base_dir)
         item_backup_dir = self.backup_root_dir / relative_path
 
+        name = self.index.latest(self._relative_key(original_path))
+        if name and (item_backup_dir / name).exists():
+            return item_backup_dir / name
+
         if not item_backup_dir.is_dir():
             return None
-
-        # Finde alle timestamp-Ordner und sortiere sie, um den neuesten zu finden
         backup_versions = sorted(
-            [d for d in item_backup_dir.iterdir() if d.is_dir() and d.name.startswith(datetime.now().strftime("%Y%m%d_")[:8])], # Optional: Nur aktuelle Tagesbackups, oder alle
+            [d for d in item_backup_dir.iterdir() if self._is_version_name(d.name)],
             key=lambda p: p.name,
             reverse=True
         )
         return backup_versions[0] if backup_versions else None
 
-    def shield(self, original_path_str: str):
+    @staticmethod
+    def _is_version_name(name: str) -> bool:
+        if name.endswith(MANIFEST_SUFFIX):
+            name = name[:-len(MANIFEST_SUFFIX)]
+        return bool(VERSION_NAME_PATTERN.match(name))
+
+    def _scan_versions(self, top: Path) -> list[tuple]:
+        """ Sucht unterhalb von top alle Backup-Versionen: (relativer_pfad, name, pfad). """
+        found = []
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if self._is_version_name(entry.name):
+                        # In alte Voll-Kopien nicht hineinlaufen, das sind Nutzdaten
+                        relative = directory.relative_to(self.backup_root_dir).as_posix()
+                        found.append((relative, entry.name, Path(entry.path)))
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+        return found
+
+    @staticmethod
+    def _describe_version(version: tuple) -> tuple:
+        """ (relativer_pfad, name, art, größe, hash) einer Version auf der Platte. """
+        relative, name, path = version
+        if name.endswith(MANIFEST_SUFFIX):
+            data = path.read_bytes()
+            manifest = json.loads(data)
+            size = sum(item.get("size", 0) for item in manifest["entries"])
+            return relative, name, "manifest", size, hashlib.sha256(data).hexdigest()
+        if path.is_file():
+            return relative, name, "copy", path.stat().st_size, None
+        size = 0
+        for dirpath, _, filenames in os.walk(path):
+            size += sum(os.lstat(os.path.join(dirpath, f)).st_size for f in filenames)
+        return relative, name, "copy", size, None
+
+    def _current_state(self, relative: str) -> str:
+        """ Leere Datei oder leeres Verzeichnis an der Originalstelle = Attrappe. """
+        original_path = self.target_base_dir / relative
+        if not original_path.exists():
+            return "missing"
+        if original_path.is_dir():
+            return "shielded" if not any(original_path.iterdir()) else "restored"
+        return "shielded" if original_path.stat().st_size == 0 else "restored"
+
+    def reindex(self):
+        """ Baut den Index aus den Backups auf der Platte neu auf (parallel je Unterverzeichnis). """
+        logger.info(f"Baue Index neu auf: {self.index.path}")
+        tops = [Path(entry.path) for entry in os.scandir(self.backup_root_dir)
+                if entry.is_dir(follow_symlinks=False) and entry.name != CHUNK_STORE_DIR_NAME]
+        with ThreadPoolExecutor() as pool:
+            found = [version for versions in pool.map(self._scan_versions, tops) for version in versions]
+            versions = list(pool.map(self._describe_version, found))
+            relatives = sorted({version[0] for version in versions})
+            states = dict(zip(relatives, pool.map(self._current_state, relatives)))
+        self.index.rebuild(states, versions)
+        logger.info(f"Index enthält {len(states)} Elemente mit {len(versions)} Versionen.")
+
+    def shield(self, original_path_str: str, confirm=confirm_action, checkpoint=None, resume: dict | None = None,
+               force: bool = False) -> bool:
         """
         Schirmt eine Datei oder ein Verzeichnis ab.
         Das Original wird ins Backup verschoben, und an seiner Stelle wird ein leerer "Dummy" erstellt.
+        confirm entscheidet über destruktive Schritte, checkpoint(schritt, **daten) schreibt ins
+        Batch-Journal, resume ist dessen letzter Eintrag für dieses Element. Liefert True bei Erfolg.
+        Ist das Element schon abgeschirmt (leere Attrappe laut Index und Platte), wird es nur mit
+        force erneut gesichert - sonst würde die leere Attrappe zur neuesten Version.
         """
         original_path = Path(original_path_str).resolve()
-        logger.info(f"Versuche, {original_path} abzuschirmen...")
+        checkpoint = checkpoint or (lambda step, **data: None)
 
-        if not original_path.exists():
-            logger.error(f"Fehler: Das Element '{original_path}' existiert nicht.")
-            return
+        if resume and resume.get("step") == "backed_up":
+            # Backup ist schon vollständig geschrieben, nur noch Original durch Attrappe ersetzen
+            current_backup_path = Path(resume["backup"])
+            logger.info(f"Setze Abschirmung von {original_path} fort, Backup '{current_backup_path}' existiert bereits.")
+            try:
+                data = current_backup_path.read_bytes()
+                manifest = json.loads(data)
+            except (OSError, ValueError) as e:
+                logger.error(f"Fehler beim Lesen des Backups '{current_backup_path}': {e}")
+                return False
+            manifest_hash = hashlib.sha256(data).hexdigest()
+        else:
+            logger.info(f"Versuche, {original_path} abzuschirmen...")
 
-        if not str(original_path).startswith(str(self.target_base_dir)):
-            logger.warning(
-                f"Warnung: '{original_path}' liegt nicht im Basisverzeichnis '{self.target_base_dir}'. "
-                "Dies wird unterstützt, aber stellen Sie sicher, dass dies beabsichtigt ist."
-            )
+            if not original_path.exists():
+                logger.error(f"Fehler: Das Element '{original_path}' existiert nicht.")
+                return False
 
-        if original_path.name == BACKUP_BASE_DIR_NAME:
-            logger.error(f"Fehler: Das Backup-Verzeichnis selbst kann nicht abgeschirmt werden: {original_path}")
-            return
+            if not str(original_path).startswith(str(self.target_base_dir)):
+                logger.warning(
+                    f"Warnung: '{original_path}' liegt nicht im Basisverzeichnis '{self.target_base_dir}'. "
+                    "Dies wird unterstützt, aber stellen Sie sicher, dass dies beabsichtigt ist."
+                )
 
-        # Pfad zum neuen Backup
-        current_backup_path = self._get_backup_path_for_original(original_path)
+            if original_path.name == BACKUP_BASE_DIR_NAME:
+                logger.error(f"Fehler: Das Backup-Verzeichnis selbst kann nicht abgeschirmt werden: {original_path}")
+                return False
 
-        # 1. Backup erstellen
-        try:
-            current_backup_path.parent.mkdir(parents=True, exist_ok=True)
-            if original_path.is_file():
-                shutil.copy2(original_path, current_backup_path)
-                logger.info(f"Datei '{original_path}' nach '{current_backup_path}' kopiert.")
-            elif original_path.is_dir():
-                shutil.copytree(original_path, current_backup_path)
-                logger.info(f"Verzeichnis '{original_path}' nach '{current_backup_path}' kopiert.")
-            else:
-                logger.error(f"Kann den Typ von '{original_path}' nicht abschirmen (weder Datei noch Verzeichnis).")
-                return
-        except (FileNotFoundError, PermissionError, shutil.Error, OSError) as e:
-            logger.error(f"Fehler beim Erstellen des Backups von '{original_path}' nach '{current_backup_path}': {e}")
-            return
+            relative = self._relative_key(original_path)
+            if not force and self.index.state(relative) == "shielded" and self._current_state(relative) == "shielded":
+                logger.error(f"'{original_path}' ist bereits abgeschirmt, übersprungen. "
+                             "Mit --force wird die leere Attrappe trotzdem als neue Version gesichert.")
+                return False
 
-        # 2. Original löschen (mit Bestätigung)
-        if not confirm_action(f"Soll das Original '{original_path}' gelöscht werden, um die Attrappe zu erstellen?"):
-            logger.info("Abschirmung abgebrochen: Original wurde nicht gelöscht.")
-            # Aufräumen: Wenn Original nicht gelöscht wird, dann ist Backup nutzlos
-            if current_backup_path.is_dir():
-                shutil.rmtree(current_backup_path)
-            elif current_backup_path.is_file():
-                current_backup_path.unlink()
-            logger.info(f"Erstelltes Backup '{current_backup_path}' wurde gelöscht.")
-            return
+            # Pfad zum neuen Backup
+            current_backup_path = self._get_backup_path_for_original(original_path)
+
+            # 1. Backup erstellen (nur neue Chunks werden geschrieben)
+            try:
+                if not (original_path.is_file() or original_path.is_dir()):
+                    logger.error(f"Kann den Typ von '{original_path}' nicht abschirmen (weder Datei noch Verzeichnis).")
+                    return False
+                current_backup_path.parent.mkdir(parents=True, exist_ok=True)
+                previous = self._previous_manifest(original_path) if self.incremental else None
+                manifest, changes = self._build_manifest(original_path, previous)
+                manifest_hash = self._write_manifest(current_backup_path, manifest)
+                logger.info(
+                    f"'{original_path}' gesichert: {len(manifest['entries'])} Einträge, "
+                    f"{sum(item.get('size', 0) for item in manifest['entries']) / 1e6:.1f} MB."
+                )
+                if previous is not None:
+                    logger.info(
+                        f"Gegenüber der letzten Version: {len(changes['added'])} neu, {len(changes['modified'])} geändert, "
+                        f"{len(changes['deleted'])} gelöscht, {changes['unchanged']} unverändert "
+                        f"({changes['hashed']} davon zur Sicherheit neu gehasht)."
+                    )
+            except (FileNotFoundError, PermissionError, shutil.Error, OSError) as e:
+                logger.error(f"Fehler beim Erstellen des Backups von '{original_path}' nach '{current_backup_path}': {e}")
+                return False
 
+            # 2. Original löschen (mit Bestätigung)
+            if not confirm(f"Soll das Original '{original_path}' gelöscht werden, um die Attrappe zu erstellen?"):
+                logger.info("Abschirmung abgebrochen: Original wurde nicht gelöscht.")
+                # Aufräumen: Wenn Original nicht gelöscht wird, dann ist Backup nutzlos
+                if current_backup_path.is_dir():
+                    shutil.rmtree(current_backup_path)
+                elif current_backup_path.is_file():
+                    current_backup_path.unlink()
+                logger.info(f"Erstelltes Backup '{current_backup_path}' wurde gelöscht.")
+                return False
+            checkpoint("backed_up", backup=str(current_backup_path))
+
+        # Beim Fortsetzen kann das Original schon ganz oder teilweise gelöscht sein
         try:
             if original_path.is_file():
                 original_path.unlink()
                 logger.info(f"Originaldatei '{original_path}' gelöscht.")
             elif original_path.is_dir():
-                shutil.rmtree(original_path)
+                self.engine.remove_tree(original_path)
                 logger.info(f"Originalverzeichnis '{original_path}' gelöscht.")
         except (FileNotFoundError, PermissionError, OSError) as e:
             logger.error(f"Fehler beim Löschen des Originals '{original_path}': {e}")
-            return
+            return False
 
         # 3. Dummy erstellen
         try:
-            if current_backup_path.is_file(): # Original war eine Datei
+            if manifest["type"] == "file": # Original war eine Datei
                 original_path.touch()
                 logger.info(f"Leere Attrappen-Datei '{original_path}' erstellt.")
-            elif current_backup_path.is_dir(): # Original war ein Verzeichnis
+            elif manifest["type"] == "dir": # Original war ein Verzeichnis
                 original_path.mkdir(exist_ok=True)
                 logger.info(f"Leeres Attrappen-Verzeichnis '{original_path}' erstellt.")
         except (PermissionError, OSError) as e:
             logger.error(f"Fehler beim Erstellen der Attrappe für '{original_path}': {e}")
-            return
+            return False
 
+        self.index.record_version(
+            self._relative_key(original_path), current_backup_path.name, "manifest",
+            sum(item.get("size", 0) for item in manifest["entries"]), manifest_hash, "shielded")
         logger.info(f"'{original_path}' erfolgreich abgeschirmt. Backup unter '{current_backup_path}'")
+        return True
 
-    def unshield(self, original_path_str: str):
+    def unshield(self, original_path_str: str, confirm=confirm_action, checkpoint=None, resume: dict | None = None,
+                 force: bool = False) -> bool:
         """
         Stellt eine abgeschirmte Datei oder ein Verzeichnis wieder her.
         Die Attrappe wird gelöscht, und das neueste Backup wird an die ursprüngliche Stelle zurückkopiert.
+        Parameter wie bei shield; liefert True bei Erfolg. Liegt an der Originalstelle etwas anderes
+        als eine leere Attrappe (oder ist das Element schon wiederhergestellt), wird es nur mit force überschrieben.
         """
         original_path = Path(original_path_str).resolve()
+        checkpoint = checkpoint or (lambda step, **data: None)
+        resuming = bool(resume and resume.get("step") == "restoring")
         logger.info(f"Versuche, {original_path} zu entschismen...")
 
         if not original_path.exists():
             logger.warning(f"Warnung: '{original_path}' existiert nicht. Versuche trotzdem, das Backup zu finden und wiederherzustellen.")
 
-        latest_backup_path = self._find_latest_backup_path(original_path)
+        latest_backup_path = Path(resume["backup"]) if resuming else self._find_latest_backup_path(original_path)
 
         if not latest_backup_path:
             logger.error(f"Kein Backup für '{original_path}' gefunden. Kann nicht entschismen.")
-            return
+            return False
 
-        # 1. Attrappe löschen (falls vorhanden und mit Bestätigung)
+        # 1. Attrappe löschen (falls vorhanden und mit Bestätigung).
+        # Beim Fortsetzen liegt dort die Attrappe oder eine halbe Wiederherstellung: ohne Rückfrage weg damit.
         if original_path.exists():
-            if not confirm_action(f"Soll die Attrappe '{original_path}' gelöscht werden, um das Original wiederherzustellen?"):
-                logger.info("Entschirmung abgebrochen: Attrappe wurde nicht gelöscht.")
-                return
+            if not resuming:
+                relative = self._relative_key(original_path)
+                if not force and (self._current_state(relative) != "shielded" or self.index.state(relative) == "restored"):
+                    logger.error(f"'{original_path}' ist keine leere Attrappe oder schon wiederhergestellt, übersprungen. "
+                                 "Mit --force wird es trotzdem durch das Backup ersetzt.")
+                    return False
+                if not confirm(f"Soll die Attrappe '{original_path}' gelöscht werden, um das Original wiederherzustellen?"):
+                    logger.info("Entschirmung abgebrochen: Attrappe wurde nicht gelöscht.")
+                    return False
+                checkpoint("restoring", backup=str(latest_backup_path))
             try:
                 if original_path.is_file():
                     original_path.unlink()
                     logger.info(f"Attrappen-Datei '{original_path}' gelöscht.")
                 elif original_path.is_dir():
-                    shutil.rmtree(original_path)
+                    self.engine.remove_tree(original_path)
                     logger.info(f"Attrappen-Verzeichnis '{original_path}' gelöscht.")
             except (PermissionError, OSError) as e:
                 logger.error(f"Fehler beim Löschen der Attrappe '{original_path}': {e}")
-                return
+                return False
+        elif not resuming:
+            checkpoint("restoring", backup=str(latest_backup_path))
 
         # 2. Backup wiederherstellen
         try:
-            if latest_backup_path.is_file():
-                shutil.copy2(latest_backup_path, original_path)
+            if latest_backup_path.name.endswith(MANIFEST_SUFFIX):
+                self._restore_manifest(latest_backup_path, original_path)
+                logger.info(f"'{original_path}' aus Manifest '{latest_backup_path}' wiederhergestellt.")
+            elif latest_backup_path.is_file(): # Alte Voll-Kopie
+                self.engine.copy_file(latest_backup_path, original_path)
                 logger.info(f"Backup-Datei von '{latest_backup_path}' nach '{original_path}' wiederhergestellt.")
             elif latest_backup_path.is_dir():
-                shutil.copytree(latest_backup_path, original_path)
+                self.engine.copy_tree(latest_backup_path, original_path, "Wiederherstellen")
                 logger.info(f"Backup-Verzeichnis von '{latest_backup_path}' nach '{original_path}' wiederhergestellt.")
             else:
                 logger.error(f"Der Backup-Typ von '{latest_backup_path}' ist unbekannt. Kann nicht wiederherstellen.")
-                return
-        except (FileNotFoundError, PermissionError, shutil.Error, OSError) as e:
+                return False
+        except (FileNotFoundError, PermissionError, shutil.Error, OSError, ValueError, KeyError) as e:
             logger.error(f"Fehler beim Wiederherstellen des Backups von '{latest_backup_path}' nach '{original_path}': {e}")
-            return
+            return False
 
+        self.index.set_state(self._relative_key(original_path), "restored")
         logger.info(f"'{original_path}' erfolgreich entschirmt. Backup war unter '{latest_backup_path}'")
+        return True
+
+    def diff(self, original_path_str: str) -> bool:
+        """
+        Zeigt, was sich seit der letzten Version geändert hat, ohne etwas zu speichern.
+        Liefert True, wenn es Änderungen gibt.
+        """
+        original_path = Path(original_path_str).resolve()
+        if not original_path.exists():
+            logger.error(f"Fehler: Das Element '{original_path}' existiert nicht.")
+            return False
+        previous = self._previous_manifest(original_path)
+        if previous is None:
+            logger.info(f"'{original_path}': keine Manifest-Version vorhanden, alles wäre neu.")
+            return True
+        _, changes = self._build_manifest(original_path, previous, dry_run=True)
+        logger.info(f"Änderungen in '{original_path}' seit Version vom {previous['created']}:")
+        for marker, key in (("A", "added"), ("M", "modified"), ("D", "deleted")):
+            for relative in sorted(changes[key]):
+                logger.info(f"  {marker} {relative}")
+        logger.info(
+            f"{len(changes['added'])} neu, {len(changes['modified'])} geändert, {len(changes['deleted'])} gelöscht, "
+            f"{changes['unchanged']} unverändert ({changes['hashed']} davon neu gehasht)."
+        )
+        return bool(changes["added"] or changes["modified"] or changes["deleted"])
+
+    def run_batch(self, command: str, paths: list[str], jobs: int = BATCH_JOBS,
+                  confirm=confirm_action, resume: bool = False, force: bool = False) -> bool:
+        """
+        Führt shield/unshield für viele Elemente aus: höchstens jobs gleichzeitig,
+        jeder Schritt im Journal. Mit resume wird der unterbrochene Batch aus dem
+        Journal fortgesetzt (paths und force kommen dann aus dem Journal).
+        force: shield sichert auch bereits abgeschirmte Elemente, unshield überschreibt auch
+        Elemente, die keine Attrappe sind.
+        Liefert True, wenn alle Elemente geklappt haben.
+        """
+        journal = BatchJournal(self.backup_root_dir / JOURNAL_FILE_NAME)
+        pending = journal.load()
+        if resume:
+            if pending is None:
+                logger.error("Kein unterbrochener Batch gefunden.")
+                return False
+            command, items, steps = pending["command"], pending["items"], pending["steps"]
+            jobs = pending.get("jobs", jobs)
+            force = pending.get("force", False)
+            logger.info(f"Setze '{command}'-Batch vom {pending['started']} fort: "
+                        f"{sum(1 for step in steps.values() if step['step'] == 'done')} von {len(items)} Elementen fertig.")
+        else:
+            if pending is not None:
+                logger.error(f"Ein '{pending['command']}'-Batch vom {pending['started']} wurde unterbrochen. "
+                             "Erst 'resume' ausführen (oder 'resume --abandon', um ihn zu verwerfen).")
+                return False
+            items = [str(Path(path).resolve()) for path in paths]
+            steps = {}
+            # Verschachtelte Elemente würden sich gegenseitig den Boden wegziehen
+            known = set(items)
+            for item in items:
+                parent = next((str(p) for p in Path(item).parents if str(p) in known), None)
+                if parent is not None:
+                    logger.error(f"Fehler: '{item}' liegt innerhalb von '{parent}'. Bitte nur eines von beiden angeben.")
+                    return False
+
+        action = functools.partial(self.shield if command == "shield" else self.unshield, force=force)
+        todo = [item for item in items if steps.get(item, {}).get("step") != "done"]
+        journal.start(command, items, jobs, steps, resume, force=force)
+
+        def job(item: str) -> bool:
+            ok = action(item, confirm, lambda step, **data: journal.record(item, step, **data), steps.get(item))
+            journal.record(item, "done" if ok else "failed")
+            return ok
+
+        failed = []
+        finished = False
+        try:
+            with ThreadPoolExecutor(max(1, jobs)) as pool:
+                futures = {pool.submit(job, item): item for item in todo}
+                try:
+                    for future in as_completed(futures):
+                        try:
+                            ok = future.result()
+                        except Exception as e:
+                            logger.error(f"Unerwarteter Fehler bei '{futures[future]}': {e}")
+                            ok = False
+                        if not ok:
+                            failed.append(futures[future])
+                except BaseException:
+                    # Z.B. Strg+C: laufende Elemente zu Ende bringen, wartende nicht mehr starten
+                    pool.shutdown(cancel_futures=True)
+                    raise
+            finished = True
+        finally:
+            half_done = journal.half_done()
+            journal.close(finished and not half_done)
+
+        if half_done:
+            logger.warning(f"Journal bleibt erhalten: {len(half_done)} Elemente sind nur halb bearbeitet "
+                           "(Backup steht, Original bzw. Attrappe teilweise gelöscht). Mit 'resume' fortsetzen.")
+            for item in half_done:
+                logger.warning(f"  - halb fertig: '{item}'")
+
+        if command == "shield":
+            logger.info(f"Chunk-Speicher: {self.store.bytes_read / 1e6:.1f} MB gelesen, "
+                        f"{self.store.bytes_written / 1e6:.1f} MB neu gespeichert.")
+        if len(items) > 1 or resume:
+            logger.info(f"Batch '{command}': {len(todo) - len(failed)} erledigt, "
+                        f"{len(items) - len(todo)} schon vorher fertig, {len(failed)} fehlgeschlagen.")
+            for item in failed:
+                logger.info(f"  - fehlgeschlagen: '{item}'")
+        return not failed
+
+    def abandon_batch(self):
+        """ Verwirft das Journal eines unterbrochenen Batches (die Backups bleiben). """
+        journal = BatchJournal(self.backup_root_dir / JOURNAL_FILE_NAME)
+        pending = journal.load()
+        if pending is None:
+            logger.info("Kein unterbrochener Batch vorhanden.")
+            return
+        for item, record in pending["steps"].items():
+            if record["step"] in BatchJournal.DESTRUCTIVE_STEPS:
+                logger.warning(f"Warnung: '{item}' bleibt halb bearbeitet, Backup unter '{record['backup']}'.")
+        journal.path.unlink()
+        logger.info(f"Journal '{journal.path}' verworfen.")
 
     def list_shielded(self):
-        """ Listet alle aktuell abgeschirmten Elemente und ihre Backups auf. """
+        """ Listet alle abgeschirmten Elemente und ihre Backups auf (aus dem Index). """
         logger.info(f"Abgeschirmte Elemente (und ihre Backups) im Bereich von '{self.target_base_dir}':")
         found_any = False
         try:
-            # Iteriere durch die Struktur BACKUP_ROOT_DIR/relativer_pfad_zum_original/zeitstempel
-            # Wir wollen die 'relativer_pfad_zum_original'-Ebene finden
-            for item_backup_dir in self.backup_root_dir.iterdir():
-                if not item_backup_dir.is_dir():
-                    continue
-
-                # Rekursiv nach den Originalpfaden suchen, die Backups haben
-                for original_item_dir in item_backup_dir.rglob('*'): # rglob für Tiefensuche
-                    if original_item_dir.is_dir() and any(p.is_dir() for p in original_item_dir.iterdir() if p.name.startswith(datetime.now().strftime("%Y%m%d_")[:8])):
-                        # Wir haben einen Ordner gefunden, der timestamp-Ordner enthält
-                        relative_path_part = original_item_dir.relative_to(self.backup_root_dir)
-                        original_full_path = self.target_base_dir / relative_path_part
-                        logger.info(f"  - '{original_full_path}' (Attrappe: {original_full_path.exists()})")
-                        
-                        # Liste alle Backups für dieses Element auf
-                        backup_versions = sorted(
-                            [d for d in original_item_dir.iterdir() if d.is_dir() and d.name.startswith(datetime.now().strftime("%Y%m%d_")[:8])],
-                            key=lambda p: p.name,
-                            reverse=True
-                        )
-                        for version in backup_versions:
-                            logger.info(f"    -> Backup: {version}")
-                        found_any = True
-        except PermissionError as e:
-            logger.error(f"Berechtigungsfehler beim Auflisten von Backups in '{self.backup_root_dir}': {e}")
-            return
-        except Exception as e:
-            logger.error(f"Ein unerwarteter Fehler ist beim Auflisten von Backups aufgetreten: {e}")
+            current = None
+            for relative, state, name, size in self.index.entries():
+                if relative != current:
+                    current = relative
+                    original_full_path = self.target_base_dir / relative
+                    logger.info(f"  - '{original_full_path}' (Zustand: {state})")
+                    found_any = True
+                size_text = f"{size / 1e6:.1f} MB" if size is not None else "?"
+                logger.info(f"    -> Backup: {self.backup_root_dir / relative / name} ({size_text})")
+        except sqlite3.Error as e:
+            logger.error(f"Fehler beim Lesen des Index '{self.index.path}': {e}. Hilft 'reindex'?")
             return
 
         if not found_any:
             logger.info("  Keine abgeschirmten Elemente gefunden.")
 
+def run_copy_benchmark(base_dir: Path, files: int, size: int, rounds: int = 3):
+    """
+    Vergleicht shutil.copytree/rmtree mit der CopyEngine auf einem erzeugten
+    Baum aus vielen kleinen Dateien (im Basisverzeichnis, also auf demselben Dateisystem).
+    """
+    with tempfile.TemporaryDirectory(dir=base_dir, prefix=".ghostshield_bench_") as tmp:
+        tmp = Path(tmp)
+        source = tmp / "source"
+        payload = os.urandom(size)
+        for i in range(files):
+            directory = source / f"d{i // 100:04d}"
+            if i % 100 == 0:
+                directory.mkdir(parents=True)
+            (directory / f"f{i:06d}.bin").write_bytes(payload)
+        logger.info(f"Benchmark: {files} Dateien à {size} Bytes in '{source}'.")
+
+        engine = CopyEngine(tmp / "trash")
+        timings = {}
+        # Abwechselnd messen und je den besten Lauf nehmen, das glättet Schwankungen der Platte.
+        # Vor jeder Messung os.sync(), sonst bezahlt ein Verfahren das Zurückschreiben des anderen.
+        for _ in range(rounds):
+            for name, copy, remove in (
+                ("shutil", shutil.copytree, shutil.rmtree),
+                ("CopyEngine", engine.copy_tree, engine.remove_tree),
+            ):
+                os.sync()
+                started = time.perf_counter()
+                copy(source, tmp / name)
+                copy_time = time.perf_counter() - started
+                os.sync()
+                started = time.perf_counter()
+                remove(tmp / name)
+                remove_time = time.perf_counter() - started
+                best = timings.get(name, (float('inf'), float('inf')))
+                timings[name] = (min(best[0], copy_time), min(best[1], remove_time))
+        for name, (copy_time, remove_time) in timings.items():
+            logger.info(f"{name}: Kopieren {copy_time:.2f} s, Löschen {remove_time:.2f} s (bester von {rounds} Läufen)")
+
+        base, fast = timings["shutil"], timings["CopyEngine"]
+        logger.info(
+            f"Beschleunigung: Kopieren x{base[0] / fast[0]:.1f}, Löschen x{base[1] / fast[1]:.1f} "
+            f"({engine.workers} Threads, Reflink: {engine.reflink}, copy_file_range: {engine.copy_file_range})"
+        )
+
 def main():
     parser = argparse.ArgumentParser(
         description="GhostShield: Schirmt Dateien/Verzeichnisse ab, indem sie gesichert und durch eine Attrappe ersetzt werden.",
@@ -273,17 +1289,45 @@ def main():
 
     subparsers = parser.add_subparsers(dest='command', required=True, help='Verfügbare Befehle')
 
+    def add_batch_arguments(command_parser):
+        command_parser.add_argument('-f', '--from-file', type=str, help="Datei mit einem Pfad pro Zeile ('-' für stdin).")
+        command_parser.add_argument('-y', '--yes', action='store_true', help='Nicht nachfragen, alle destruktiven Schritte bestätigen.')
+        command_parser.add_argument('-j', '--jobs', type=int, default=BATCH_JOBS, help=f'Elemente gleichzeitig bearbeiten (Standard: {BATCH_JOBS}).')
+
     # Shield Befehl
-    shield_parser = subparsers.add_parser('shield', help='Schirmt eine Datei oder ein Verzeichnis ab.')
-    shield_parser.add_argument('path', type=str, help='Der Pfad zur Datei oder zum Verzeichnis, das abgeschirmt werden soll.')
+    shield_parser = subparsers.add_parser('shield', help='Schirmt Dateien oder Verzeichnisse ab.')
+    shield_parser.add_argument('paths', nargs='*', metavar='path', help="Pfade oder Glob-Muster (z.B. 'projekte/*/geheim'), die abgeschirmt werden sollen.")
+    add_batch_arguments(shield_parser)
+    shield_parser.add_argument('--full', action='store_true', help='Alle Dateien neu lesen statt nur geänderte (nicht inkrementell).')
+    shield_parser.add_argument('--force', action='store_true', help='Auch bereits abgeschirmte Elemente (leere Attrappen) erneut sichern.')
 
     # Unshield Befehl
-    unshield_parser = subparsers.add_parser('unshield', help='Stellt eine abgeschirmte Datei oder ein Verzeichnis wieder her.')
-    unshield_parser.add_argument('path', type=str, help='Der Pfad zur ursprünglichen Position der Datei oder des Verzeichnisses, das wiederhergestellt werden soll.')
+    unshield_parser = subparsers.add_parser('unshield', help='Stellt abgeschirmte Dateien oder Verzeichnisse wieder her.')
+    unshield_parser.add_argument('paths', nargs='*', metavar='path', help='Ursprüngliche Pfade oder Glob-Muster der Elemente, die wiederhergestellt werden sollen.')
+    add_batch_arguments(unshield_parser)
+    unshield_parser.add_argument('--force', action='store_true', help='Auch Elemente überschreiben, die keine leere Attrappe sind.')
+
+    # Diff Befehl
+    diff_parser = subparsers.add_parser('diff', help='Zeigt Änderungen gegenüber der letzten Backup-Version, ohne etwas zu kopieren.')
+    diff_parser.add_argument('paths', nargs='+', metavar='path', help='Pfade oder Glob-Muster der Elemente.')
+
+    # Resume Befehl
+    resume_parser = subparsers.add_parser('resume', help='Setzt einen unterbrochenen shield/unshield-Batch fort.')
+    resume_parser.add_argument('-y', '--yes', action='store_true', help='Nicht nachfragen.')
+    resume_parser.add_argument('--abandon', action='store_true', help='Den unterbrochenen Batch verwerfen statt fortsetzen.')
 
     # List Befehl
     list_parser = subparsers.add_parser('list', help='Listet alle abgeschirmten Elemente auf.')
 
+    # Reindex Befehl
+    reindex_parser = subparsers.add_parser('reindex', help='Baut den Index aus den Backups auf der Platte neu auf.')
+
+    # Benchmark Befehl
+    benchmark_parser = subparsers.add_parser('benchmark', help='Misst die Kopier-Engine gegen shutil an einem erzeugten Baum.')
+    benchmark_parser.add_argument('--files', type=int, default=20000, help='Anzahl der erzeugten Dateien (Standard: 20000).')
+    benchmark_parser.add_argument('--size', type=int, default=4096, help='Größe jeder Datei in Bytes (Standard: 4096).')
+    benchmark_parser.add_argument('--rounds', type=int, default=3, help='Messläufe je Verfahren, gewertet wird der beste (Standard: 3).')
+
     args = parser.parse_args()
 
     # Stellen Sie sicher, dass der Basisordner existiert
@@ -292,14 +1336,51 @@ def main():
         logger.error(f"Fehler: Das angegebene Basisverzeichnis '{base_dir_path}' existiert nicht oder ist kein Verzeichnis.")
         exit(1)
 
-    ghost_shield = GhostShield(base_dir_path)
+    if args.command == 'benchmark':
+        run_copy_benchmark(base_dir_path, args.files, args.size, args.rounds)
+        return
 
-    if args.command == 'shield':
-        ghost_shield.shield(args.path)
-    elif args.command == 'unshield':
-        ghost_shield.unshield(args.path)
+    if args.command in ('shield', 'unshield'):
+        try:
+            paths = expand_paths(args.paths, args.from_file)
+        except OSError as e:
+            logger.error(f"Fehler beim Lesen der Pfadliste '{args.from_file}': {e}")
+            exit(1)
+        if not paths:
+            logger.error("Fehler: Keine Pfade angegeben (Pfade, Glob-Muster oder --from-file).")
+            exit(1)
+        if args.from_file == '-' and not args.yes:
+            logger.error("Fehler: Mit '--from-file -' ist stdin belegt, bitte --yes angeben.")
+            exit(1)
+
+    ghost_shield = GhostShield(base_dir_path, incremental=not getattr(args, 'full', False))
+
+    if args.command in ('shield', 'unshield'):
+        # Ein einzelnes Element: Rückfrage je Schritt wie gehabt; ein Batch: eine Rückfrage für alle
+        confirm = confirm_action
+        if args.yes:
+            confirm = lambda prompt: True
+        elif len(paths) > 1:
+            verb = "abgeschirmt (Originale gelöscht)" if args.command == 'shield' else "wiederhergestellt (Attrappen gelöscht)"
+            if not confirm_action(f"Sollen {len(paths)} Elemente {verb} werden?"):
+                logger.info("Batch abgebrochen.")
+                return
+            confirm = lambda prompt: True
+        if not ghost_shield.run_batch(args.command, paths, args.jobs, confirm, force=getattr(args, 'force', False)):
+            exit(1)
+    elif args.command == 'diff':
+        for path in expand_paths(args.paths):
+            ghost_shield.diff(path)
+    elif args.command == 'resume':
+        if args.abandon:
+            ghost_shield.abandon_batch()
+        elif args.yes or confirm_action("Unterbrochenen Batch ohne weitere Rückfragen fortsetzen?"):
+            if not ghost_shield.run_batch('', [], BATCH_JOBS, lambda prompt: True, resume=True):
+                exit(1)
     elif args.command == 'list':
         ghost_shield.list_shielded()
+    elif args.command == 'reindex':
+        ghost_shield.reindex()
 
 if __name__ == "__main__":
     main()
@@ -324,11 +1405,38 @@ if __name__ == "__main__":
         
         Du wirst gefragt, ob die Attrappe gelöscht werden soll.
 
+    *   **Viele Elemente auf einmal (Batch):**
+        bash
+        python ghostshield.py shield 'projekte/*/geheim' notizen.txt
+        python ghostshield.py shield --from-file liste.txt --yes --jobs 8
+        find . -name '*.key' | python ghostshield.py shield -f - -y
+        
+        Bei mehreren Elementen wird nur einmal für alle gefragt, mit `--yes` gar nicht.
+        `shield` überspringt bereits abgeschirmte Elemente, `unshield` ersetzt nur leere Attrappen;
+        beides lässt sich mit `--force` erzwingen.
+
+    *   **Änderungen seit der letzten Version anzeigen (kopiert nichts):**
+        bash
+        python ghostshield.py diff mein_geheimer_ordner
+        
+        `A` = neu, `M` = geändert, `D` = gelöscht.
+
+    *   **Einen unterbrochenen Batch fortsetzen (z.B. nach Strg+C oder Absturz):**
+        bash
+        python ghostshield.py resume
+        python ghostshield.py resume --abandon
+        
+
     *   **Alle abgeschirmten Elemente auflisten:**
         bash
         python ghostshield.py list
         
 
+    *   **Index neu aufbauen (z.B. nach manuellen Änderungen im Backup-Ordner):**
+        bash
+        python ghostshield.py reindex
+        
+
     *   **Ein anderes Basisverzeichnis verwenden (Standard ist das aktuelle Verzeichnis):**
         Wenn du z.B. `/home/user/dokumente` abschirmen willst und `ghostshield.py` in `/home/user/tools` liegt:
         bash
@@ -343,6 +1451,9 @@ if __name__ == "__main__":
 **Wichtige Hinweise:**
 
 *   **Backup-Verzeichnis:** Standardmäßig werden Backups in einem versteckten Ordner `.ghostshield_backups` im angegebenen Basisverzeichnis gespeichert.
+*   **Deduplizierung:** Die Daten liegen als Chunks in `.ghostshield_backups/.ghostshield_store`, jede Backup-Version ist nur ein kleines Manifest. Wiederholtes Abschirmen schreibt nur geänderte Daten.
+*   **Inkrementell:** Gibt es schon eine Version, liest `shield` nur neue und geänderte Dateien (Vergleich über Größe, mtime und Inode). `--full` liest wieder alles.
+*   **Journal:** Ein Batch schreibt jeden Schritt vorab in `.ghostshield_backups/.ghostshield_journal`. `resume` macht dort weiter, fertige Elemente werden nicht noch einmal kopiert.
 *   **Log-Datei:** Alle Aktionen und Fehler werden in `ghostshield.log` im selben Verzeichnis wie das Skript protokolliert.
 *   **Bestätigungen:** Sei vorsichtig bei den Bestätigungsfragen. Falsche Eingaben können zum Datenverlust führen.
 *   **Relative Pfade:** Die relativen Pfade für die Backups werden vom `target_base_dir` aus berechnet. Das ist wichtig, um später die Backups dem richtigen Original zuordnen zu können.
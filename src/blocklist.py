@@ -0,0 +1,153 @@
+import hashlib
+from array import array
+from bisect import bisect_left
+
+
+# --- KOMPAKTER BLOCKLIST-INDEX ---
+# Statt eines Sets aus ~150k Python-Strings speichern wir pro Domain nur
+# einen stabilen 64-Bit-Hash in einem sortierten array('Q') (8 Byte/Eintrag).
+# Gesucht wird per Binärsuche, einmal pro Label-Suffix des Namens:
+#   exact    -> "example.com"   trifft nur genau example.com
+#   wildcard -> "*.example.com" trifft nur Subdomains von example.com
+#   suffix   -> beides (Standard für Hosts-Einträge)
+# Allowlist-Regeln haben immer Vorrang vor Blockregeln.
+# Ein Lookup kostet höchstens eine Binärsuche pro Label des Namens.
+# Bewusster Tausch (bench/blocklist_bench.py, ~150k Domains): 1,2 MB statt
+# 14,5 MB, dafür ~180k statt ~6M Lookups/s - für DNS-Last reicht das locker.
+
+def domain_hash(domain):
+    """ Stabiler 64-Bit-Hash eines (kleingeschriebenen) Domainnamens. """
+    return int.from_bytes(hashlib.blake2b(domain.encode(), digest_size=8).digest(), "little")
+
+
+def normalize(domain):
+    return domain.strip().strip(".").lower()
+
+
+def parse_rule(rule, include_subdomains=True):
+    """ Zerlegt eine Regel in (art, domain) mit art in exact/suffix/wildcard. """
+    rule = normalize(rule)
+    if rule.startswith("*."):
+        return "wildcard", rule[2:]
+    return ("suffix" if include_subdomains else "exact"), rule
+
+
+KINDS = ("exact", "suffix", "wildcard")
+
+
+def _sorted_hashes(hashes):
+    return array("Q", sorted(set(hashes)))
+
+
+def _contains(table, h):
+    i = bisect_left(table, h)
+    return i < len(table) and table[i] == h
+
+
+class RuleTables:
+    """ Drei sortierte Hash-Tabellen (exact, suffix, wildcard) für eine Regelliste. """
+    def __init__(self, exact=(), suffix=(), wildcard=()):
+        # Erwartet Iterables von domain_hash()-Werten
+        self.exact = _sorted_hashes(exact)
+        self.suffix = _sorted_hashes(suffix)
+        self.wildcard = _sorted_hashes(wildcard)
+
+    @classmethod
+    def from_sorted(cls, exact, suffix, wildcard):
+        # Bereits sortierte Tabellen ohne Kopie übernehmen (z.B. memoryviews aus einem mmap)
+        tables = cls.__new__(cls)
+        tables.exact, tables.suffix, tables.wildcard = exact, suffix, wildcard
+        return tables
+
+    def match(self, name):
+        h = domain_hash(name)
+        if _contains(self.suffix, h) or (self.exact and _contains(self.exact, h)):
+            return True
+        # Alle echten Eltern-Suffixe prüfen: a.b.example.com -> b.example.com, example.com, com
+        i = name.find(".")
+        while i != -1:
+            name = name[i + 1:]
+            h = domain_hash(name)
+            if _contains(self.suffix, h) or (self.wildcard and _contains(self.wildcard, h)):
+                return True
+            i = name.find(".")
+        return False
+
+    def __len__(self):
+        return len(self.exact) + len(self.suffix) + len(self.wildcard)
+
+    def memory_bytes(self):
+        return sum(len(t) * t.itemsize for t in (self.exact, self.suffix, self.wildcard))
+
+
+class BlocklistIndex:
+    def __init__(self, block=None, allow=None):
+        self.block = block or RuleTables()
+        self.allow = allow or RuleTables()
+
+    @classmethod
+    def from_rules(cls, block_rules, allow_rules=(), include_subdomains=True):
+        builder = IndexBuilder(include_subdomains)
+        for rule in block_rules:
+            builder.add_rule(rule)
+        for rule in allow_rules:
+            builder.add_rule(rule, allow=True)
+        return builder.build()
+
+    def is_blocked(self, qname):
+        name = normalize(qname)
+        if not name or not self.block.match(name):
+            return False
+        return not self.allow.match(name)
+
+    def __contains__(self, qname):
+        return self.is_blocked(qname)
+
+    def __len__(self):
+        return len(self.block)
+
+    def memory_bytes(self):
+        return self.block.memory_bytes() + self.allow.memory_bytes()
+
+
+class IndexBuilder:
+    """
+    Sammelt Regeln direkt als Hashes in array('Q') - beim Laden großer Listen
+    entstehen so keine Millionen kurzlebiger Strings. Mehrere Builder (z.B.
+    einer pro Quelle) lassen sich mit merge() zusammenführen.
+    """
+    def __init__(self, include_subdomains=True):
+        self.include_subdomains = include_subdomains
+        self.tables = {(allow, kind): array("Q") for allow in (False, True) for kind in KINDS}
+
+    def add(self, domain, kind=None, allow=False):
+        # kind=None: einfache Domain, je nach include_subdomains exact oder suffix
+        if kind is None:
+            kind = "suffix" if self.include_subdomains else "exact"
+        domain = normalize(domain)
+        if domain:
+            self.tables[allow, kind].append(domain_hash(domain))
+
+    def add_rule(self, rule, allow=False):
+        kind, domain = parse_rule(rule, self.include_subdomains)
+        if domain:
+            self.tables[allow, kind].append(domain_hash(domain))
+
+    def compact(self):
+        """ Sortiert und entdoppelt alle Tabellen. """
+        for key, table in self.tables.items():
+            self.tables[key] = _sorted_hashes(table)
+        return self
+
+    def merge(self, other):
+        for key, table in other.tables.items():
+            self.tables[key].extend(table)
+        return self
+
+    def __len__(self):
+        return sum(len(self.tables[False, kind]) for kind in KINDS)
+
+    def build(self):
+        def tables(allow):
+            return RuleTables(*(self.tables[allow, kind] for kind in KINDS))
+        return BlocklistIndex(tables(False), tables(True))
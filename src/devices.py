@@ -0,0 +1,77 @@
+import os
+import queue
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+
+# --- GERÄTENAMEN IM HINTERGRUND ---
+# Reverse-DNS (PTR) kann Sekunden dauern und darf die DNS-Antwort nicht
+# aufhalten. get() liefert nur, was schon im Cache liegt, und stößt sonst
+# eine Auflösung in einem Hintergrund-Thread an. Fehlschläge werden ebenfalls
+# (kürzer) gecacht, der Cache ist per LRU begrenzt.
+class DeviceNames:
+    def __init__(self, max_entries=1024, ttl=3600, negative_ttl=300, workers=2):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.workers = workers
+        self._entries = OrderedDict()    # ip -> (name oder None, expires_at)
+        self._pending = set()
+        self._queue = queue.Queue(maxsize=256)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def get(self, ip):
+        """ Gecachter Name oder None; plant die Auflösung ein, falls nötig. """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry is not None:
+                self._entries.move_to_end(ip)
+                if entry[1] > now:
+                    return entry[0]
+            if ip in self._pending:
+                return entry[0] if entry else None
+            self._pending.add(ip)
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(ip)
+        except queue.Full:
+            # Beim nächsten Mal erneut versuchen
+            with self._lock:
+                self._pending.discard(ip)
+        return entry[0] if entry else None
+
+    def _ensure_workers(self):
+        # Threads überleben kein fork() - pro Prozess neu starten
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        for _ in range(self.workers):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        while True:
+            ip = self._queue.get()
+            try:
+                # Fragt den Router: "Wer ist diese IP?"
+                name = socket.gethostbyaddr(ip)[0]
+                ttl = self.ttl
+            except (OSError, UnicodeError):
+                name = None
+                ttl = self.negative_ttl
+            with self._lock:
+                self._pending.discard(ip)
+                self._entries[ip] = (name, time.monotonic() + ttl)
+                self._entries.move_to_end(ip)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "pending": len(self._pending)}
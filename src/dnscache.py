@@ -0,0 +1,112 @@
+import struct
+import threading
+import time
+from collections import OrderedDict
+from wire import edns_options, scan_records, truncated, QTYPE_OPT, QTYPE_SOA, RCODE_NOERROR, RCODE_NXDOMAIN
+
+
+# --- ANTWORT-CACHE ---
+# Speichert Upstream-Antworten als Wire-Format (bytes), Schlüssel ist
+# (qname, qtype, qclass, EDNS ja/nein, DO-Bit): eine EDNS/DNSSEC-Antwort mit
+# OPT, RRSIGs oder mehr als 512 Bytes darf nie an einen Client ohne EDNS
+# gehen. Ist ein Treffer größer als der UDP-Puffer des Clients, antworten
+# wir mit TC (der Client fragt dann per TCP). TTLs werden beim Auslesen heruntergezählt,
+# negative Antworten (NXDOMAIN/NODATA) werden nach RFC 2308 gecacht.
+# Beim Ablegen merken wir uns die Positionen der TTL-Felder, ein Treffer
+# patcht dann nur ID, Frage und TTLs in einer Kopie - ohne DNS-Parser.
+class DNSCache:
+    def __init__(self, max_entries=10000, min_ttl=0, max_ttl=86400, max_neg_ttl=3600):
+        self.max_entries = max_entries
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.max_neg_ttl = max_neg_ttl
+        self._entries = OrderedDict()  # key -> (packet, ttl_fields, stored_at, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(question, edns, do):
+        return (question.qname, question.qtype, question.qclass, edns, do)
+
+    def get(self, packet, question):
+        """ Liefert eine fertige Antwort (bytes) für die Anfrage oder None. """
+        edns, do, udp_size = edns_options(packet, question)
+        key = self.key(question, edns, do)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            cached, ttl_fields, stored_at, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        if len(cached) > udp_size:
+            return truncated(packet[0:2] + cached[2:12] + packet[12:question.end], question.end)
+        reply = bytearray(cached)
+        # ID und Frage (inkl. Groß/Klein-Schreibung) aus der Anfrage übernehmen
+        reply[0:2] = packet[0:2]
+        reply[12:question.end] = packet[12:question.end]
+        # TTLs um die vergangene Zeit verringern, nie länger als der Cache-Eintrag
+        elapsed = int(now - stored_at)
+        remaining = int(expires_at - now)
+        for offset, ttl in ttl_fields:
+            struct.pack_into("!I", reply, offset, max(min(ttl - elapsed, remaining), 0))
+        return bytes(reply)
+
+    def put(self, packet, question, reply):
+        """ Legt die Upstream-Antwort (bytes) auf die Anfrage packet ab, sofern sie cachebar ist. """
+        try:
+            flags, records = scan_records(reply, question.end)
+        except (IndexError, ValueError, struct.error):
+            return
+        ttl = self._cache_ttl(reply, flags, records)
+        if ttl is None or ttl <= 0:
+            return
+        # OPT trägt im TTL-Feld EDNS-Flags, das darf nicht heruntergezählt werden
+        ttl_fields = [(offset, rr_ttl) for _, rtype, offset, rr_ttl, _, _ in records if rtype != QTYPE_OPT]
+        now = time.monotonic()
+        edns, do, _ = edns_options(packet, question)
+        key = self.key(question, edns, do)
+        with self._lock:
+            self._entries[key] = (bytes(reply), ttl_fields, now, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _cache_ttl(self, reply, flags, records):
+        if flags & 0x0200:  # TC
+            return None
+        rcode = flags & 0x000F
+        answers = [ttl for section, _, _, ttl, _, _ in records if section == 0]
+        if rcode == RCODE_NOERROR and answers:
+            ttls = [ttl for section, rtype, _, ttl, _, _ in records if section < 2 and rtype != QTYPE_OPT]
+            return min(max(min(ttls), self.min_ttl), self.max_ttl)
+        if rcode in (RCODE_NXDOMAIN, RCODE_NOERROR):
+            # RFC 2308: negative TTL = min(SOA-TTL, SOA.MINIMUM); ohne SOA nicht cachen
+            for section, rtype, _, ttl, rdata, rdlength in records:
+                if section == 1 and rtype == QTYPE_SOA and rdlength >= 20:
+                    minimum = struct.unpack_from("!I", reply, rdata + rdlength - 4)[0]
+                    return min(ttl, minimum, self.max_neg_ttl)
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,257 @@
+import asyncio
+import os
+import random
+import socket
+import struct
+import multiprocessing
+import threading
+
+
+# --- ASYNC DNS FRONTEND ---
+# Ein Event-Loop bedient UDP und TCP. Die Upstream-Anfragen teilen sich einen
+# kleinen Satz nicht-blockierender UDP-Sockets (je ein zufälliger Port, der
+# älteste wird regelmäßig ersetzt); Antworten werden über eine eigene,
+# zufällige Transaktions-ID der jeweiligen Anfrage zugeordnet und nur auf dem
+# Socket angenommen, über den die Anfrage ging. Welcher
+# Upstream gefragt wird, entscheidet der UpstreamPool. Der Resolver muss
+# begin()/forwarded()/failed()/finish() anbieten (siehe GhostResolver) und
+# arbeitet direkt auf den rohen Paketen - hier wird nichts geparst.
+
+MUX_SOCKETS = 8          # Upstream-Sockets, jede Anfrage nimmt zufällig einen
+MUX_ROTATE_SECONDS = 30  # So oft wird der älteste Socket durch einen mit neuem Port ersetzt
+MUX_CLOSE_DELAY = 10     # Ersetzter Socket nimmt so lange noch Antworten an (> Upstream-Timeout)
+
+
+class _MuxSocket(asyncio.DatagramProtocol):
+    def __init__(self, mux):
+        self.mux = mux
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.mux.received(self, data, addr)
+
+    def error_received(self, exc):
+        # z.B. ICMP "port unreachable" - die wartenden Anfragen laufen in den Timeout
+        pass
+
+
+class UpstreamMux:
+    def __init__(self, sockets=MUX_SOCKETS, rotate_seconds=MUX_ROTATE_SECONDS):
+        self.pending = {}  # upstream txid -> (Future, erlaubte Absender, _MuxSocket, Frage-Bytes)
+        self.sockets = []
+        self.retired = []  # ersetzte Sockets, die noch späte Antworten annehmen
+        self.size = sockets
+        self.rotate_seconds = rotate_seconds
+        self._local_addr = None
+        self._rotator = None
+
+    async def start(self, local_addr=("0.0.0.0", 0)):
+        self._local_addr = local_addr
+        for _ in range(self.size):
+            self.sockets.append(await self._open())
+        if self.rotate_seconds:
+            self._rotator = asyncio.ensure_future(self._rotate())
+        return self
+
+    async def _open(self):
+        _, sock = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _MuxSocket(self), local_addr=self._local_addr)
+        return sock
+
+    async def _rotate(self):
+        # Ein fester Quellport ließe Angreifern nur noch die 16 Bit der ID zu erraten
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.rotate_seconds)
+            try:
+                new = await self._open()
+            except OSError as e:
+                print(f"Fehler beim Öffnen eines Upstream-Sockets: {e}")
+                continue
+            old = self.sockets.pop(0)
+            self.sockets.append(new)
+            self.retired.append(old)
+            loop.call_later(MUX_CLOSE_DELAY, self._retire, old)
+
+    def _retire(self, sock):
+        if sock in self.retired:
+            sock.transport.close()
+            self.retired.remove(sock)
+
+    def received(self, sock, data, addr):
+        if len(data) < 12:
+            return
+        entry = self.pending.get(struct.unpack("!H", data[:2])[0])
+        # Nur Antworten von Servern annehmen, die wir unter dieser ID über diesen
+        # Socket gefragt haben, und nur mit exakt derselben Frage (0x20-Schreibweise)
+        if (entry is not None and entry[2] is sock and addr in entry[1] and not entry[0].done()
+                and data[12:12 + len(entry[3])] == entry[3]):
+            entry[0].set_result((data, addr))
+
+    def open(self, senders, question=b""):
+        """ Reserviert eine freie, zufällige Transaktions-ID auf einem zufälligen Socket. """
+        while True:
+            txid = random.getrandbits(16)
+            if txid not in self.pending:
+                break
+        future = asyncio.get_running_loop().create_future()
+        self.pending[txid] = (future, senders, random.choice(self.sockets), question)
+        return txid, future
+
+    def send(self, wire, address):
+        entry = self.pending[struct.unpack_from("!H", wire)[0]]
+        entry[2].transport.sendto(wire, address)
+
+    def linger(self, txid, address, delay, answered, expired):
+        """
+        Hält die ID nach gewonnenem Hedge noch delay Sekunden offen: antwortet
+        address bis dahin, wird answered() gerufen, sonst expired().
+        """
+        future = asyncio.get_running_loop().create_future()
+        _, _, sock, question = self.pending[txid]
+        self.pending[txid] = (future, (address,), sock, question)
+        timer = asyncio.get_running_loop().call_later(max(delay, 0), future.cancel)
+
+        def done(future):
+            timer.cancel()
+            self.close(txid)
+            if future.cancelled():
+                expired()
+            else:
+                answered()
+        future.add_done_callback(done)
+
+    def close(self, txid):
+        self.pending.pop(txid, None)
+
+    def shutdown(self):
+        if self._rotator is not None:
+            self._rotator.cancel()
+        for sock in self.sockets + self.retired:
+            sock.transport.close()
+        self.sockets, self.retired = [], []
+
+
+async def tcp_query(packet, upstream, timeout=2.0):
+    """ Einzelne Anfrage per TCP, für Antworten die per UDP abgeschnitten (TC) wurden. """
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(*upstream), timeout)
+    try:
+        writer.write(struct.pack("!H", len(packet)) + packet)
+        await writer.drain()
+        length = struct.unpack("!H", await asyncio.wait_for(reader.readexactly(2), timeout))[0]
+        return await asyncio.wait_for(reader.readexactly(length), timeout)
+    finally:
+        writer.close()
+
+
+class DNSFrontend:
+    def __init__(self, resolver, pool, concurrency=256):
+        self.resolver = resolver
+        self.pool = pool
+        self.concurrency = concurrency
+        self.slots = None
+        self.mux = None
+
+    async def handle(self, data, client_ip, tcp=False):
+        # Zu kurz oder selbst eine Antwort (QR gesetzt): verwerfen, sonst drohen Antwort-Schleifen
+        if len(data) < 12 or data[2] & 0x80:
+            return None
+        resolver = self.resolver
+        query = resolver.begin(data, client_ip)
+        if query.reply is None:
+            try:
+                async with self.slots:
+                    packet, upstream = await self.pool.query_async(self.mux, data)
+                    if tcp and packet[2] & 0x02:
+                        packet = await tcp_query(data, upstream.address, self.pool.timeout)
+                resolver.forwarded(query, packet)
+            except asyncio.TimeoutError:
+                resolver.failed(query, "upstream timeout")
+            except Exception as e:
+                resolver.failed(query, e)
+        return resolver.finish(query)
+
+    async def start(self, address, port, reuse_port=False):
+        loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.mux = await UpstreamMux().start()
+        await loop.create_datagram_endpoint(
+            lambda: _UDPServer(self), local_addr=(address, port),
+            reuse_port=reuse_port)
+        return await asyncio.start_server(
+            self._serve_tcp, address, port, reuse_address=True, reuse_port=reuse_port)
+
+    async def _serve_tcp(self, reader, writer):
+        client_ip = writer.get_extra_info("peername")[0]
+        try:
+            while True:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                reply = await self.handle(await reader.readexactly(length), client_ip, tcp=True)
+                if reply is None:
+                    break
+                writer.write(struct.pack("!H", len(reply)) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class _UDPServer(asyncio.DatagramProtocol):
+    def __init__(self, frontend):
+        self.frontend = frontend
+        self.transport = None
+        self.tasks = set()  # Referenzen halten, sonst räumt der GC laufende Tasks ab
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        task = asyncio.ensure_future(self._reply(data, addr))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _reply(self, data, addr):
+        reply = await self.frontend.handle(data, addr[0])
+        if reply is not None:
+            self.transport.sendto(reply, addr)
+
+
+def _run(frontend, address, port, reuse_port, worker_init=None):
+    if worker_init is not None:
+        worker_init()
+
+    async def main():
+        server = await frontend.start(address, port, reuse_port)
+        async with server:
+            await server.serve_forever()
+    asyncio.run(main())
+
+
+def start_frontend(resolver, address, port, pool, concurrency=256, workers=1, worker_init=None):
+    """
+    Startet den asyncio-Server im Hintergrund. Mit workers > 1 werden zusätzlich
+    Prozesse geforkt, die sich Port 53 per SO_REUSEPORT teilen; worker_init
+    läuft zu Beginn in jedem dieser Prozesse. Statistik und Log im Dashboard
+    zeigen dabei nur die Anfragen des Hauptprozesses.
+    Muss dann vor allen anderen Threads laufen: ein Kind erbt sonst womöglich
+    ein gerade gehaltenes Lock (Metrics, DeviceNames ...) und hängt für immer.
+    """
+    reuse_port = workers > 1 and hasattr(socket, "SO_REUSEPORT")
+    if workers > 1 and not reuse_port:
+        print(">>> SO_REUSEPORT nicht verfügbar, starte nur einen DNS-Worker.")
+    frontend = DNSFrontend(resolver, pool, concurrency)
+    if reuse_port:
+        if threading.active_count() > 1:
+            raise RuntimeError("start_frontend() mit Workern vor allen anderen Threads aufrufen")
+        ctx = multiprocessing.get_context("fork")
+        for _ in range(workers - 1):
+            ctx.Process(target=_run, args=(frontend, address, port, True, worker_init), daemon=True).start()
+    thread = threading.Thread(
+        target=_run, args=(frontend, address, port, reuse_port), daemon=True)
+    thread.start()
+    print(f">>> Async DNS läuft auf {address}:{port} (PID {os.getpid()}, {workers} Worker)")
+    return thread
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from blocklist import IndexBuilder
+
+
+# --- GRAVITY: BLOCKLISTEN LADEN ---
+# Quellen (URL oder lokale Datei) werden zeilenweise gestreamt und direkt in
+# Hash-Tabellen übersetzt, ohne die ganze Datei im Speicher zu halten.
+# Erkannte Formate (auch gemischt in einer Datei):
+#   Hosts:       "0.0.0.0 ads.example.com"   (auch 127.0.0.1, mehrere Namen)
+#   Domainliste: "ads.example.com" oder "*.example.com"
+#   Adblock:     "||ads.example.com^"         Ausnahme: "@@||example.com^"
+# Jede Quelle merkt sich ETag/Last-Modified (bzw. mtime bei Dateien) und
+# ihre geparsten Tabellen; unveränderte Listen werden nicht neu geladen.
+
+HOSTS_IPS = {"0.0.0.0", "127.0.0.1", "::", "::1"}
+HOSTS_IGNORE = {"localhost", "localhost.localdomain", "local", "broadcasthost",
+                "0.0.0.0", "ip6-localhost", "ip6-loopback", "ip6-localnet",
+                "ip6-mcastprefix", "ip6-allnodes", "ip6-allrouters", "ip6-allhosts"}
+DOMAIN_RE = re.compile(r"^[a-z0-9_-]+(\.[a-z0-9_-]+)*\.?$")
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_line(line):
+    """ Liefert (domain, art, allow)-Tupel einer Zeile; art None = einfache Domain. """
+    line = line.strip().lower()
+    if not line or line[0] in "#![":
+        return
+    if line.startswith("||") or line.startswith("@@||"):
+        allow = line.startswith("@@")
+        domain = re.split(r"[\^$]", line[4 if allow else 2:], maxsplit=1)[0]
+        if DOMAIN_RE.match(domain):
+            # Adblock-Regeln gelten immer auch für Subdomains
+            yield domain, "suffix", allow
+        return
+    parts = line.split("#", 1)[0].split()
+    if len(parts) >= 2 and parts[0] in HOSTS_IPS:
+        names = parts[1:]
+    elif len(parts) == 1:
+        names = parts
+    else:
+        return
+    for name in names:
+        kind = None
+        if name.startswith("*."):
+            name, kind = name[2:], "wildcard"
+        if name not in HOSTS_IGNORE and DOMAIN_RE.match(name):
+            yield name, kind, False
+
+
+class Source:
+    def __init__(self, location, include_subdomains=True):
+        self.location = location
+        self.include_subdomains = include_subdomains
+        self.is_url = location.startswith(("http://", "https://"))
+        self.etag = None
+        self.last_modified = None
+        self.file_state = None
+        self.builder = None  # Geparste Tabellen des letzten erfolgreichen Ladens
+
+    def _fetch_url(self, session):
+        headers = {}
+        if self.builder is not None:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+        r = session.get(self.location, headers=headers, stream=True, timeout=30)
+        with r:
+            if r.status_code == 304:
+                return None
+            r.raise_for_status()
+            r.encoding = r.encoding or "utf-8"
+            etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+            builder = self._parse(r.iter_lines(chunk_size=CHUNK_SIZE, decode_unicode=True))
+        self.etag, self.last_modified = etag, last_modified
+        return builder
+
+    def _read_file(self):
+        st = os.stat(self.location)
+        state = (st.st_mtime_ns, st.st_size)
+        if self.builder is not None and state == self.file_state:
+            return None
+        with open(self.location, encoding="utf-8", errors="ignore", buffering=CHUNK_SIZE) as f:
+            builder = self._parse(f)
+        self.file_state = state
+        return builder
+
+    def _parse(self, lines):
+        builder = IndexBuilder(self.include_subdomains)
+        for line in lines:
+            for domain, kind, allow in parse_line(line):
+                builder.add(domain, kind, allow)
+        return builder.compact()
+
+    def refresh(self, session):
+        """ Lädt die Quelle neu, falls sie sich geändert hat. True = geändert. """
+        builder = self._fetch_url(session) if self.is_url else self._read_file()
+        if builder is None:
+            return False
+        self.builder = builder
+        return True
+
+
+class Gravity:
+    def __init__(self, locations, allowlist=(), include_subdomains=True):
+        self.sources = [Source(location, include_subdomains) for location in locations]
+        self.allowlist = allowlist
+        self.include_subdomains = include_subdomains
+        self.failed = []  # Quellen, deren letztes Laden fehlgeschlagen ist
+        self._lock = threading.Lock()
+
+    def config_hash(self):
+        """ 64-Bit-Fingerabdruck der Konfiguration (Quellen, Allowlist, Subdomains) für den Snapshot-Header. """
+        config = json.dumps([[source.location for source in self.sources], list(self.allowlist),
+                             self.include_subdomains])
+        return int.from_bytes(hashlib.sha256(config.encode()).digest()[:8], "little")
+
+    def refresh(self):
+        """ Aktualisiert alle Quellen. Liefert True, wenn sich mindestens eine geändert hat. """
+        import requests
+        changed = False
+        failed = []
+        with self._lock, requests.Session() as session:
+            for source in self.sources:
+                try:
+                    changed |= source.refresh(session)
+                except Exception as e:
+                    # Alte Daten dieser Quelle behalten, die anderen trotzdem laden
+                    print(f"Fehler beim Laden von {source.location}: {e}")
+                    failed.append(source.location)
+        self.failed = failed
+        return changed
+
+    def missing(self):
+        """ Quellen, die noch nie geladen werden konnten (ein Index daraus wäre unvollständig). """
+        with self._lock:
+            return [source.location for source in self.sources if source.builder is None]
+
+    def build(self):
+        """ Fügt alle Quellen plus Allowlist zu einem neuen BlocklistIndex zusammen. """
+        merged = IndexBuilder(self.include_subdomains)
+        with self._lock:
+            for source in self.sources:
+                if source.builder is not None:
+                    merged.merge(source.builder)
+        for rule in self.allowlist:
+            merged.add_rule(rule, allow=True)
+        return merged.build()
@@ -0,0 +1,102 @@
+import json
+import queue
+import threading
+import time
+
+
+# --- LIVE-UPDATES (Server-Sent Events) ---
+# Ein Hintergrund-Thread fragt alle INTERVAL Sekunden die Quelle nach
+# Änderungen (neue Log-Einträge, geänderte Zähler). Gibt es welche, wird das
+# Event EINMAL serialisiert und dieselben Bytes an alle Abonnenten verteilt.
+# Jeder Abonnent hat eine kleine Queue; ist sie voll, kommt der Client nicht
+# hinterher und wird getrennt (der Browser verbindet sich neu und bekommt
+# dann wieder einen vollständigen Stand).
+
+def encode_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class Subscriber:
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        # Platz für das Ende-Signal schaffen, damit der wartende Stream aufwacht
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.queue.put_nowait(None)
+
+
+class Broadcaster:
+    def __init__(self, source, interval=0.5, max_queue=32, keepalive=15):
+        # source.delta(): Änderungen seit dem letzten Aufruf oder None
+        # source.snapshot(): vollständiger Stand zum letzten delta()
+        self.source = source
+        self.interval = interval
+        self.max_queue = max_queue
+        self.keepalive = keepalive
+        self.dropped = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._tick_lock = threading.Lock()   # init und Deltas dürfen sich nicht überschneiden
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def subscribe(self):
+        subscriber = Subscriber(self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, chunk):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(chunk)
+            except queue.Full:
+                # Zu langsam: trennen statt Speicher anzuhäufen
+                self.dropped += 1
+                self.unsubscribe(subscriber)
+                subscriber.close()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._tick_lock:
+                delta = self.source.delta()
+                if delta:
+                    self.publish(encode_event("delta", delta))
+
+    def stream(self):
+        """ Generator für die Flask-Response: erst der volle Stand, dann Deltas. """
+        with self._tick_lock:
+            subscriber = self.subscribe()
+            initial = encode_event("init", self.source.snapshot())
+        try:
+            yield initial
+            while True:
+                try:
+                    chunk = subscriber.queue.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield b": ping\n\n"
+                    continue
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "dropped": self.dropped}
@@ -1,118 +1,456 @@
+import os
 import threading
 import time
-import socket
-from flask import Flask, render_template, jsonify
-from dnslib import DNSRecord, QTYPE, RR, A
+from flask import Flask, Response, render_template, jsonify, request
+from dnslib import DNSRecord
 from dnslib.server import DNSServer, BaseResolver
+from dnscache import DNSCache
+from blocklist import BlocklistIndex
+from frontend import start_frontend
+from upstream import UpstreamPool, parse_server
+from devices import DeviceNames
+from gravity import Gravity
+from snapshot import save_snapshot, open_snapshot, SnapshotError
+from querylog import QueryRing, QueryHistory
+from metrics import Metrics, percentile, prometheus
+from live import Broadcaster
+from wire import parse_question, same_question, error_response, BlockTemplates, RCODE_FORMERR
+from tracing import Tracer, StackSampler
 
 # --- KONFIGURATION ---
 # Wir nutzen eine aggressivere Liste für Werbung, aber lassen Google Dienste leben
-BLOCKLIST_URL = "https://raw.githubusercontent.com/StevenBlack/hosts/master/hosts"
-UPSTREAM_DNS = "8.8.8.8"  # Google DNS
+# Mehrere Quellen möglich: URLs oder lokale Dateien (Hosts-, Domain- oder Adblock-Format)
+BLOCKLIST_SOURCES = [
+    "https://raw.githubusercontent.com/StevenBlack/hosts/master/hosts",
+]
+GRAVITY_UPDATE_INTERVAL = 24 * 3600  # Sekunden zwischen zwei Prüfungen auf neue Listen
+# Kompilierte Blockliste für sofortigen Start ohne Netz (None = abschalten)
+GRAVITY_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gravity.snap")
+SNAPSHOT_CHECK_INTERVAL = 60  # Worker-Prozesse prüfen so oft auf einen neuen Snapshot
+# Upstream-Pool (IP oder IP:Port); der schnellste gesunde Server wird zuerst gefragt
+UPSTREAM_SERVERS = ["8.8.8.8", "1.1.1.1", "9.9.9.9"]  # Google, Cloudflare, Quad9
 UPSTREAM_PORT = 53
 WEB_PORT = 80             # Oder 8080, falls 80 belegt ist
 DNS_PORT = 53
 HOST_IP = "0.0.0.0"
+ASYNC_DNS = True          # asyncio-Server statt dnslib-Thread pro Anfrage
+DNS_WORKERS = 1           # >1: zusätzliche Prozesse per SO_REUSEPORT (nur Linux/BSD, braucht GRAVITY_SNAPSHOT)
+UPSTREAM_CONCURRENCY = 256  # Max. gleichzeitige Anfragen an den Upstream
+UPSTREAM_TIMEOUT = 2      # Sekunden
+UPSTREAM_MAX_FAILS = 3    # Fehlschläge in Folge, bis ein Server ausgesperrt wird
+UPSTREAM_EJECT_SECONDS = 30  # Erste Sperrzeit, verdoppelt sich bei jedem weiteren Ausfall
+UPSTREAM_0X20 = True      # Zufällige Groß/Klein-Schreibung gegen gefälschte Antworten (aus, falls ein Upstream sie nicht zurückgibt)
+CACHE_SIZE = 10000        # Max. Anzahl gecachter Antworten (LRU)
+CACHE_MIN_TTL = 0         # Untergrenze für Cache-TTL in Sekunden
+CACHE_MAX_TTL = 86400     # Obergrenze für Cache-TTL in Sekunden
+DEVICE_CACHE_SIZE = 1024  # Max. Anzahl gemerkter Gerätenamen
+DEVICE_NAME_TTL = 3600    # Gerätename gilt so lange (Sekunden)
+DEVICE_NEGATIVE_TTL = 300 # Unbekannte Geräte erst nach so vielen Sekunden erneut fragen
+LOG_RING_SIZE = 4096      # Letzte Anfragen im RAM (Ringpuffer)
+LOG_DISPLAY = 50          # So viele davon zeigt das Dashboard live
+LIVE_INTERVAL = 0.5       # Sekunden, über die Änderungen für das Dashboard gesammelt werden
+LIVE_MAX_QUEUE = 32       # Unverschickte Updates pro Browser, danach wird er getrennt
+# Dauerhafte Query-Historie (SQLite, None = abschalten)
+HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.db")
+HISTORY_DAYS = 7          # Ältere Einträge werden gelöscht
+TRACE_QUERIES = False     # Dauer jeder Station messen (kostet ein paar µs pro Anfrage; zur Laufzeit per /api/debug/tracing)
+SLOW_QUERY_MS = 100       # Anfragen ab dieser Dauer landen unter /api/debug/slow
+SLOW_QUERY_BUFFER = 100   # So viele langsame Anfragen werden gemerkt
+PROFILE_MAX_SECONDS = 120 # Obergrenze für eine Profiler-Messung (/api/debug/profile)
+BLOCK_SUBDOMAINS = True   # Geblockte Domains blocken auch alle Subdomains
+# Antwort für geblockte Namen: "null" (A 0.0.0.0 / AAAA ::, sonst leer), "nxdomain" oder "nodata"
+BLOCK_MODE = "null"
+BLOCK_TTL = 60            # So lange dürfen Clients die Block-Antwort cachen
+# Ausnahmen, die nie geblockt werden ("example.com" inkl. Subdomains, "*.example.com" nur Subdomains)
+ALLOWLIST = []
 
 # --- SPEICHER ---
-blocked_domains = set()
-logs = []
-stats = {"blocked": 0, "allowed": 0, "total": 0}
-
-# Cache für Gerätenamen (damit wir nicht jedes Mal fragen müssen)
-device_cache = {}
+blocklist = BlocklistIndex()
+query_log = QueryRing(LOG_RING_SIZE)
+metrics = Metrics()
+dns_cache = DNSCache(CACHE_SIZE, CACHE_MIN_TTL, CACHE_MAX_TTL)
+query_history = None
+block_templates = BlockTemplates(BLOCK_MODE, BLOCK_TTL)
+tracer = Tracer(metrics, TRACE_QUERIES, SLOW_QUERY_MS / 1000, SLOW_QUERY_BUFFER)
+profiler = StackSampler()
+upstream_pool = UpstreamPool([parse_server(s, UPSTREAM_PORT) for s in UPSTREAM_SERVERS],
+                             UPSTREAM_TIMEOUT, UPSTREAM_MAX_FAILS, UPSTREAM_EJECT_SECONDS,
+                             case_randomization=UPSTREAM_0X20)
 
 app = Flask(__name__)
 
 # --- HELFER: GERÄTENAMEN FINDEN ---
+UNKNOWN_DEVICE = "Unknown Device"
+
+# Cache für Gerätenamen (damit wir nicht jedes Mal fragen müssen).
+# Das Log speichert nur die IP, der Name wird beim Anzeigen nachgeschlagen
+# und erscheint so automatisch, sobald er aufgelöst ist.
+device_names = DeviceNames(DEVICE_CACHE_SIZE, DEVICE_NAME_TTL, DEVICE_NEGATIVE_TTL)
+
 def get_device_name(ip):
-    if ip in device_cache:
-        return device_cache[ip]
-    try:
-        # Fragt den Router: "Wer ist diese IP?"
-        hostname = socket.gethostbyaddr(ip)[0]
-        device_cache[ip] = hostname
-        return hostname
-    except:
-        return "Unknown Device"
+    # Blockiert nie: unbekannte Namen werden im Hintergrund nachgeschlagen
+    return device_names.get(ip) or UNKNOWN_DEVICE
 
 # --- 1. DER DNS RESOLVER (Die Logik) ---
+# Eine Anfrage läuft in drei Schritten durch den Resolver:
+#   begin()     -> Blocklist + Cache, setzt query.reply falls lokal beantwortet
+#   forwarded() -> Upstream-Antwort übernehmen (bzw. failed() bei Fehler)
+#   finish()    -> Statistik + Log, gibt die Antwort zurück
+# So können der dnslib-Thread-Server und der asyncio-Server dieselbe Logik nutzen.
+# Gearbeitet wird nur auf den rohen Paketen (bytes), siehe wire.py.
+# Ist das Tracing an, setzt jede Station eine Marke in query.trace.
+class Query:
+    __slots__ = ("packet", "question", "reply", "qname", "client_ip", "device_name", "timestamp", "started",
+                 "status", "trace")
+
+    def __init__(self, packet, client_ip):
+        self.started = time.monotonic()
+        self.timestamp = time.time()
+        self.trace = trace = tracer.begin(self.started)
+        self.packet = packet
+        self.question = parse_question(packet)
+        self.reply = None
+        self.qname = self.question.qname if self.question else ""
+        if trace:
+            trace.mark("parse")
+        self.client_ip = client_ip
+        self.device_name = get_device_name(client_ip)
+        if trace:
+            trace.mark("device")
+        self.status = "ALLOWED"
+
+    def info(self):
+        return {"time": time.strftime("%H:%M:%S", time.localtime(self.timestamp)), "domain": self.qname,
+                "client_ip": self.client_ip, "status": self.status}
+
 class GhostResolver(BaseResolver):
     def resolve(self, request, handler):
-        qname = str(request.q.qname).strip('.')
-        reply = request.reply()
-        
-        client_ip = handler.client_address[0]
-        device_name = get_device_name(client_ip)
-        timestamp = time.strftime("%H:%M:%S")
-        status = "ALLOWED"
-
-        # 1. PRÜFUNG: IST ES WERBUNG?
-        if qname in blocked_domains:
-            reply.rr = []
-            reply.add_answer(*RR.fromZone(f"{qname}. 60 A 0.0.0.0"))
-            stats["blocked"] += 1
-            status = "BLOCKED"
-            print(f"[BLOCK] {qname} von {device_name}")
-        
-        # 2. WENN NICHT: FRAGE GOOGLE (Forwarding)
-        else:
+        query = self.begin(request.pack(), handler.client_address[0])
+        if query.reply is None:
             try:
-                # Wir leiten die exakte Anfrage an 8.8.8.8 weiter
-                upstream_req = request.send(UPSTREAM_DNS, UPSTREAM_PORT, timeout=2)
-                reply = DNSRecord.parse(upstream_req)
-                stats["allowed"] += 1
+                # Wir leiten die exakte Anfrage an den Upstream-Pool weiter
+                packet, _ = upstream_pool.query(query.packet)
+                self.forwarded(query, packet)
             except Exception as e:
-                print(f"[ERROR] Forwarding failed: {e}")
-                # Wenn Internet weg ist, leere Antwort senden
-                reply.header.rcode = 2 # SERVFAIL
-
-        stats["total"] += 1
-        
-        # LOGGING FÜR DASHBOARD
-        logs.insert(0, {
-            "time": timestamp,
-            "client_ip": client_ip,
-            "client_name": device_name, # <-- NEU: Der Name!
-            "domain": qname,
-            "status": status
-        })
-        # Behalte nur die letzten 50 Logs im Speicher
-        if len(logs) > 50: logs.pop()
-        
-        return reply
+                self.failed(query, e)
+        # Nur der dnslib-Server braucht ein DNSRecord zurück
+        return DNSRecord.parse(self.finish(query))
+
+    def begin(self, packet, client_ip):
+        query = Query(packet, client_ip)
+        question = query.question
+        if question is None:
+            # Kein normaler Query (anderer Opcode, mehrere Fragen...): nicht weiterleiten
+            query.reply = error_response(packet, None, RCODE_FORMERR)
+            return query
+
+        trace = query.trace
+        # 1. PRÜFUNG: IST ES WERBUNG?
+        blocked = blocklist.is_blocked(query.qname)
+        if trace:
+            trace.mark("blocklist")
+        if blocked:
+            query.reply = block_templates.response(packet, question)
+            metrics.inc("blocked")
+            query.status = "BLOCKED"
+            print(f"[BLOCK] {query.qname} von {query.device_name}")
+
+        # 2. WENN NICHT: ERST IM CACHE SCHAUEN
+        elif (cached := dns_cache.get(packet, question)) is not None:
+            query.reply = cached
+            metrics.inc("allowed")
+            metrics.inc("cache_hits")
+        if trace and not blocked:
+            trace.mark("cache")
+
+        # 3. SONST: Aufrufer fragt den Upstream-Pool (Forwarding)
+        return query
+
+    def forwarded(self, query, upstream_packet):
+        # Die Antwort geht Byte für Byte an den Client (ID hat der Pool schon geprüft)
+        if query.trace:
+            query.trace.mark("upstream")
+        question = query.question
+        if not same_question(query.packet, upstream_packet, question.end):
+            raise ValueError("Upstream-Antwort passt nicht zur Frage")
+        dns_cache.put(query.packet, question, upstream_packet)
+        query.reply = upstream_packet
+        metrics.inc("allowed")
+        metrics.observe("upstream_latency", time.monotonic() - query.started)
+        if query.trace:
+            query.trace.mark("cache_put")
+
+    def failed(self, query, error):
+        if query.trace:
+            query.trace.mark("upstream")
+        print(f"[ERROR] Forwarding failed: {error}")
+        # Wenn Internet weg ist, leere Antwort senden
+        query.reply = error_response(query.packet, query.question)  # SERVFAIL
+        metrics.inc("servfail")
+
+    def finish(self, query):
+        metrics.inc("queries")
+        metrics.observe("query_latency", time.monotonic() - query.started)
+        if query.question is None:
+            return query.reply
+        metrics.top("domains", query.qname)
+        metrics.top("clients", query.client_ip)
+        if query.status == "BLOCKED":
+            metrics.top("blocked_domains", query.qname)
+
+        # LOGGING FÜR DASHBOARD (Ringpuffer, der Rest landet im Hintergrund in der Historie)
+        query_log.append(query.timestamp, query.client_ip, query.qname, query.status)
+
+        if query.trace:
+            query.trace.mark("log")
+            tracer.end(query.trace, query.info)
+        return query.reply
 
 # --- 2. WEB DASHBOARD API ---
 @app.route('/')
 def index():
     return render_template('dashboard.html')
 
+def format_log(record):
+    ts, client_ip, domain, status = record
+    return {
+        "time": time.strftime("%H:%M:%S", time.localtime(ts)),
+        "client_ip": client_ip,
+        "client_name": get_device_name(client_ip),
+        "domain": domain,
+        "status": status
+    }
+
+def recent_logs(limit=LOG_DISPLAY):
+    return [format_log(record) for record in query_log.recent(limit)]
+
+def get_counters():
+    counters = metrics.counters()
+    return {"blocked": counters.get("blocked", 0), "allowed": counters.get("allowed", 0),
+            "total": counters.get("queries", 0)}
+
 @app.route('/api/stats')
 def get_stats():
-    return jsonify({"stats": stats, "logs": logs})
+    return jsonify({"stats": get_counters(), "logs": recent_logs(), "cache": dns_cache.stats(),
+                    "upstream": upstream_pool.stats()})
+
+# Push statt Polling: der Broadcaster fragt DashboardFeed zweimal pro Sekunde
+# nach Änderungen und schickt nur neue Log-Einträge und geänderte Zähler.
+class DashboardFeed:
+    def __init__(self):
+        self.cursor = 0
+        self.counters = {}
+        self.logs = []  # neueste zuerst, wie im Dashboard
+
+    def delta(self):
+        records, self.cursor, _ = query_log.read_since(self.cursor)
+        counters = get_counters()
+        changed = {name: value for name, value in counters.items() if self.counters.get(name) != value}
+        self.counters = counters
+        if not records and not changed:
+            return None
+        new_logs = [format_log(record) for record in reversed(records[-LOG_DISPLAY:])]
+        self.logs = (new_logs + self.logs)[:LOG_DISPLAY]
+        delta = {}
+        if changed:
+            delta["stats"] = changed
+        if new_logs:
+            delta["logs"] = new_logs
+        return delta
+
+    def snapshot(self):
+        return {"stats": self.counters, "logs": self.logs}
+
+live_updates = Broadcaster(DashboardFeed(), LIVE_INTERVAL, LIVE_MAX_QUEUE)
+
+@app.route('/api/stream')
+def get_stream():
+    # Server-Sent Events; /api/stats bleibt als Fallback für Polling
+    return Response(live_updates.stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/api/stats/timeseries')
+def get_timeseries():
+    # ?window=second (letzte 60 s) | minute (letzte 60 min) | hour (letzte 24 h)
+    window = request.args.get('window', 'second')
+    if window not in metrics.series:
+        return jsonify({"error": f"Unbekanntes Fenster: {window}"}), 400
+    return jsonify({"window": window, "buckets": metrics.timeseries(window)})
+
+@app.route('/api/stats/top')
+def get_top():
+    n = min(request.args.get('n', 10, type=int), 100)
+    return jsonify({name: [{"name": key, "count": count} for key, count in metrics.top_n(name, n)]
+                    for name in ("domains", "blocked_domains", "clients")})
+
+@app.route('/api/stats/latency')
+def get_latency():
+    result = {}
+    for name, (counts, total) in metrics.histograms().items():
+        count = sum(counts.values())
+        result[name] = {"count": count, "avg_ms": round(total / count * 1000, 2) if count else None}
+        for label, p in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999)):
+            value = percentile(counts, p)
+            result[name][f"{label}_ms"] = round(value * 1000, 2) if value is not None else None
+    return jsonify(result)
+
+@app.route('/metrics')
+def get_metrics():
+    cache = dns_cache.stats()
+    extra = [
+        ("ghostshield_cache_entries", "gauge", "Einträge im Antwort-Cache", [({}, cache["size"])]),
+        ("ghostshield_cache_evictions_total", "counter", "Aus dem Cache verdrängte Einträge", [({}, cache["evictions"])]),
+        ("ghostshield_blocklist_domains", "gauge", "Geblockte Domains", [({}, len(blocklist))]),
+        ("ghostshield_upstream_srtt_seconds", "gauge", "Geglättete Antwortzeit je Upstream",
+         [({"server": u.name}, u.srtt or 0) for u in upstream_pool.upstreams]),
+        ("ghostshield_upstream_timeouts_total", "counter", "Timeouts je Upstream",
+         [({"server": u.name}, u.timeouts) for u in upstream_pool.upstreams]),
+        ("ghostshield_upstream_lost_races_total", "counter", "Vom Ersatz-Server überholte Anfragen je Upstream",
+         [({"server": u.name}, u.lost_races) for u in upstream_pool.upstreams]),
+    ]
+    return Response(prometheus(metrics, extra), mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/history')
+def get_history():
+    # ?q=suchtext&before=<id>&limit=100 - blättern über "before" = kleinste id der Vorseite
+    if query_history is None:
+        return jsonify({"error": "Historie ist abgeschaltet"}), 404
+    before = request.args.get('before', type=int)
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    return jsonify({"logs": query_history.search(request.args.get('q', ''), before, limit)})
+
+# --- DEBUG: LANGSAME ANFRAGEN & PROFILER ---
+@app.route('/api/debug/slow')
+def get_slow():
+    return jsonify({"enabled": tracer.enabled, "threshold_ms": tracer.slow_threshold * 1000,
+                    "queries": tracer.slow()})
+
+@app.route('/api/debug/tracing', methods=['POST'])
+def set_tracing():
+    # ?enabled=0|1, ohne Neustart (gilt nur für diesen Prozess)
+    tracer.enabled = request.args.get('enabled', '1') not in ('0', 'false', 'off')
+    return jsonify({"enabled": tracer.enabled})
+
+@app.route('/api/debug/profile')
+def get_profile():
+    # ?seconds=30 - blockiert so lange und liefert dann die Aufrufketten als Download
+    seconds = min(max(request.args.get('seconds', 30, type=float), 1), PROFILE_MAX_SECONDS)
+    result = profiler.capture(seconds)
+    if result is None:
+        return jsonify({"error": "Es läuft bereits eine Messung"}), 409
+    filename = time.strftime("ghostshield-%Y%m%d-%H%M%S.folded")
+    return Response(result, mimetype="text/plain",
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
 # --- 3. STARTUP ---
+gravity = Gravity(BLOCKLIST_SOURCES, ALLOWLIST, BLOCK_SUBDOMAINS)
+
 def load_gravity():
-    import requests
+    global blocklist
     print(">>> Lade Blocklisten...")
     try:
-        r = requests.get(BLOCKLIST_URL)
-        for line in r.text.splitlines():
-            if line.startswith("0.0.0.0"):
-                parts = line.split()
-                if len(parts) >= 2:
-                    blocked_domains.add(parts[1])
-        print(f">>> {len(blocked_domains)} Domains geblockt.")
+        changed = gravity.refresh()
+        if gravity.failed:
+            print(f"Fehler: {len(gravity.failed)} Blocklisten nicht geladen "
+                  f"(bisherige Daten bleiben aktiv): {', '.join(gravity.failed)}")
+        if not changed:
+            if not gravity.failed:
+                print(">>> Blocklisten unverändert.")
+            return
+        missing = gravity.missing()
+        if missing and GRAVITY_SNAPSHOT and os.path.exists(GRAVITY_SNAPSHOT):
+            # Der Snapshot enthält diese Listen noch, ein neuer Index hätte sie nicht
+            print(f"Fehler: {len(missing)} Blocklisten noch nie geladen, Snapshot bleibt aktiv.")
+            return
+        # Neuer Index wird komplett gebaut und dann in einem Schritt getauscht
+        index = gravity.build()
+        if GRAVITY_SNAPSHOT and missing:
+            print(">>> Snapshot wird erst geschrieben, wenn alle Blocklisten geladen sind.")
+        elif GRAVITY_SNAPSHOT:
+            try:
+                save_snapshot(index, GRAVITY_SNAPSHOT, gravity.config_hash())
+                # Ab jetzt aus dem mmap lesen, so teilen sich alle Worker den Speicher
+                index = open_snapshot(GRAVITY_SNAPSHOT).index
+            except (OSError, SnapshotError) as e:
+                print(f"Fehler beim Schreiben des Snapshots: {e}")
+        blocklist = index
+        print(f">>> {len(blocklist)} Domains geblockt.")
     except Exception as e:
         print(f"Fehler beim Laden der Liste: {e}")
 
+def load_snapshot():
+    # Liefert das Alter des Snapshots in Sekunden oder None
+    global blocklist
+    if not GRAVITY_SNAPSHOT or not os.path.exists(GRAVITY_SNAPSHOT):
+        return None
+    try:
+        snapshot = open_snapshot(GRAVITY_SNAPSHOT)
+    except (OSError, SnapshotError) as e:
+        print(f"Snapshot unbrauchbar, lade neu: {e}")
+        return None
+    blocklist = snapshot.index
+    print(f">>> Snapshot geladen: {len(blocklist)} Domains geblockt.")
+    if snapshot.config != gravity.config_hash():
+        # Bis der neue Index steht, filtert der alte weiter
+        print(">>> Snapshot stammt von einer anderen Konfiguration (Quellen/Allowlist/Subdomains), baue sofort neu.")
+        return None
+    return snapshot.age()
+
+def gravity_updater(first_delay=0):
+    # Läuft im Hintergrund, damit DNS sofort antwortet (ohne Snapshot anfangs ungefiltert)
+    time.sleep(max(first_delay, 0))
+    while True:
+        load_gravity()
+        time.sleep(GRAVITY_UPDATE_INTERVAL)
+
+def snapshot_watcher():
+    # Für Worker-Prozesse: den vom Hauptprozess neu geschriebenen Snapshot übernehmen
+    global blocklist
+    def mtime():
+        try:
+            return os.stat(GRAVITY_SNAPSHOT).st_mtime_ns
+        except OSError:
+            return None
+    last = mtime()
+    while True:
+        time.sleep(SNAPSHOT_CHECK_INTERVAL)
+        current = mtime()
+        if current is not None and current != last:
+            try:
+                blocklist = open_snapshot(GRAVITY_SNAPSHOT).index
+                last = current
+            except (OSError, SnapshotError) as e:
+                print(f"Fehler beim Laden des Snapshots: {e}")
+
+def start_worker():
+    if GRAVITY_SNAPSHOT:
+        threading.Thread(target=snapshot_watcher, daemon=True).start()
+
 if __name__ == "__main__":
-    load_gravity()
-    
-    # DNS Server starten
+    # Frischer Snapshot: sofort filtern und erst nach Ablauf des Intervalls neu laden
+    age = load_snapshot()
+    first_delay = GRAVITY_UPDATE_INTERVAL - age if age is not None else 0
+
+    # DNS Server starten - vor allen Hintergrund-Threads, weil dabei Worker geforkt werden
     resolver = GhostResolver()
-    server = DNSServer(resolver, port=DNS_PORT, address=HOST_IP)
-    server.start_thread()
+    if ASYNC_DNS:
+        workers = DNS_WORKERS
+        if workers > 1 and not GRAVITY_SNAPSHOT:
+            # Worker bekommen die Blockliste nur über den Snapshot; ohne ihn blieben sie ungefiltert
+            print(">>> DNS_WORKERS > 1 braucht GRAVITY_SNAPSHOT, starte nur einen DNS-Worker.")
+            workers = 1
+        start_frontend(resolver, HOST_IP, DNS_PORT, upstream_pool, UPSTREAM_CONCURRENCY, workers,
+                       worker_init=start_worker)
+    else:
+        server = DNSServer(resolver, port=DNS_PORT, address=HOST_IP)
+        server.start_thread()
+
+    metrics.start()
+    live_updates.start()
+    if HISTORY_DB:
+        query_history = QueryHistory(query_log, HISTORY_DB, HISTORY_DAYS, name_for=get_device_name)
+        query_history.start()
+    threading.Thread(target=gravity_updater, args=(first_delay,), daemon=True).start()
     
     # Webserver starten
     print(f">>> Dashboard läuft auf http://<RASPI-IP>:{WEB_PORT}")
@@ -0,0 +1,264 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+
+# --- METRIKEN ---
+# Es gibt eine feste Zahl Shards (SHARDS), jeder mit eigenem Lock. Ein Thread
+# bekommt beim ersten Schreiben reihum einen Shard zugeteilt (threading.local),
+# die Locks sind also kaum umkämpft. Die Zahl der Shards wächst nicht mit der
+# Zahl der Threads - dnslib startet ohne ASYNC_DNS einen Thread pro Anfrage.
+# Gelesen wird die Summe aller Shards.
+# Ein Sampler-Thread nimmt einmal pro Sekunde die Differenz der Summen und
+# füllt daraus rollierende Zeitreihen (Sekunden, Minuten, Stunden).
+#
+# Latenzen landen in einem HDR-artigen Histogramm: logarithmische Stufen
+# (Zweierpotenzen in Mikrosekunden) mit je SUB_BUCKETS linearen Unterteilungen,
+# also höchstens ~12% relativer Fehler bei konstantem Speicher.
+# Top-Domains/-Clients zählt der Space-Saving-Algorithmus mit fester Größe.
+
+SUB_BUCKETS = 8
+MAX_EXPONENT = 27                 # 2^27 µs ~ 134 s, alles darüber landet im letzten Bucket
+HIST_SIZE = (MAX_EXPONENT - 1) * SUB_BUCKETS
+SHARDS = 16
+
+
+def bucket_index(seconds):
+    us = int(seconds * 1_000_000)
+    if us < SUB_BUCKETS:
+        return max(us, 0)
+    exponent = us.bit_length() - 1
+    if exponent > MAX_EXPONENT:
+        return HIST_SIZE - 1
+    # Die obersten Bits nach der führenden 1 wählen den Unter-Bucket
+    sub = (us >> (exponent - 3)) & (SUB_BUCKETS - 1)
+    return (exponent - 2) * SUB_BUCKETS + sub
+
+
+def bucket_upper(index):
+    """ Obergrenze des Buckets in Sekunden. """
+    if index < SUB_BUCKETS:
+        return (index + 1) / 1_000_000
+    exponent = index // SUB_BUCKETS + 2
+    sub = index % SUB_BUCKETS
+    return ((SUB_BUCKETS + sub + 1) << (exponent - 3)) / 1_000_000
+
+
+def percentile(counts, p):
+    """ Perzentil (0..1) aus Bucket-Zählern {index: anzahl} in Sekunden. """
+    total = sum(counts.values())
+    if not total:
+        return None
+    rank = p * total
+    seen = 0
+    for index in sorted(counts):
+        seen += counts[index]
+        if seen >= rank:
+            return bucket_upper(index)
+    return bucket_upper(max(counts))
+
+
+class SpaceSaving:
+    """ Top-k schwerer Schlüssel mit fester Größe (Metwally et al.). """
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.counts = {}
+
+    def add(self, key):
+        counts = self.counts
+        if key in counts:
+            counts[key] += 1
+        elif len(counts) < self.capacity:
+            counts[key] = 1
+        else:
+            # Kleinsten Eintrag ersetzen, der Neue erbt dessen Zähler (Überschätzung)
+            victim = min(counts, key=counts.get)
+            counts[key] = counts.pop(victim) + 1
+
+
+class _Shard:
+    __slots__ = ("lock", "counts", "hists", "sums", "top")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.hists = {}
+        self.sums = {}
+        self.top = {}
+
+
+class Metrics:
+    def __init__(self, top_capacity=128):
+        self.top_capacity = top_capacity
+        self._local = threading.local()
+        self._shards = [_Shard() for _ in range(SHARDS)]
+        self._next_shard = itertools.count()
+        self.series = {
+            "second": deque(maxlen=60),
+            "minute": deque(maxlen=60),
+            "hour": deque(maxlen=24),
+        }
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # Reihum verteilen; stirbt der Thread, fällt nur diese Referenz weg
+            shard = self._local.shard = self._shards[next(self._next_shard) % SHARDS]
+        return shard
+
+    # --- Schreiben (Hot Path) ---
+    def inc(self, name, n=1):
+        shard = self._shard()
+        with shard.lock:
+            shard.counts[name] = shard.counts.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        shard = self._shard()
+        with shard.lock:
+            hist = shard.hists.get(name)
+            if hist is None:
+                hist = shard.hists[name] = [0] * HIST_SIZE
+                shard.sums[name] = 0.0
+            hist[bucket_index(seconds)] += 1
+            shard.sums[name] += seconds
+
+    def top(self, name, key):
+        shard = self._shard()
+        with shard.lock:
+            sketch = shard.top.get(name)
+            if sketch is None:
+                sketch = shard.top[name] = SpaceSaving(self.top_capacity)
+            sketch.add(key)
+
+    # --- Lesen (Summe über alle Shards) ---
+    def counters(self):
+        total = {}
+        for shard in self._shards:
+            with shard.lock:
+                counts = dict(shard.counts)
+            for name, value in counts.items():
+                total[name] = total.get(name, 0) + value
+        return total
+
+    def histograms(self):
+        """ {name: ({index: anzahl}, summe_sekunden)} """
+        merged = {}
+        for shard in self._shards:
+            with shard.lock:
+                hists = {name: list(hist) for name, hist in shard.hists.items()}
+                sums = dict(shard.sums)
+            for name, hist in hists.items():
+                counts, total = merged.get(name, ({}, 0.0))
+                for index, value in enumerate(hist):
+                    if value:
+                        counts[index] = counts.get(index, 0) + value
+                merged[name] = (counts, total + sums.get(name, 0.0))
+        return merged
+
+    def top_n(self, name, n=10):
+        merged = {}
+        for shard in self._shards:
+            with shard.lock:
+                sketch = shard.top.get(name)
+                counts = dict(sketch.counts) if sketch is not None else {}
+            for key, count in counts.items():
+                merged[key] = merged.get(key, 0) + count
+        return sorted(merged.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    # --- Zeitreihen ---
+    def start(self):
+        threading.Thread(target=self._sample_loop, daemon=True).start()
+
+    def _sample_loop(self):
+        previous = (self.counters(), {k: v[0] for k, v in self.histograms().items()})
+        minute, hour = [], []
+        next_tick = time.monotonic()
+        while True:
+            next_tick += 1
+            time.sleep(max(next_tick - time.monotonic(), 0))
+            current = (self.counters(), {k: v[0] for k, v in self.histograms().items()})
+            bucket = _delta(time.time(), current, previous)
+            previous = current
+            self.series["second"].append(bucket)
+            minute.append(bucket)
+            if len(minute) == 60:
+                merged = _merge(minute)
+                self.series["minute"].append(merged)
+                hour.append(merged)
+                minute = []
+                if len(hour) == 60:
+                    self.series["hour"].append(_merge(hour))
+                    hour = []
+
+    def timeseries(self, window="second"):
+        result = []
+        for ts, counts, hists in list(self.series[window]):
+            entry = {"time": int(ts)}
+            entry.update(counts)
+            for name, hist in hists.items():
+                for label, p in (("p50", 0.5), ("p99", 0.99)):
+                    value = percentile(hist, p)
+                    entry[f"{name}_{label}_ms"] = round(value * 1000, 2) if value is not None else None
+            result.append(entry)
+        return result
+
+
+def _delta(ts, current, previous):
+    counts = {name: value - previous[0].get(name, 0) for name, value in current[0].items()}
+    hists = {}
+    for name, hist in current[1].items():
+        before = previous[1].get(name, {})
+        diff = {i: c - before.get(i, 0) for i, c in hist.items() if c != before.get(i, 0)}
+        if diff:
+            hists[name] = diff
+    return ts, counts, hists
+
+
+def _merge(buckets):
+    counts, hists = {}, {}
+    for _, bucket_counts, bucket_hists in buckets:
+        for name, value in bucket_counts.items():
+            counts[name] = counts.get(name, 0) + value
+        for name, hist in bucket_hists.items():
+            target = hists.setdefault(name, {})
+            for index, value in hist.items():
+                target[index] = target.get(index, 0) + value
+    return buckets[0][0], counts, hists
+
+
+def prometheus(metrics, extra=()):
+    """
+    Text-Exposition-Format für /metrics. extra: zusätzliche
+    (name, typ, hilfe, [(labels, wert), ...])-Tupel, z.B. aus Cache und Upstream-Pool.
+    """
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    counters = metrics.counters()
+    for name in sorted(counters):
+        family(f"ghostshield_{name}_total", "counter", f"Anzahl {name}", [({}, counters[name])])
+
+    for name, (counts, total) in sorted(metrics.histograms().items()):
+        samples, seen = [], 0
+        for index in sorted(counts):
+            seen += counts[index]
+            samples.append(({"le": f"{bucket_upper(index):.6f}"}, seen))
+        samples.append(({"le": "+Inf"}, seen))
+        full = f"ghostshield_{name}_seconds"
+        lines.append(f"# HELP {full} Latenz {name} in Sekunden")
+        lines.append(f"# TYPE {full} histogram")
+        for labels, value in samples:
+            lines.append(f'{full}_bucket{{le="{labels["le"]}"}} {value}')
+        lines.append(f"{full}_sum {total}")
+        lines.append(f"{full}_count {seen}")
+
+    for name, kind, help_text, samples in extra:
+        family(name, kind, help_text, samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+import itertools
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+
+
+# --- QUERY-LOG ---
+# QueryRing: Ringpuffer fester Größe aus parallelen Arrays (ein Slot pro
+# Anfrage), Domains und IPs werden interniert. Schreiber holen sich ihren
+# Slot über itertools.count() - das ist unter dem GIL atomar, es wird also
+# kein Lock gebraucht. Jeder Slot trägt seine Sequenznummer, so erkennen
+# Leser halb geschriebene oder bereits überschriebene Einträge.
+#
+# QueryHistory: ein Hintergrund-Thread leert den Ring in Stapeln in eine
+# SQLite-Datenbank (WAL), löscht Einträge nach HISTORY_DAYS und liefert
+# seitenweise durchsuchbare Historie für das Dashboard.
+
+STATUSES = ("ALLOWED", "BLOCKED")
+
+
+class QueryRing:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._counter = itertools.count()
+        self._head = 0                        # nächste noch nicht veröffentlichte Sequenznummer
+        self._seq = array("q", [-1]) * capacity
+        self._time = array("d", [0.0]) * capacity
+        self._status = bytearray(capacity)
+        self._domain = [None] * capacity
+        self._client_ip = [None] * capacity
+
+    def append(self, timestamp, client_ip, domain, status):
+        seq = next(self._counter)
+        slot = seq % self.capacity
+        self._seq[slot] = -1                  # Slot als "in Arbeit" markieren
+        self._time[slot] = timestamp
+        self._status[slot] = STATUSES.index(status)
+        self._domain[slot] = sys.intern(domain)
+        self._client_ip[slot] = sys.intern(client_ip)
+        self._seq[slot] = seq
+        if seq >= self._head:
+            self._head = seq + 1
+
+    def _read(self, seq):
+        slot = seq % self.capacity
+        record = (self._time[slot], self._client_ip[slot], self._domain[slot], STATUSES[self._status[slot]])
+        # Nur gültig, wenn der Slot vor und nach dem Lesen dieselbe Sequenz trägt
+        return record if self._seq[slot] == seq else None
+
+    def read_since(self, start):
+        """ Liefert (records, next_seq, verloren) ab Sequenznummer start. """
+        head = self._head
+        lost = 0
+        first = max(start, head - self.capacity)
+        if first > start:
+            lost = first - start
+        records = []
+        for seq in range(first, head):
+            record = self._read(seq)
+            if record is None:
+                # Noch nicht fertig geschrieben: beim nächsten Mal ab hier weiter
+                return records, seq, lost
+            records.append(record)
+        return records, head, lost
+
+    def recent(self, limit=50):
+        """ Die neuesten Einträge zuerst. """
+        head = self._head
+        records = []
+        for seq in range(head - 1, max(head - self.capacity, head - limit, 0) - 1, -1):
+            record = self._read(seq)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def __len__(self):
+        return min(self._head, self.capacity)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS queries (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    client_ip TEXT NOT NULL,
+    client_name TEXT,
+    domain_id INTEGER NOT NULL REFERENCES domains(id),
+    status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queries_ts ON queries(ts);
+CREATE INDEX IF NOT EXISTS queries_domain ON queries(domain_id);
+"""
+
+
+class QueryHistory:
+    def __init__(self, ring, path, retention_days=7, flush_interval=1.0, name_for=None):
+        self.ring = ring
+        self.path = path
+        self.retention = retention_days * 86400
+        self.flush_interval = flush_interval
+        self.name_for = name_for          # ip -> Gerätename, beim Schreiben aufgelöst
+        self.written = 0
+        self.dropped = 0
+        self._next = 0
+        self._domain_ids = {}             # Domain -> id, spart Abfragen beim Schreiben
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def start(self):
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        db = self._connect()
+        last_purge = 0.0
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush(db)
+                if time.time() - last_purge > 3600:
+                    with db:
+                        db.execute("DELETE FROM queries WHERE ts < ?", (time.time() - self.retention,))
+                        db.execute("DELETE FROM domains WHERE id NOT IN (SELECT DISTINCT domain_id FROM queries)")
+                    self._domain_ids.clear()
+                    last_purge = time.time()
+            except sqlite3.Error as e:
+                print(f"[ERROR] Query-Historie: {e}")
+
+    def _domain_id(self, db, domain):
+        domain_id = self._domain_ids.get(domain)
+        if domain_id is None:
+            db.execute("INSERT OR IGNORE INTO domains(name) VALUES (?)", (domain,))
+            domain_id = db.execute("SELECT id FROM domains WHERE name = ?", (domain,)).fetchone()[0]
+            if len(self._domain_ids) > 100000:
+                self._domain_ids.clear()
+            self._domain_ids[domain] = domain_id
+        return domain_id
+
+    def flush(self, db):
+        """ Schreibt alles Neue aus dem Ring in einer Transaktion. """
+        records, self._next, lost = self.ring.read_since(self._next)
+        self.dropped += lost
+        if not records:
+            return
+        name_for = self.name_for or (lambda ip: None)
+        with db:
+            db.executemany(
+                "INSERT INTO queries(ts, client_ip, client_name, domain_id, status) VALUES (?, ?, ?, ?, ?)",
+                [(ts, ip, name_for(ip), self._domain_id(db, domain), STATUSES.index(status))
+                 for ts, ip, domain, status in records])
+        self.written += len(records)
+
+    def search(self, query="", before=None, limit=100):
+        """ Seitenweise Suche, neueste zuerst. before = id des letzten Eintrags der Vorseite. """
+        sql = ("SELECT q.id, q.ts, q.client_ip, q.client_name, d.name, q.status "
+               "FROM queries q JOIN domains d ON d.id = q.domain_id WHERE 1=1")
+        params = []
+        if before is not None:
+            sql += " AND q.id < ?"
+            params.append(before)
+        if query:
+            sql += " AND (d.name LIKE ? OR q.client_ip LIKE ? OR q.client_name LIKE ?)"
+            params += [f"%{query}%"] * 3
+        sql += " ORDER BY q.id DESC LIMIT ?"
+        params.append(limit)
+        db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=10)
+        try:
+            rows = db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+        return [{
+            "id": row[0],
+            "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[1])),
+            "client_ip": row[2],
+            "client_name": row[3],
+            "domain": row[4],
+            "status": STATUSES[row[5]],
+        } for row in rows]
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped}
@@ -0,0 +1,141 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from blocklist import BlocklistIndex, RuleTables, KINDS
+
+
+# --- GRAVITY-SNAPSHOT ---
+# Der fertige BlocklistIndex als Binärdatei: ein Header, danach die sechs
+# sortierten uint64-Hash-Tabellen (Block exact/suffix/wildcard, dann Allow).
+# Beim Start wird die Datei per mmap eingeblendet und direkt per Binärsuche
+# abgefragt - nichts wird deserialisiert, der Start kostet unabhängig von der
+# Listengröße praktisch nichts, und alle Worker-Prozesse teilen sich dieselben
+# Seiten im Page Cache.
+#
+# Header (little endian, 80 Byte):
+#   magic 8s | version H | byteorder B | pad x | crc32 I | created Q | config Q | 6 x count Q
+# config ist Gravity.config_hash() der Konfiguration, die den Index gebaut hat
+# (Quellen, Allowlist, Subdomains); passt er nicht mehr, wird sofort neu gebaut.
+
+MAGIC = b"GSHIELD\x00"
+VERSION = 2
+HEADER = struct.Struct("<8sHBxIQQ6Q")
+BYTEORDER = {"little": 1, "big": 2}[sys.byteorder]
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class Snapshot:
+    def __init__(self, index, created, path, config=0):
+        self.index = index
+        self.created = created
+        self.path = path
+        self.config = config
+
+    def age(self):
+        return time.time() - self.created
+
+
+def _tables(index):
+    return [getattr(tables, kind) for tables in (index.block, index.allow) for kind in KINDS]
+
+
+def save_snapshot(index, path, config=0):
+    """ Schreibt den Index atomar (temporäre Datei + rename) nach path; config: siehe Header. """
+    tables = _tables(index)
+    crc = 0
+    for table in tables:
+        crc = zlib.crc32(memoryview(table).cast("B"), crc)
+    header = HEADER.pack(MAGIC, VERSION, BYTEORDER, crc, int(time.time()), config, *(len(t) for t in tables))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for table in tables:
+            f.write(memoryview(table).cast("B"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def open_snapshot(path, verify=True):
+    """ Blendet einen Snapshot per mmap ein und liefert ein Snapshot-Objekt. """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:
+            raise SnapshotError(f"{path}: Datei zu kurz")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, byteorder, crc, created, config, *counts = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path}: kein GhostShield-Snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"{path}: Version {version} nicht unterstützt (erwartet {VERSION})")
+    if byteorder != BYTEORDER:
+        raise SnapshotError(f"{path}: falsche Byte-Reihenfolge")
+    if size != HEADER.size + 8 * sum(counts):
+        raise SnapshotError(f"{path}: Größe passt nicht zum Header")
+
+    body = memoryview(mm)[HEADER.size:]
+    if verify and zlib.crc32(body) != crc:
+        raise SnapshotError(f"{path}: Prüfsumme falsch")
+
+    views = []
+    offset = 0
+    for count in counts:
+        views.append(body[offset:offset + 8 * count].cast("Q"))
+        offset += 8 * count
+    index = BlocklistIndex(RuleTables.from_sorted(*views[:3]), RuleTables.from_sorted(*views[3:]))
+    return Snapshot(index, created, path, config)
+
+
+def main():
+    from gravity import Gravity
+
+    parser = argparse.ArgumentParser(description="GhostShield Gravity-Snapshot bauen und prüfen.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Blocklisten laden und Snapshot schreiben (offline-fähig mit lokalen Dateien).")
+    build_parser.add_argument("sources", nargs="+", help="URLs oder lokale Dateien (Hosts-, Domain- oder Adblock-Format)")
+    build_parser.add_argument("-o", "--output", default="gravity.snap", help="Zieldatei (Standard: gravity.snap)")
+    build_parser.add_argument("-a", "--allow", action="append", default=[], help="Allowlist-Regel, mehrfach möglich")
+    build_parser.add_argument("--exact", action="store_true", help="Subdomains geblockter Domains nicht mitblocken")
+
+    info_parser = subparsers.add_parser("info", help="Header und Prüfsumme eines Snapshots anzeigen.")
+    info_parser.add_argument("path")
+    info_parser.add_argument("domains", nargs="*", help="Optional: Domains gegen den Snapshot prüfen")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        gravity = Gravity(args.sources, args.allow, not args.exact)
+        gravity.refresh()
+        missing = gravity.missing()
+        if missing:
+            # Lieber keinen Snapshot als einen, dem still Listen fehlen
+            print(f"FEHLER: {len(missing)} von {len(gravity.sources)} Quellen nicht geladen, "
+                  f"{args.output} bleibt unverändert: {', '.join(missing)}")
+            sys.exit(1)
+        index = gravity.build()
+        save_snapshot(index, args.output, gravity.config_hash())
+        print(f">>> {len(index)} Domains nach {args.output} geschrieben.")
+    elif args.command == "info":
+        try:
+            snapshot = open_snapshot(args.path)
+        except (OSError, SnapshotError) as e:
+            print(f"FEHLER: {e}")
+            sys.exit(1)
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.created))
+        print(f">>> {args.path}: Version {VERSION}, {len(snapshot.index)} Domains, erstellt {created}, "
+              f"Konfiguration {snapshot.config:016x}, Prüfsumme OK")
+        for domain in args.domains:
+            print(f"{domain}: {'BLOCKED' if snapshot.index.is_blocked(domain) else 'ALLOWED'}")
+
+
+if __name__ == "__main__":
+    main()
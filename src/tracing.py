@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+
+# --- TRACING & PROFILING ---
+# Trace: monotone Zeitstempel an jeder Station einer Anfrage (parse, device,
+# blocklist, cache, upstream, ...). Der Tracer verbucht die Dauer jeder
+# Station in einem eigenen Histogramm der Metriken ("stage_<name>") und
+# merkt sich langsame Anfragen in einem Puffer fester Größe.
+# Ist der Tracer aus, gibt begin() None zurück und jede Station kostet nur
+# noch ein "if trace".
+#
+# StackSampler: Profiler auf Abruf. Schaut alle paar Millisekunden über
+# sys._current_frames() in alle Threads und zählt die Aufrufketten - ohne
+# Neustart, ohne die Threads anzuhalten. Ergebnis im "folded"-Format für
+# flamegraph.pl oder speedscope.
+
+class Trace:
+    __slots__ = ("started", "last", "stages")
+
+    def __init__(self, started):
+        self.started = started
+        self.last = started
+        self.stages = []
+
+    def mark(self, stage):
+        """ Schließt die Station ab, die seit der letzten Marke lief. """
+        now = time.monotonic()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+
+class Tracer:
+    def __init__(self, metrics, enabled=True, slow_threshold=0.1, capacity=100):
+        self.metrics = metrics
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.slow_queries = deque(maxlen=capacity)
+
+    def begin(self, started):
+        return Trace(started) if self.enabled else None
+
+    def end(self, trace, info):
+        """ Verbucht die Stationen; info() liefert die Details, nur bei langsamen Anfragen aufgerufen. """
+        observe = self.metrics.observe
+        for stage, seconds in trace.stages:
+            observe("stage_" + stage, seconds)
+        total = trace.last - trace.started
+        if total >= self.slow_threshold:
+            entry = info()
+            entry["total_ms"] = round(total * 1000, 3)
+            entry["stages_ms"] = [[stage, round(seconds * 1000, 3)] for stage, seconds in trace.stages]
+            self.slow_queries.append(entry)
+
+    def slow(self):
+        """ Langsame Anfragen, neueste zuerst. """
+        return list(reversed(self.slow_queries))
+
+
+class StackSampler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._lock = threading.Lock()   # nur eine Messung gleichzeitig
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def capture(self, seconds):
+        """ Misst seconds lang alle Threads. Liefert den Text oder None, falls schon eine Messung läuft. """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            me = threading.get_ident()
+            counts = {}
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(self._label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    key = ";".join(reversed(stack))
+                    counts[key] = counts.get(key, 0) + 1
+                time.sleep(self.interval)
+            return "".join(f"{stack} {count}\n"
+                           for stack, count in sorted(counts.items(), key=lambda item: item[1], reverse=True))
+        finally:
+            self._lock.release()
@@ -0,0 +1,288 @@
+import asyncio
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from wire import question_end, randomize_case
+
+
+# --- UPSTREAM-POOL ---
+# Mehrere Upstream-Server mit geglätteter Antwortzeit (EWMA wie bei TCP:
+# srtt/rttvar). Jede Anfrage geht an den schnellsten gesunden Server; kommt
+# nach srtt + 4*rttvar keine Antwort, wird zusätzlich der zweitbeste gefragt
+# (Hedging), die erste Antwort gewinnt. Gewinnt der Ersatz, wird auf den
+# ersten Server bis zum Timeout weiter gewartet: antwortet er noch, hat er
+# nur das Rennen verloren, sonst zählt es als Fehlschlag. Nach mehreren Fehlschlägen in Folge
+# wird ein Server ausgesperrt und nach einer Wartezeit (exponentiell
+# wachsend) mit einer einzelnen Anfrage erneut getestet.
+# Gegen gefälschte Antworten trägt jede Anfrage eine eigene Zufalls-ID und
+# eine zufällige Groß/Klein-Schreibung der Frage (DNS 0x20), die die Antwort
+# exakt zurückbringen muss.
+
+def parse_server(server, default_port=53):
+    host, _, port = server.partition(":")
+    return host, int(port) if port else default_port
+
+
+class Upstream:
+    def __init__(self, address, max_fails=3, eject_seconds=30, samples=512):
+        self.address = address
+        self.max_fails = max_fails
+        self.eject_seconds = eject_seconds
+        self.srtt = None
+        self.rttvar = 0.0
+        self.fails = 0          # Fehlschläge in Folge
+        self.ejections = 0      # Aussperrungen in Folge (für den Backoff)
+        self.retry_at = 0.0     # > jetzt: ausgesperrt
+        self.queries = 0
+        self.answers = 0
+        self.timeouts = 0
+        self.lost_races = 0     # Hedge-Rennen gegen den Ersatz verloren (kein Fehlschlag)
+        self.rtts = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return f"{self.address[0]}:{self.address[1]}"
+
+    def healthy(self, now):
+        return self.retry_at <= now and self.fails < self.max_fails
+
+    def hedge_delay(self, initial, minimum, maximum):
+        if self.srtt is None:
+            return initial
+        return min(max(self.srtt + 4 * self.rttvar, minimum), maximum)
+
+    def _sample(self, rtt):
+        # RFC 6298: rttvar = 3/4 rttvar + 1/4 |srtt - r|, srtt = 7/8 srtt + 1/8 r
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def success(self, rtt):
+        with self._lock:
+            self._sample(rtt)
+            self.rtts.append(rtt)
+            self.answers += 1
+            self.fails = 0
+            self.ejections = 0
+            self.retry_at = 0.0
+
+    def failure(self, elapsed, now):
+        with self._lock:
+            # Die verstrichene Zeit ist eine Untergrenze der echten Antwortzeit
+            self._sample(elapsed)
+            self.timeouts += 1
+            self.fails += 1
+            if self.fails >= self.max_fails:
+                self.retry_at = now + min(self.eject_seconds * 2 ** self.ejections, 300)
+                self.ejections += 1
+
+    def lost_race(self, elapsed):
+        with self._lock:
+            # Hat noch vor dem Timeout geantwortet, nur langsamer als der Ersatz:
+            # zählt weder als Timeout noch für max_fails, die Zeit fließt aber in srtt ein
+            self._sample(elapsed)
+            self.lost_races += 1
+
+    def stats(self):
+        with self._lock:
+            rtts = sorted(self.rtts)
+
+        def pct(p):
+            return round(rtts[min(int(len(rtts) * p), len(rtts) - 1)] * 1000, 2) if rtts else None
+
+        return {
+            "server": self.name,
+            "healthy": self.healthy(time.monotonic()),
+            "srtt_ms": round(self.srtt * 1000, 2) if self.srtt is not None else None,
+            "queries": self.queries,
+            "answers": self.answers,
+            "timeouts": self.timeouts,
+            "lost_races": self.lost_races,
+            "p50_ms": pct(0.50),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+        }
+
+
+class _Attempt:
+    """ Buchführung für eine weitergeleitete Anfrage (wer wann gefragt wurde). """
+    def __init__(self, pool):
+        self.primary, self.backup = pool.pick()
+        self.sent = {}  # address -> (Upstream, Sendezeitpunkt)
+        self.waiting = False  # Ersatz hat gewonnen, der erste Server steht noch aus
+
+    def send(self, upstream):
+        upstream.queries += 1
+        self.sent[upstream.address] = (upstream, time.monotonic())
+
+    def answered(self, address):
+        now = time.monotonic()
+        upstream, sent_at = self.sent[address]
+        upstream.success(now - sent_at)
+        # Hat der Ersatz-Server gewonnen, entscheidet sich erst bis zum Timeout,
+        # ob der erste nur langsam (primary_answered) oder weg war (primary_timed_out)
+        self.waiting = upstream is not self.primary
+        return upstream
+
+    def primary_answered(self):
+        self.primary.lost_race(time.monotonic() - self.sent[self.primary.address][1])
+
+    def primary_timed_out(self):
+        now = time.monotonic()
+        self.primary.failure(now - self.sent[self.primary.address][1], now)
+
+    def timed_out(self):
+        now = time.monotonic()
+        for upstream, sent_at in self.sent.values():
+            upstream.failure(now - sent_at, now)
+
+
+class UpstreamPool:
+    def __init__(self, servers, timeout=2.0, max_fails=3, eject_seconds=30,
+                 hedge_initial=0.2, hedge_min=0.01, case_randomization=True):
+        self.upstreams = [Upstream(address, max_fails, eject_seconds) for address in servers]
+        self.timeout = timeout
+        self.case_randomization = case_randomization
+        self.hedge_initial = hedge_initial
+        self.hedge_min = hedge_min
+        self.hedged = 0
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """ Liefert (erster Server, Ersatz-Server oder None). """
+        now = time.monotonic()
+        with self._lock:
+            healthy = sorted((u for u in self.upstreams if u.healthy(now)),
+                             key=lambda u: u.srtt if u.srtt is not None else 0.0)
+            for upstream in self.upstreams:
+                if upstream.fails >= upstream.max_fails and upstream.retry_at <= now:
+                    # Wartezeit vorbei: genau eine Anfrage darf den Server testen,
+                    # ein gesunder Server springt als Ersatz ein
+                    upstream.retry_at = now + upstream.eject_seconds
+                    return upstream, healthy[0] if healthy else None
+            if not healthy:
+                # Alle ausgesperrt: den nehmen, der am ehesten wieder dran wäre
+                healthy = sorted(self.upstreams, key=lambda u: u.retry_at)
+        return healthy[0], healthy[1] if len(healthy) > 1 else None
+
+    def hedge_delay(self, upstream):
+        return upstream.hedge_delay(self.hedge_initial, self.hedge_min, self.timeout / 2)
+
+    def _prepare(self, packet):
+        """ Anfrage für den Upstream: eigene Frage-Schreibweise (0x20), liefert (Ende der Frage, Frage-Bytes, Paket). """
+        end = question_end(packet)
+        wire = randomize_case(packet, end) if self.case_randomization else packet
+        return end, wire[12:end], wire
+
+    @staticmethod
+    def _relay(packet, data, end):
+        # ID und Schreibweise der Frage wieder wie beim Client
+        return packet[:2] + data[2:12] + packet[12:end] + data[end:]
+
+    def query(self, packet):
+        """ Blockierende Variante für den dnslib-Thread-Server. Liefert (Antwort, Upstream). """
+        attempt = _Attempt(self)
+        end, question, wire = self._prepare(packet)
+        txid = random.getrandbits(16)
+        wire = struct.pack("!H", txid) + wire[2:]
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            start = time.monotonic()
+            deadline = start + self.timeout
+            hedge_at = start + self.hedge_delay(attempt.primary)
+            hedge_pending = attempt.backup is not None
+            sock.sendto(wire, attempt.primary.address)
+            attempt.send(attempt.primary)
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    attempt.timed_out()
+                    raise socket.timeout("upstream timeout")
+                if hedge_pending and now >= hedge_at:
+                    sock.sendto(wire, attempt.backup.address)
+                    attempt.send(attempt.backup)
+                    self.hedged += 1
+                    hedge_pending = False
+                wake = hedge_at if hedge_pending else deadline
+                readable, _, _ = select.select([sock], [], [], max(wake - now, 0))
+                if not readable:
+                    continue
+                try:
+                    data, address = sock.recvfrom(65535)
+                except OSError:
+                    # ICMP-Fehler (z.B. Port nicht erreichbar) - auf den Rest warten
+                    continue
+                if (address in attempt.sent and len(data) >= end and struct.unpack("!H", data[:2])[0] == txid
+                        and data[12:end] == question):
+                    upstream = attempt.answered(address)
+                    if attempt.waiting:
+                        # Eigener Thread (wie beim dnslib-Server je Anfrage), der Client wartet nicht
+                        threading.Thread(target=self._await_primary, args=(sock.dup(), txid, attempt, deadline),
+                                         daemon=True).start()
+                    return self._relay(packet, data, end), upstream
+
+    @staticmethod
+    def _await_primary(sock, txid, attempt, deadline):
+        """ Wartet nach gewonnenem Hedge bis zum Timeout auf die Antwort des ersten Servers. """
+        with sock:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    attempt.primary_timed_out()
+                    return
+                readable, _, _ = select.select([sock], [], [], remaining)
+                if not readable:
+                    continue
+                try:
+                    data, address = sock.recvfrom(65535)
+                except OSError:
+                    continue
+                if address == attempt.primary.address and len(data) >= 12 and struct.unpack("!H", data[:2])[0] == txid:
+                    attempt.primary_answered()
+                    return
+
+    async def query_async(self, mux, packet):
+        """ Variante für den asyncio-Server über einen gemeinsamen UpstreamMux. """
+        attempt = _Attempt(self)
+        end, question, wire = self._prepare(packet)
+        txid, future = mux.open(attempt.sent, question)
+        wire = struct.pack("!H", txid) + wire[2:]
+        start = time.monotonic()
+        try:
+            mux.send(wire, attempt.primary.address)
+            attempt.send(attempt.primary)
+            waited = 0.0
+            if attempt.backup:
+                waited = self.hedge_delay(attempt.primary)
+                await asyncio.wait([future], timeout=waited)
+                if not future.done():
+                    mux.send(wire, attempt.backup.address)
+                    attempt.send(attempt.backup)
+                    self.hedged += 1
+            try:
+                data, address = await asyncio.wait_for(future, self.timeout - waited)
+            except asyncio.TimeoutError:
+                attempt.timed_out()
+                raise
+        except BaseException:
+            mux.close(txid)
+            raise
+        upstream = attempt.answered(address)
+        if attempt.waiting:
+            mux.linger(txid, attempt.primary.address, start + self.timeout - time.monotonic(),
+                       attempt.primary_answered, attempt.primary_timed_out)
+        else:
+            mux.close(txid)
+        return self._relay(packet, data, end), upstream
+
+    def stats(self):
+        return {
+            "hedged": self.hedged,
+            "servers": [u.stats() for u in self.upstreams],
+        }
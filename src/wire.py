@@ -0,0 +1,187 @@
+import random
+import struct
+from collections import namedtuple
+
+
+# --- DNS WIRE-FORMAT (Fast Path) ---
+# Statt jede Anfrage komplett mit dnslib zu parsen, lesen wir nur Header,
+# Fragename und Typ direkt aus dem UDP-Puffer. Antworten für geblockte Namen
+# entstehen aus vorberechneten Bytes (Header patchen + Frage kopieren +
+# fertiger Antwort-Teil), Upstream-Antworten werden Byte für Byte durchgereicht.
+
+HEADER = struct.Struct("!HHHHHH")
+RR_FIXED = struct.Struct("!HHIH")   # type, class, ttl, rdlength
+
+QTYPE_A = 1
+QTYPE_SOA = 6
+QTYPE_AAAA = 28
+QTYPE_OPT = 41
+CLASS_IN = 1
+
+RCODE_NOERROR = 0
+RCODE_FORMERR = 1
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+
+UDP_DEFAULT_SIZE = 512   # ohne EDNS (RFC 1035)
+EDNS_DO = 0x8000         # DNSSEC OK, oberstes Bit der EDNS-Flags im TTL-Feld
+NO_EDNS = (False, False, UDP_DEFAULT_SIZE)
+
+# qname: kleingeschrieben ohne abschließenden Punkt; end: Offset hinter der Frage
+Question = namedtuple("Question", "txid flags qname qtype qclass end")
+
+
+def parse_question(packet):
+    """ Liest die (einzige) Frage einer Anfrage. None, wenn das kein normaler Query ist. """
+    if len(packet) < 12:
+        return None
+    txid, flags, qdcount = struct.unpack_from("!HHH", packet)
+    # Nur Anfragen (QR=0) mit Opcode QUERY und genau einer Frage
+    if flags & 0xF800 or qdcount != 1:
+        return None
+    labels = []
+    pos = 12
+    try:
+        while True:
+            length = packet[pos]
+            if length == 0:
+                pos += 1
+                break
+            if length > 63:   # Kompression ist in der Frage einer Anfrage nicht üblich
+                return None
+            labels.append(packet[pos + 1:pos + 1 + length])
+            pos += length + 1
+        qtype, qclass = struct.unpack_from("!HH", packet, pos)
+    except (IndexError, struct.error):
+        return None
+    qname = b".".join(labels).decode("latin-1").lower()
+    return Question(txid, flags, qname, qtype, qclass, pos + 4)
+
+
+def _skip_name(packet, pos):
+    while True:
+        length = packet[pos]
+        if length == 0:
+            return pos + 1
+        if length & 0xC0 == 0xC0:
+            return pos + 2
+        pos += length + 1
+
+
+def question_end(packet):
+    """ Offset hinter der (einzigen) Frage, ohne sie zu dekodieren. """
+    return _skip_name(packet, 12) + 4
+
+
+def randomize_case(packet, question_end):
+    """
+    DNS 0x20: Buchstaben im Fragenamen zufällig groß/klein schreiben. Der
+    Upstream schickt die Frage unverändert zurück; eine gefälschte Antwort muss
+    dann neben ID und Port auch die Schreibweise erraten.
+    """
+    wire = bytearray(packet)
+    bits = random.getrandbits(question_end)
+    # Längen-Bytes sind <= 63 und damit nie Buchstaben
+    for pos in range(13, question_end - 4):
+        byte = wire[pos] | 0x20
+        if 0x61 <= byte <= 0x7A and bits >> pos & 1:
+            wire[pos] ^= 0x20
+    return bytes(wire)
+
+
+def scan_records(packet, question_end):
+    """
+    Läuft über alle Resource Records einer Antwort, ohne sie zu dekodieren.
+    Liefert (flags, [(sektion, typ, ttl_offset, ttl, rdata_offset, rdlength), ...]),
+    sektion: 0 = Answer, 1 = Authority, 2 = Additional.
+    """
+    _, flags, _, ancount, nscount, arcount = HEADER.unpack_from(packet)
+    records = []
+    pos = question_end
+    for section, count in enumerate((ancount, nscount, arcount)):
+        for _ in range(count):
+            pos = _skip_name(packet, pos)
+            rtype, _, ttl, rdlength = RR_FIXED.unpack_from(packet, pos)
+            records.append((section, rtype, pos + 4, ttl, pos + 10, rdlength))
+            pos += 10 + rdlength
+    if pos > len(packet):
+        raise ValueError("Antwort abgeschnitten")
+    return flags, records
+
+
+def edns_options(packet, question):
+    """
+    Liest das OPT-Record der Anfrage: (edns, do, udp_size).
+    Ohne OPT (oder bei kaputtem Additional-Teil) gilt NO_EDNS.
+    """
+    _, _, _, ancount, nscount, arcount = HEADER.unpack_from(packet)
+    if not arcount:
+        return NO_EDNS
+    pos = question.end
+    try:
+        # Normalfall: direkt hinter der Frage steht nur das OPT (Root-Name, Typ 41)
+        if not ancount and not nscount and packet[pos:pos + 3] == b"\x00\x00\x29":
+            _, udp_size, ttl, _ = RR_FIXED.unpack_from(packet, pos + 1)
+            return True, bool(ttl & EDNS_DO), max(udp_size, UDP_DEFAULT_SIZE)
+        _, records = scan_records(packet, pos)
+    except (IndexError, ValueError, struct.error):
+        return NO_EDNS
+    for section, rtype, ttl_offset, ttl, _, _ in records:
+        if section == 2 and rtype == QTYPE_OPT:
+            udp_size = struct.unpack_from("!H", packet, ttl_offset - 2)[0]
+            return True, bool(ttl & EDNS_DO), max(udp_size, UDP_DEFAULT_SIZE)
+    return NO_EDNS
+
+
+def truncated(reply, question_end):
+    """ Antwort passt nicht in den UDP-Puffer des Clients: nur Header + Frage mit TC. """
+    txid, flags = struct.unpack_from("!HH", reply)
+    return HEADER.pack(txid, flags | 0x0200, 1, 0, 0, 0) + reply[12:question_end]
+
+
+def same_question(request, reply, question_end):
+    """ Prüft, ob die Antwort dieselbe Frage trägt (Groß/Klein egal, wegen 0x20). """
+    return (len(reply) >= question_end
+            and reply[4:6] == b"\x00\x01"
+            and reply[12:question_end].lower() == request[12:question_end].lower())
+
+
+def _header(question, rcode, ancount):
+    # QR=1 und RA=1, Opcode und RD aus der Anfrage übernehmen
+    flags = 0x8080 | (question.flags & 0x7900) | rcode
+    return HEADER.pack(question.txid, flags, 1, ancount, 0, 0)
+
+
+def error_response(packet, question, rcode=RCODE_SERVFAIL):
+    if question is None:
+        # Frage nicht lesbar: nur Header mit derselben ID zurück
+        txid = struct.unpack_from("!H", packet)[0] if len(packet) >= 2 else 0
+        return HEADER.pack(txid, 0x8080 | rcode, 0, 0, 0, 0)
+    return _header(question, rcode, 0) + packet[12:question.end]
+
+
+class BlockTemplates:
+    """
+    Vorberechnete Antworten für geblockte Namen. Modi:
+      "null"     -> A 0.0.0.0 bzw. AAAA ::, alle anderen Typen (z.B. HTTPS) leer (NODATA)
+      "nxdomain" -> NXDOMAIN für alle Typen
+      "nodata"   -> NOERROR ohne Antwort für alle Typen
+    """
+    MODES = ("null", "nxdomain", "nodata")
+
+    def __init__(self, mode="null", ttl=60):
+        if mode not in self.MODES:
+            raise ValueError(f"Unbekannter BLOCK_MODE: {mode}")
+        self.mode = mode
+        # Antwort-Teil: Zeiger auf den Namen in der Frage (0xC00C) + fester RR
+        self.answers = {}
+        if mode == "null":
+            self.answers[QTYPE_A] = b"\xc0\x0c" + RR_FIXED.pack(QTYPE_A, CLASS_IN, ttl, 4) + bytes(4)
+            self.answers[QTYPE_AAAA] = b"\xc0\x0c" + RR_FIXED.pack(QTYPE_AAAA, CLASS_IN, ttl, 16) + bytes(16)
+        self.rcode = RCODE_NXDOMAIN if mode == "nxdomain" else RCODE_NOERROR
+
+    def response(self, packet, question):
+        answer = self.answers.get(question.qtype) if question.qclass == CLASS_IN else None
+        if answer is None:
+            return _header(question, self.rcode, 0) + packet[12:question.end]
+        return _header(question, RCODE_NOERROR, 1) + packet[12:question.end] + answer
@@ -0,0 +1,32 @@
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+
+@pytest.fixture(scope="session")
+def ghostshield(tmp_path_factory):
+    """
+    GhostShield aus der main.py im Wurzelverzeichnis. Die Datei ist Text mit
+    eingebettetem Code-Block (von der ersten "import"-Zeile bis zum letzten
+    "main()"), deshalb wird nur dieser Block als Modul geladen.
+    """
+    lines = (ROOT / "main.py").read_text(encoding="utf-8").split("\n")
+    start = next(i for i, line in enumerate(lines) if line.startswith("import "))
+    end = max(i for i, line in enumerate(lines) if line.strip() == "main()") + 1
+    module = types.ModuleType("ghostshield")
+    module.__file__ = str(ROOT / "main.py")
+    sys.modules["ghostshield"] = module
+    # Beim Import legt das Modul ghostshield.log im aktuellen Verzeichnis an
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("log"))
+    try:
+        exec(compile("\n" * start + "\n".join(lines[start:end]), module.__file__, "exec"), module.__dict__)
+    finally:
+        os.chdir(cwd)
+    return module
@@ -0,0 +1,37 @@
+import struct
+
+# --- DNS-PAKETE FÜR DIE TESTS ---
+
+
+def encode_name(name):
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\x00"
+
+
+def query(name, qtype=1, txid=0x1234, udp_size=None, do=False):
+    """ Anfrage wie von einem Client; udp_size setzt ein OPT-Record (EDNS). """
+    packet = struct.pack("!HHHHHH", txid, 0x0100, 1, 0, 0, 1 if udp_size else 0)
+    packet += encode_name(name) + struct.pack("!HH", qtype, 1)
+    if udp_size:
+        packet += b"\x00" + struct.pack("!HHIH", 41, udp_size, 0x8000 if do else 0, 0)
+    return packet
+
+
+def a_record(ttl, address=(10, 0, 0, 1)):
+    return b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, ttl, 4) + bytes(address)
+
+
+def soa_record(ttl, minimum):
+    rdata = b"\x00\x00" + struct.pack("!IIIII", 1, 3600, 600, 86400, minimum)
+    return b"\xc0\x0c" + struct.pack("!HHIH", 6, 1, ttl, len(rdata)) + rdata
+
+
+def reply(request, question_end, answers=(), authority=(), rcode=0, flags=0x8180):
+    """ Upstream-Antwort auf request (ohne Additional-Teil). """
+    header = struct.pack("!HHHHHH", struct.unpack_from("!H", request)[0], flags | rcode,
+                         1, len(answers), len(authority), 0)
+    return header + request[12:question_end] + b"".join(answers) + b"".join(authority)
+
+
+def ttls(packet, question_end):
+    from wire import scan_records
+    return [ttl for _, _, _, ttl, _, _ in scan_records(packet, question_end)[1]]
@@ -0,0 +1,85 @@
+import logging
+
+import pytest
+
+
+def yes(prompt):
+    return True
+
+
+@pytest.fixture
+def shield(ghostshield, tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        for i in range(3):
+            (tmp_path / name / f"f{i}").write_text(f"{name}{i}" * 100)
+    return ghostshield.GhostShield(tmp_path)
+
+
+def test_state_follows_shield_and_unshield(shield, tmp_path):
+    item = str(tmp_path / "a")
+    assert shield.index.state("a") is None
+    assert shield.shield(item, yes)
+    assert shield.index.state("a") == "shielded"
+    assert shield.unshield(item, yes)
+    assert shield.index.state("a") == "restored"
+    (tmp_path / "a" / "f0").write_text("neu")
+    assert shield.shield(item, yes)
+    assert shield.index.state("a") == "shielded"
+
+    versions = [name for relative, state, name, size in shield.index.entries() if relative == "a"]
+    assert len(versions) == 2 and versions == sorted(versions, reverse=True)
+    assert shield.index.latest("a") == versions[0]
+
+
+def test_shield_refuses_already_shielded_item(shield, tmp_path):
+    item = str(tmp_path / "a")
+    assert shield.shield(item, yes)
+    latest = shield.index.latest("a")
+
+    # Die leere Attrappe darf nicht zur neuesten Version werden
+    assert not shield.shield(item, yes)
+    assert not shield.run_batch("shield", [item], 1, yes)
+    assert shield.index.latest("a") == latest
+
+    assert shield.unshield(item, yes)
+    assert (tmp_path / "a" / "f2").read_text() == "a2" * 100
+
+    # Mit force wird die Attrappe bewusst als neue Version gesichert
+    assert shield.shield(item, yes)
+    assert shield.shield(item, yes, force=True)
+    assert shield.index.latest("a") != latest
+
+
+def test_index_is_rebuilt_from_manifests(ghostshield, shield, tmp_path):
+    assert shield.run_batch("shield", [str(tmp_path / "a"), str(tmp_path / "b")], 2, yes)
+    assert shield.unshield(str(tmp_path / "b"), yes)
+    before = shield.index.entries()
+
+    shield.index.path.unlink()
+    rebuilt = ghostshield.GhostShield(tmp_path)
+    assert rebuilt.index.created
+    assert rebuilt.index.entries() == before
+    # Der Zustand kommt beim Neuaufbau von der Platte
+    assert rebuilt.index.state("a") == "shielded"
+    assert rebuilt.index.state("b") == "restored"
+
+
+def test_diff_lists_changes_since_last_version(shield, tmp_path, caplog):
+    item = str(tmp_path / "a")
+    assert shield.shield(item, yes)
+    assert shield.unshield(item, yes)
+    assert not shield.diff(item)
+
+    (tmp_path / "a" / "f0").write_text("geändert, andere Länge")
+    (tmp_path / "a" / "f1").unlink()
+    (tmp_path / "a" / "neu").write_text("neu")
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        assert shield.diff(item)
+    lines = [record.getMessage() for record in caplog.records]
+    assert [line for line in lines if line.startswith("  ")] == ["  A neu", "  M f0", "  D f1"]
+    assert lines[-1].startswith("1 neu, 1 geändert, 1 gelöscht, ")
+
+    # diff schreibt nichts: keine neue Version
+    assert len(shield.index.entries()) == 1
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+
+def yes(prompt):
+    return True
+
+
+@pytest.fixture
+def shield(ghostshield, tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        for i in range(3):
+            (tmp_path / name / f"f{i}").write_text(f"{name}{i}" * 100)
+    return ghostshield.GhostShield(tmp_path)
+
+
+def manifests(shield, name):
+    return sorted((shield.backup_root_dir / name).glob("*.manifest"))
+
+
+def test_load_skips_failed_records_and_torn_lines(ghostshield, tmp_path):
+    journal = ghostshield.BatchJournal(tmp_path / "journal")
+    journal.start("shield", ["/x", "/y"], 2, {})
+    journal.record("/x", "backed_up", backup="/backup/x")
+    journal.record("/x", "failed")
+    journal.record("/y", "done")
+    journal.close(finished=False)
+    with open(tmp_path / "journal", "a", encoding="utf-8") as f:
+        f.write('{"item": "/y", "st')   # Absturz mitten im Schreiben
+
+    pending = ghostshield.BatchJournal(tmp_path / "journal").load()
+    assert pending["command"] == "shield" and pending["items"] == ["/x", "/y"]
+    assert pending["steps"]["/x"] == {"item": "/x", "step": "backed_up", "backup": "/backup/x"}
+    assert pending["steps"]["/y"]["step"] == "done"
+
+
+def test_finished_batch_removes_journal(shield, tmp_path, ghostshield):
+    assert shield.run_batch("shield", [str(tmp_path / "a"), str(tmp_path / "b")], 2, yes)
+    assert not (shield.backup_root_dir / ghostshield.JOURNAL_FILE_NAME).exists()
+    for name in ("a", "b"):
+        assert list((tmp_path / name).iterdir()) == []
+        assert len(manifests(shield, name)) == 1
+
+
+def test_resume_continues_after_backed_up(shield, tmp_path, ghostshield, monkeypatch):
+    journal_path = shield.backup_root_dir / ghostshield.JOURNAL_FILE_NAME
+    remove_tree = shield.engine.remove_tree
+
+    def broken(path, label="Löschen"):
+        # Backup steht schon, das Original ist beim Abbruch nur halb gelöscht
+        if path.name == "b":
+            (path / "f0").unlink()
+            raise OSError("Platte weg")
+        remove_tree(path, label)
+
+    monkeypatch.setattr(shield.engine, "remove_tree", broken)
+    assert not shield.run_batch("shield", [str(tmp_path / "a"), str(tmp_path / "b")], 1, yes)
+
+    # Das halb gelöschte Element hält das Journal am Leben, ein neuer Batch wird abgelehnt
+    steps = [json.loads(line) for line in journal_path.read_text(encoding="utf-8").splitlines()]
+    assert {"item": str(tmp_path / "b"), "step": "failed"} in steps
+    assert not shield.run_batch("shield", [str(tmp_path / "a")], 1, yes)
+
+    monkeypatch.setattr(shield.engine, "remove_tree", remove_tree)
+    assert shield.run_batch("", [], 1, yes, resume=True)
+    assert not journal_path.exists()
+    for name in ("a", "b"):
+        assert list((tmp_path / name).iterdir()) == []
+        # Beim Fortsetzen kein zweites Backup vom halb gelöschten Original
+        assert len(manifests(shield, name)) == 1
+
+    # Die Sicherung von b ist vollständig
+    assert shield.run_batch("unshield", [str(tmp_path / "b")], 1, yes)
+    assert sorted(p.name for p in (tmp_path / "b").iterdir()) == ["f0", "f1", "f2"]
+    assert (tmp_path / "b" / "f0").read_text() == "b0" * 100
+
+
+def test_resume_without_journal_fails(shield):
+    assert not shield.run_batch("", [], 1, yes, resume=True)
+
+
+def test_unshield_refuses_changed_items_unless_forced(shield, tmp_path):
+    item = str(tmp_path / "a")
+    assert shield.run_batch("shield", [item], 1, yes)
+    (tmp_path / "a" / "new").write_text("in der Attrappe angelegt")
+
+    assert not shield.run_batch("unshield", [item], 1, yes)
+    assert (tmp_path / "a" / "new").exists()
+
+    assert shield.run_batch("unshield", [item], 1, yes, force=True)
+    assert sorted(p.name for p in (tmp_path / "a").iterdir()) == ["f0", "f1", "f2"]
@@ -0,0 +1,96 @@
+import pytest
+
+from blocklist import BlocklistIndex, IndexBuilder, parse_rule
+
+
+@pytest.mark.parametrize("rule, expected", [
+    ("example.com", ("suffix", "example.com")),
+    (" Example.COM. ", ("suffix", "example.com")),
+    ("*.example.com", ("wildcard", "example.com")),
+])
+def test_parse_rule(rule, expected):
+    assert parse_rule(rule) == expected
+
+
+def test_parse_rule_without_subdomains_is_exact():
+    assert parse_rule("example.com", include_subdomains=False) == ("exact", "example.com")
+    # Wildcards bleiben Wildcards, egal wie include_subdomains steht
+    assert parse_rule("*.example.com", include_subdomains=False) == ("wildcard", "example.com")
+
+
+@pytest.mark.parametrize("name, blocked", [
+    ("ads.example.com", True),
+    ("a.b.ads.example.com", True),
+    ("ADS.Example.com.", True),
+    ("example.com", False),
+    ("badads.example.com", False),      # Suffix nur an Label-Grenzen
+    ("ads.example.com.evil", False),
+    ("", False),
+])
+def test_suffix_rule_matches_domain_and_subdomains(name, blocked):
+    index = BlocklistIndex.from_rules(["ads.example.com"])
+    assert index.is_blocked(name) is blocked
+    assert (name in index) is blocked
+
+
+def test_exact_rule_matches_only_the_domain():
+    index = BlocklistIndex.from_rules(["ads.example.com"], include_subdomains=False)
+    assert index.is_blocked("ads.example.com")
+    assert not index.is_blocked("x.ads.example.com")
+    assert not index.is_blocked("example.com")
+
+
+def test_wildcard_rule_matches_only_subdomains():
+    index = BlocklistIndex.from_rules(["*.tracker.net"])
+    assert not index.is_blocked("tracker.net")
+    assert index.is_blocked("a.tracker.net")
+    assert index.is_blocked("a.b.tracker.net")
+
+
+def test_allowlist_wins_over_blocklist():
+    index = BlocklistIndex.from_rules(["example.com"], ["good.example.com"])
+    assert index.is_blocked("example.com")
+    assert index.is_blocked("ads.example.com")
+    assert not index.is_blocked("good.example.com")
+    assert not index.is_blocked("cdn.good.example.com")
+
+
+def test_allowlist_uses_rule_syntax():
+    index = BlocklistIndex.from_rules(["example.com"], ["*.good.example.com"])
+    assert index.is_blocked("good.example.com")
+    assert not index.is_blocked("cdn.good.example.com")
+
+    exact = BlocklistIndex.from_rules(["example.com"], ["good.example.com"], include_subdomains=False)
+    # Ohne Subdomains blockt example.com nur sich selbst, die Allowlist nur good.example.com
+    assert not exact.is_blocked("good.example.com")
+    assert exact.is_blocked("example.com")
+
+
+def test_allowlist_alone_blocks_nothing():
+    index = BlocklistIndex.from_rules([], ["example.com"])
+    assert not index.is_blocked("example.com")
+    assert len(index) == 0
+
+
+def test_builder_deduplicates_and_merges():
+    first = IndexBuilder()
+    first.add("ads.example.com")
+    first.add("ADS.example.com.")
+    second = IndexBuilder()
+    second.add("example.net", kind="wildcard")
+    second.add("ads.example.com", allow=True)
+    index = first.merge(second).compact().build()
+
+    assert len(index) == 2
+    assert not index.is_blocked("ads.example.com")
+    assert index.is_blocked("a.example.net")
+    assert not index.is_blocked("example.net")
+    assert index.memory_bytes() == 3 * 8
+
+
+def test_builder_ignores_empty_domains():
+    builder = IndexBuilder()
+    builder.add("  ")
+    builder.add_rule(".")
+    assert len(builder) == 0
+    assert not builder.build().is_blocked("com")
@@ -0,0 +1,126 @@
+import struct
+
+import pytest
+
+import dnscache
+from dnscache import DNSCache
+from packets import a_record, query, reply, soa_record, ttls
+from wire import parse_question
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dnscache.time, "monotonic", clock)
+    return clock
+
+
+def cached(cache, packet):
+    return cache.get(packet, parse_question(packet))
+
+
+def store(cache, packet, *args, **kwargs):
+    question = parse_question(packet)
+    cache.put(packet, question, reply(packet, question.end, *args, **kwargs))
+    return question
+
+
+def test_ttl_counts_down_until_expiry(clock):
+    cache = DNSCache()
+    packet = query("www.example.org")
+    question = store(cache, packet, [a_record(300), a_record(100, (10, 0, 0, 2))])
+
+    clock.now += 40
+    again = query("WWW.example.org", txid=0x9999)
+    hit = cached(cache, again)
+    # ID und Schreibweise kommen aus der neuen Anfrage, die TTLs sind heruntergezählt
+    assert hit[:2] == b"\x99\x99"
+    assert hit[12:question.end] == again[12:question.end]
+    assert ttls(hit, question.end) == [60, 60]
+
+    clock.now += 60
+    assert cached(cache, packet) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_ttl_is_clamped(clock):
+    cache = DNSCache(min_ttl=30, max_ttl=120)
+    packet = query("www.example.org")
+    question = store(cache, packet, [a_record(5000)])
+    assert ttls(cached(cache, packet), question.end) == [120]
+    clock.now += 121
+    assert cached(cache, packet) is None
+
+    short = query("short.example.org")
+    store(cache, short, [a_record(1)])
+    clock.now += 20
+    assert cached(cache, short) is not None
+
+
+@pytest.mark.parametrize("rcode", [3, 0])   # NXDOMAIN und NODATA
+def test_negative_answer_uses_soa_minimum(clock, rcode):
+    cache = DNSCache()
+    packet = query("nothing.example.org")
+    store(cache, packet, authority=[soa_record(900, 120)], rcode=rcode)
+
+    clock.now += 119
+    hit = cached(cache, packet)
+    assert hit is not None and struct.unpack_from("!H", hit, 2)[0] & 0x000F == rcode
+    clock.now += 2
+    assert cached(cache, packet) is None
+
+
+def test_negative_ttl_is_capped(clock):
+    cache = DNSCache(max_neg_ttl=60)
+    packet = query("nothing.example.org")
+    store(cache, packet, authority=[soa_record(3600, 3600)], rcode=3)
+    clock.now += 61
+    assert cached(cache, packet) is None
+
+
+def test_uncacheable_answers(clock):
+    cache = DNSCache()
+    no_soa = query("nosoa.example.org")
+    store(cache, no_soa, rcode=3)
+    truncated = query("big.example.org")
+    store(cache, truncated, [a_record(300)], flags=0x8380)
+    servfail = query("broken.example.org")
+    store(cache, servfail, rcode=2)
+    assert cache.stats()["size"] == 0
+
+
+def test_edns_answers_stay_with_edns_clients(clock):
+    cache = DNSCache()
+    signed = query("www.example.org", udp_size=4096, do=True)
+    question = store(cache, signed, [a_record(300, (10, 0, 0, i)) for i in range(50)])
+
+    assert cached(cache, query("www.example.org")) is None
+    assert cached(cache, query("www.example.org", udp_size=4096)) is None
+    assert len(cached(cache, signed)) > 512
+
+    # Treffer größer als der UDP-Puffer des Clients: nur Header + Frage mit TC
+    small = query("www.example.org", udp_size=512, do=True)
+    hit = cached(cache, small)
+    _, flags, qdcount, ancount = struct.unpack_from("!HHHH", hit)
+    assert flags & 0x0200 and (qdcount, ancount) == (1, 0)
+    assert hit[12:] == small[12:question.end]
+
+
+def test_lru_eviction(clock):
+    cache = DNSCache(max_entries=2)
+    packets = [query(f"host{i}.example.org") for i in range(3)]
+    store(cache, packets[0], [a_record(300)])
+    store(cache, packets[1], [a_record(300)])
+    cached(cache, packets[0])
+    store(cache, packets[2], [a_record(300)])
+    assert cached(cache, packets[1]) is None
+    assert cached(cache, packets[0]) is not None
+    assert cache.stats()["evictions"] == 1
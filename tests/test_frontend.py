@@ -0,0 +1,19 @@
+import socket
+import threading
+
+import pytest
+
+from frontend import start_frontend
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="Worker brauchen SO_REUSEPORT")
+def test_workers_are_not_forked_while_other_threads_run():
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, daemon=True)
+    thread.start()
+    try:
+        with pytest.raises(RuntimeError):
+            start_frontend(None, "127.0.0.1", 0, None, workers=2)
+    finally:
+        stop.set()
+        thread.join()
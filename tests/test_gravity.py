@@ -0,0 +1,92 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from gravity import Gravity
+
+
+class BlocklistServer(ThreadingHTTPServer):
+    """ Liefert eine Hosts-Liste mit ETag und antwortet 304, wenn der Client sie schon hat. """
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), BlocklistHandler)
+        self.body = b"0.0.0.0 ads.example.com\n"
+        self.etag = '"v1"'
+        self.requests = []   # (Status, If-None-Match)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/hosts.txt"
+
+
+class BlocklistHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        seen = self.headers.get("If-None-Match")
+        if seen == server.etag:
+            server.requests.append((304, seen))
+            self.send_response(304)
+            self.end_headers()
+            return
+        server.requests.append((200, seen))
+        self.send_response(200)
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(server.body)))
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = BlocklistServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_unchanged_list_is_not_downloaded_again(server):
+    gravity = Gravity([server.url])
+    assert gravity.refresh() is True
+    assert gravity.build().is_blocked("ads.example.com")
+
+    assert gravity.refresh() is False
+    assert server.requests == [(200, None), (304, '"v1"')]
+    # Bei 304 bleiben die geparsten Daten der Quelle erhalten
+    assert gravity.build().is_blocked("ads.example.com")
+
+
+def test_changed_list_is_reloaded(server):
+    gravity = Gravity([server.url])
+    gravity.refresh()
+    server.body = b"0.0.0.0 tracker.example.net\n"
+    server.etag = '"v2"'
+
+    assert gravity.refresh() is True
+    assert server.requests[-1] == (200, '"v1"')
+    index = gravity.build()
+    assert index.is_blocked("tracker.example.net")
+    assert not index.is_blocked("ads.example.com")
+    assert gravity.sources[0].etag == '"v2"'
+
+
+def test_failed_download_keeps_previous_list(server):
+    gravity = Gravity([server.url])
+    gravity.refresh()
+    server.shutdown()
+    server.server_close()
+    assert gravity.refresh() is False
+    assert gravity.build().is_blocked("ads.example.com")
+
+
+def test_allowlist_and_config_hash(server):
+    gravity = Gravity([server.url], allowlist=["ads.example.com"])
+    gravity.refresh()
+    assert not gravity.build().is_blocked("ads.example.com")
+    assert gravity.config_hash() != Gravity([server.url]).config_hash()
+    assert gravity.config_hash() == Gravity([server.url], allowlist=["ads.example.com"]).config_hash()
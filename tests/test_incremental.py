@@ -0,0 +1,142 @@
+import json
+import os
+import time
+
+import pytest
+
+HOUR_NS = 3600 * 10**9
+
+
+def yes(prompt):
+    return True
+
+
+@pytest.fixture
+def shield(ghostshield, tmp_path):
+    item = tmp_path / "a"
+    item.mkdir()
+    old = time.time_ns() - HOUR_NS
+    for i in range(3):
+        path = item / f"f{i}"
+        path.write_text(f"inhalt {i}" * 100)
+        os.utime(path, ns=(old, old))
+    return ghostshield.GhostShield(tmp_path)
+
+
+@pytest.fixture
+def no_reads(shield, monkeypatch):
+    """ Zählt, welche Dateien gelesen werden. """
+    read = []
+    for name in ("store_file", "digest_file"):
+        original = getattr(shield.store, name)
+        monkeypatch.setattr(shield.store, name, lambda path, original=original: read.append(path.name) or original(path))
+    return read
+
+
+def build(shield, tmp_path, previous):
+    return shield._build_manifest(tmp_path / "a", previous)
+
+
+def test_unchanged_files_are_not_read(shield, tmp_path, no_reads):
+    previous, _ = build(shield, tmp_path, None)
+    no_reads.clear()
+    manifest, changes = build(shield, tmp_path, previous)
+    assert no_reads == []
+    assert changes["added"] == changes["modified"] == changes["deleted"] == []
+    assert changes["unchanged"] == 4 and changes["hashed"] == 0
+    assert manifest["entries"] == previous["entries"]
+
+
+def test_same_size_change_inside_racy_window_is_rehashed(ghostshield, shield, tmp_path, no_reads):
+    path = tmp_path / "a" / "f1"
+    mtime = path.stat().st_mtime_ns + 10 * 10**9
+    os.utime(path, ns=(mtime, mtime))
+    previous, _ = build(shield, tmp_path, None)
+    # Letzter Scan lief kurz nach der Änderung (innerhalb des Sicherheitsabstands)
+    previous["scanned_ns"] = mtime + ghostshield.RACY_MARGIN_NS // 2
+    path.write_text("INHALT 1" * 100)
+    os.utime(path, ns=(mtime, mtime))
+    no_reads.clear()
+
+    _, changes = build(shield, tmp_path, previous)
+    assert changes["modified"] == ["f1"]
+    assert no_reads == ["f1"]
+
+    # Außerhalb des Abstands gilt gleiche Größe + mtime + Inode als unverändert
+    previous["scanned_ns"] = mtime + 2 * ghostshield.RACY_MARGIN_NS
+    no_reads.clear()
+    _, changes = build(shield, tmp_path, previous)
+    assert changes["modified"] == [] and no_reads == []
+
+
+def test_replaced_inode_is_rehashed(shield, tmp_path, no_reads):
+    path = tmp_path / "a" / "f2"
+    previous, _ = build(shield, tmp_path, None)
+    st = path.stat()
+    replacement = tmp_path / "a" / "neu.tmp"
+    replacement.write_text("INHALT 2" * 100)
+    os.utime(replacement, ns=(st.st_mtime_ns, st.st_mtime_ns))
+    os.replace(replacement, path)
+    assert path.stat().st_ino != st.st_ino
+    no_reads.clear()
+
+    _, changes = build(shield, tmp_path, previous)
+    assert changes["modified"] == ["f2"] and no_reads == ["f2"]
+
+
+def test_same_content_under_new_inode_only_counts_as_hashed(shield, tmp_path, no_reads):
+    path = tmp_path / "a" / "f0"
+    previous, _ = build(shield, tmp_path, None)
+    st = path.stat()
+    copy = tmp_path / "a" / "kopie.tmp"
+    copy.write_bytes(path.read_bytes())
+    os.utime(copy, ns=(st.st_mtime_ns, st.st_mtime_ns))
+    os.replace(copy, path)
+    no_reads.clear()
+
+    _, changes = build(shield, tmp_path, previous)
+    assert changes["modified"] == [] and changes["hashed"] == 1 and no_reads == ["f0"]
+
+
+def test_renamed_file_is_deleted_plus_added(shield, tmp_path):
+    previous, _ = build(shield, tmp_path, None)
+    os.rename(tmp_path / "a" / "f0", tmp_path / "a" / "umbenannt")
+    _, changes = build(shield, tmp_path, previous)
+    assert changes["added"] == ["umbenannt"] and changes["deleted"] == ["f0"]
+
+
+def test_inode_sidecar_after_restore(ghostshield, shield, tmp_path, no_reads):
+    item = str(tmp_path / "a")
+    assert shield.shield(item, yes)
+    assert shield.unshield(item, yes)
+    latest = shield._find_latest_backup_path(tmp_path / "a")
+    sidecar = latest.with_name(latest.name + ghostshield.INODES_SUFFIX)
+    inodes = json.loads(sidecar.read_text())
+    assert inodes["f0"] == (tmp_path / "a" / "f0").stat().st_ino
+
+    # Das Dateisystem kann die alten Inode-Nummern wiederverwenden; damit der Test
+    # nicht davon abhängt, zeigt das Manifest hier auf andere Inodes
+    manifest = json.loads(latest.read_text())
+    for entry in manifest["entries"]:
+        if entry["type"] == "file":
+            entry["ino"] += 10**9
+    latest.write_text(json.dumps(manifest))
+
+    # Mit der Notiz gelten die wiederhergestellten Dateien als unverändert ...
+    no_reads.clear()
+    _, changes = build(shield, tmp_path, shield._previous_manifest(tmp_path / "a"))
+    assert changes["hashed"] == 0 and no_reads == []
+
+    # ... ohne sie wird jede Datei zur Sicherheit neu gehasht
+    sidecar.unlink()
+    _, changes = build(shield, tmp_path, shield._previous_manifest(tmp_path / "a"))
+    assert changes["hashed"] == 3 and changes["modified"] == []
+
+
+def test_new_manifest_drops_stale_sidecar(ghostshield, shield, tmp_path):
+    manifest_path = shield.backup_root_dir / "a" / "20000101_000000.manifest"
+    manifest_path.parent.mkdir(parents=True)
+    sidecar = manifest_path.with_name(manifest_path.name + ghostshield.INODES_SUFFIX)
+    sidecar.write_text('{"f0": 1}')
+    shield._write_manifest(manifest_path, {"entries": []})
+    assert not sidecar.exists()
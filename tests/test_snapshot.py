@@ -0,0 +1,167 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from gravity import Gravity
+from snapshot import HEADER, MAGIC, VERSION, SnapshotError, open_snapshot, save_snapshot
+from blocklist import BlocklistIndex
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def build(*args):
+    return subprocess.run([sys.executable, str(ROOT / "src" / "snapshot.py"), "build", *args],
+                          capture_output=True, text=True)
+
+
+@pytest.fixture
+def hosts(tmp_path):
+    path = tmp_path / "hosts.txt"
+    path.write_text("0.0.0.0 ads.example.com\n")
+    return path
+
+
+@pytest.fixture
+def index():
+    return BlocklistIndex.from_rules(["ads.example.com", "*.tracker.net"], ["good.ads.example.com"])
+
+
+@pytest.fixture
+def resolver_main(monkeypatch, capsys):
+    import main
+    capsys.readouterr()
+    monkeypatch.setattr(main, "blocklist", BlocklistIndex())
+    return main
+
+
+def test_roundtrip_keeps_rules_and_config(index, tmp_path):
+    path = tmp_path / "gravity.snap"
+    save_snapshot(index, path, config=0x1234abcd)
+    snapshot = open_snapshot(path)
+    assert snapshot.config == 0x1234abcd
+    assert abs(snapshot.age()) < 5
+    assert len(snapshot.index) == len(index) == 2
+    for name in ("ads.example.com", "x.ads.example.com", "a.tracker.net"):
+        assert snapshot.index.is_blocked(name)
+    for name in ("good.ads.example.com", "tracker.net", "example.com"):
+        assert not snapshot.index.is_blocked(name)
+    assert not (tmp_path / "gravity.snap.tmp").exists()
+
+
+def test_header_layout(index, tmp_path):
+    path = tmp_path / "gravity.snap"
+    save_snapshot(index, path, config=7)
+    data = path.read_bytes()
+    magic, version, byteorder, crc, created, config, *counts = HEADER.unpack_from(data)
+    assert HEADER.size == 80
+    assert (magic, version, config) == (MAGIC, VERSION, 7)
+    # Block exact/suffix/wildcard, dann Allow exact/suffix/wildcard
+    assert counts == [0, 1, 1, 0, 1, 0]
+    assert len(data) == HEADER.size + 8 * sum(counts)
+
+
+def damage(path, offset, data):
+    raw = bytearray(path.read_bytes())
+    raw[offset:offset + len(data)] = data
+    path.write_bytes(bytes(raw))
+
+
+@pytest.mark.parametrize("corrupt, message", [
+    (lambda p: damage(p, 0, b"NOTGHOST"), "kein GhostShield-Snapshot"),
+    (lambda p: damage(p, 8, (VERSION + 1).to_bytes(2, "little")), "Version"),
+    (lambda p: damage(p, 10, b"\x03"), "Byte-Reihenfolge"),
+    (lambda p: p.write_bytes(p.read_bytes() + b"\0" * 8), "Größe"),
+    (lambda p: p.write_bytes(p.read_bytes()[:-8]), "Größe"),
+    (lambda p: p.write_bytes(p.read_bytes()[:HEADER.size - 1]), "zu kurz"),
+    (lambda p: damage(p, HEADER.size, b"\xff"), "Prüfsumme"),
+])
+def test_damaged_snapshot_is_rejected(index, tmp_path, corrupt, message):
+    path = tmp_path / "gravity.snap"
+    save_snapshot(index, path)
+    corrupt(path)
+    with pytest.raises(SnapshotError, match=message):
+        open_snapshot(path)
+
+
+def test_checksum_can_be_skipped(index, tmp_path):
+    path = tmp_path / "gravity.snap"
+    save_snapshot(index, path)
+    damage(path, path.stat().st_size - 1, b"\xff")
+    with pytest.raises(SnapshotError):
+        open_snapshot(path)
+    assert len(open_snapshot(path, verify=False).index) == 2
+
+
+def test_replaced_snapshot_keeps_old_mapping(index, tmp_path):
+    # Worker lesen den alten mmap weiter, bis sie die neue Datei öffnen
+    path = tmp_path / "gravity.snap"
+    save_snapshot(index, path)
+    old = open_snapshot(path)
+    save_snapshot(BlocklistIndex.from_rules(["new.example.org"]), path)
+    new = open_snapshot(path)
+
+    assert old.index.is_blocked("ads.example.com")
+    assert not old.index.is_blocked("new.example.org")
+    assert new.index.is_blocked("new.example.org")
+    assert not new.index.is_blocked("ads.example.com")
+
+
+def test_build_writes_snapshot(hosts, tmp_path):
+    output = tmp_path / "gravity.snap"
+    result = build(str(hosts), "-o", str(output))
+    assert result.returncode == 0, result.stdout
+    snapshot = open_snapshot(output)
+    assert snapshot.index.is_blocked("ads.example.com")
+    assert snapshot.config == Gravity([str(hosts)]).config_hash()
+    assert snapshot.config != Gravity([str(hosts)], include_subdomains=False).config_hash()
+
+
+@pytest.mark.parametrize("ok_sources", [0, 1])
+def test_build_fails_when_a_source_does_not_load(hosts, tmp_path, ok_sources):
+    output = tmp_path / "gravity.snap"
+    output.write_bytes(b"alt")
+    result = build(*[str(hosts)] * ok_sources, str(tmp_path / "fehlt.txt"), "-o", str(output))
+    assert result.returncode == 1
+    assert "fehlt.txt" in result.stdout
+    assert output.read_bytes() == b"alt"
+
+
+def test_load_gravity_keeps_snapshot_when_a_source_never_loaded(resolver_main, hosts, tmp_path, monkeypatch, capsys):
+    snap = tmp_path / "gravity.snap"
+    save_snapshot(BlocklistIndex.from_rules(["ads.example.com", "tracker.example.net"]), snap)
+    before = snap.read_bytes()
+    monkeypatch.setattr(resolver_main, "GRAVITY_SNAPSHOT", str(snap))
+    monkeypatch.setattr(resolver_main, "gravity", Gravity([str(hosts), str(tmp_path / "fehlt.txt")]))
+    resolver_main.blocklist = open_snapshot(snap).index
+
+    resolver_main.load_gravity()
+    out = capsys.readouterr().out
+    assert "fehlt.txt" in out and "Snapshot bleibt aktiv" in out
+    assert snap.read_bytes() == before
+    assert resolver_main.blocklist.is_blocked("tracker.example.net")
+
+
+def test_load_gravity_reports_outage_instead_of_unchanged(resolver_main, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(resolver_main, "GRAVITY_SNAPSHOT", None)
+    monkeypatch.setattr(resolver_main, "gravity", Gravity([str(tmp_path / "fehlt.txt")]))
+    resolver_main.load_gravity()
+    out = capsys.readouterr().out
+    assert "unverändert" not in out
+    assert "1 Blocklisten nicht geladen" in out
+
+
+def test_load_gravity_without_snapshot_uses_partial_index_but_does_not_save(resolver_main, hosts, tmp_path,
+                                                                             monkeypatch, capsys):
+    snap = tmp_path / "gravity.snap"
+    monkeypatch.setattr(resolver_main, "GRAVITY_SNAPSHOT", str(snap))
+    monkeypatch.setattr(resolver_main, "gravity", Gravity([str(hosts), str(tmp_path / "fehlt.txt")]))
+    resolver_main.load_gravity()
+    assert resolver_main.blocklist.is_blocked("ads.example.com")
+    assert not snap.exists()
+
+    # Sobald alle Quellen da sind, wird der Snapshot geschrieben
+    (tmp_path / "fehlt.txt").write_text("tracker.example.net\n")
+    resolver_main.load_gravity()
+    assert open_snapshot(snap).index.is_blocked("tracker.example.net")
@@ -0,0 +1,257 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from frontend import UpstreamMux
+from packets import query
+from upstream import UpstreamPool
+
+
+class StubUpstream:
+    """ UDP-Upstream, der jede Anfrage nach delay mit NOERROR beantwortet (delay None: nie). """
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.received = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.address = self.sock.getsockname()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                data, client = self.sock.recvfrom(512)
+            except OSError:
+                return
+            self.received += 1
+            if self.delay is None:
+                continue
+            threading.Timer(self.delay, self._answer, (data, client)).start()
+
+    def _answer(self, data, client):
+        try:
+            self.sock.sendto(data[:2] + b"\x81\x80" + data[4:], client)
+        except OSError:
+            pass
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def stubs():
+    created = []
+
+    def make(delay=0.0):
+        stub = StubUpstream(delay)
+        created.append(stub)
+        return stub
+    yield make
+    for stub in created:
+        stub.close()
+
+
+def test_answer_keeps_client_id(stubs):
+    fast = stubs()
+    pool = UpstreamPool([fast.address], timeout=1.0)
+    packet = query("www.example.org", txid=0x4242)
+    answer, upstream = pool.query(packet)
+    assert answer[:2] == b"\x42\x42" and answer[12:] == packet[12:]
+    assert upstream.address == fast.address
+    assert upstream.answers == 1 and upstream.srtt is not None
+
+
+def test_hedge_goes_to_backup_when_primary_is_slow(stubs):
+    slow, fast = stubs(0.5), stubs()
+    pool = UpstreamPool([slow.address, fast.address], timeout=2.0, hedge_initial=0.05)
+    started = time.monotonic()
+    _, upstream = pool.query(query("www.example.org"))
+    assert time.monotonic() - started < 0.4
+    assert upstream.address == fast.address
+    assert pool.hedged == 1
+
+    # Die späte Antwort macht daraus ein verlorenes Rennen, keinen Fehlschlag
+    primary = pool.upstreams[0]
+    assert primary.lost_races == 0
+    time.sleep(0.6)
+    assert primary.lost_races == 1
+    assert primary.timeouts == 0 and primary.fails == 0
+    assert primary.healthy(time.monotonic())
+
+
+def test_dead_primary_is_ejected_although_backup_answers(stubs):
+    dead, alive = stubs(None), stubs()
+    pool = UpstreamPool([dead.address, alive.address], timeout=0.3, max_fails=1,
+                        eject_seconds=30, hedge_initial=0.05)
+    _, upstream = pool.query(query("www.example.org"))
+    assert upstream.address == alive.address
+
+    primary = pool.upstreams[0]
+    time.sleep(0.4)
+    assert primary.timeouts == 1 and primary.lost_races == 0
+    assert not primary.healthy(time.monotonic())
+
+    _, upstream = pool.query(query("www.example.org"))
+    assert upstream.address == alive.address and dead.received == 1
+
+
+def test_async_dead_primary_is_ejected_although_backup_answers(stubs):
+    dead, alive = stubs(None), stubs()
+    pool = UpstreamPool([dead.address, alive.address], timeout=0.3, max_fails=1,
+                        eject_seconds=30, hedge_initial=0.05)
+
+    async def run():
+        mux = await UpstreamMux().start(("127.0.0.1", 0))
+        try:
+            _, upstream = await pool.query_async(mux, query("www.example.org"))
+            assert upstream.address == alive.address
+            assert pool.upstreams[0].timeouts == 0
+            await asyncio.sleep(0.4)
+            assert not mux.pending
+        finally:
+            mux.shutdown()
+
+    asyncio.run(run())
+    primary = pool.upstreams[0]
+    assert primary.timeouts == 1 and primary.lost_races == 0
+    assert not primary.healthy(time.monotonic())
+
+
+def test_async_late_primary_only_loses_the_race(stubs):
+    slow, fast = stubs(0.2), stubs()
+    pool = UpstreamPool([slow.address, fast.address], timeout=1.0, hedge_initial=0.05)
+
+    async def run():
+        mux = await UpstreamMux().start(("127.0.0.1", 0))
+        try:
+            _, upstream = await pool.query_async(mux, query("www.example.org"))
+            assert upstream.address == fast.address
+            await asyncio.sleep(0.3)
+            assert not mux.pending
+        finally:
+            mux.shutdown()
+
+    asyncio.run(run())
+    primary = pool.upstreams[0]
+    assert primary.lost_races == 1 and primary.timeouts == 0 and primary.fails == 0
+
+
+def test_no_hedge_when_primary_answers_in_time(stubs):
+    first, second = stubs(), stubs()
+    pool = UpstreamPool([first.address, second.address], timeout=1.0, hedge_initial=0.5)
+    _, upstream = pool.query(query("www.example.org"))
+    assert upstream.address == first.address
+    assert pool.hedged == 0 and second.received == 0
+
+
+def test_timeouts_eject_after_max_fails(stubs):
+    dead = stubs(None)
+    pool = UpstreamPool([dead.address], timeout=0.1, max_fails=2, eject_seconds=30)
+    upstream = pool.upstreams[0]
+    for _ in range(2):
+        with pytest.raises(socket.timeout):
+            pool.query(query("www.example.org"))
+    assert upstream.timeouts == 2
+    assert not upstream.healthy(time.monotonic())
+    assert upstream.retry_at > time.monotonic() + 25
+
+
+def test_ejected_upstream_is_skipped_and_retried_later(stubs):
+    dead, alive = stubs(None), stubs()
+    pool = UpstreamPool([dead.address, alive.address], timeout=0.3, max_fails=2,
+                        eject_seconds=30, hedge_initial=0.1)
+    ejected = pool.upstreams[0]
+    for _ in range(2):
+        ejected.failure(0.1, time.monotonic())
+
+    _, upstream = pool.query(query("www.example.org"))
+    assert upstream.address == alive.address
+    assert dead.received == 0 and pool.hedged == 0
+
+    # Wartezeit vorbei: genau eine Anfrage testet den ausgesperrten Server, der gesunde springt ein
+    ejected.retry_at = time.monotonic()
+    _, upstream = pool.query(query("www.example.org"))
+    assert upstream.address == alive.address
+    assert dead.received == 1 and pool.hedged == 1
+    # Auch die Probe bleibt unbeantwortet: wieder ausgesperrt, mit doppelter Wartezeit
+    time.sleep(0.4)
+    assert ejected.timeouts == 3 and ejected.lost_races == 0
+    assert ejected.retry_at > time.monotonic() + 55
+
+
+class LowercaseStub(StubUpstream):
+    """ Schickt die Frage kleingeschrieben zurück, wie ein gefälschtes Paket ohne 0x20-Kenntnis. """
+    def _answer(self, data, client):
+        end = len(data)
+        self.sock.sendto(data[:2] + b"\x81\x80" + data[4:12] + data[12:end].lower(), client)
+
+
+def test_question_case_is_randomized_and_restored(stubs):
+    seen = []
+    stub = stubs()
+    answer = stub._answer
+
+    def record(data, client):
+        seen.append(data[12:])
+        answer(data, client)
+    stub._answer = record
+    pool = UpstreamPool([stub.address], timeout=1.0)
+    packet = query("www.some-long-example-name.org")
+    for _ in range(5):
+        reply, _ = pool.query(packet)
+        # Der Client bekommt seine eigene Schreibweise zurück
+        assert reply[12:] == packet[12:]
+    assert all(question.lower() == packet[12:] for question in seen)
+    assert any(question != packet[12:] for question in seen)
+
+
+def test_answer_with_wrong_question_case_is_ignored():
+    stub = LowercaseStub()
+    try:
+        pool = UpstreamPool([stub.address], timeout=0.3)
+        with pytest.raises(socket.timeout):
+            pool.query(query("www.some-long-example-name.org"))
+        plain = UpstreamPool([stub.address], timeout=0.3, case_randomization=False)
+        reply, _ = plain.query(query("www.some-long-example-name.org"))
+        assert reply[3] & 0x0F == 0
+    finally:
+        stub.close()
+
+
+def test_mux_only_accepts_answers_on_the_socket_that_asked():
+    async def run():
+        mux = await UpstreamMux(sockets=4, rotate_seconds=0).start(("127.0.0.1", 0))
+        try:
+            assert len({sock.transport.get_extra_info("sockname")[1] for sock in mux.sockets}) == 4
+            server = ("127.0.0.1", 53)
+            txid, future = mux.open({server: None}, b"question")
+            asked = mux.pending[txid][2]
+            other = next(sock for sock in mux.sockets if sock is not asked)
+            forged = txid.to_bytes(2, "big") + bytes(10) + b"question"
+            mux.received(other, forged, server)
+            mux.received(asked, forged[:12] + b"QUESTION", server)
+            mux.received(asked, forged, ("127.0.0.2", 53))
+            assert not future.done()
+            mux.received(asked, forged, server)
+            assert future.result() == (forged, server)
+        finally:
+            mux.shutdown()
+
+    asyncio.run(run())
+
+
+def test_mux_rotates_its_sockets():
+    async def run():
+        mux = await UpstreamMux(sockets=2, rotate_seconds=0.05).start(("127.0.0.1", 0))
+        try:
+            first = list(mux.sockets)
+            await asyncio.sleep(0.15)
+            assert len(mux.sockets) == 2
+            assert not set(first) & set(mux.sockets)
+        finally:
+            mux.shutdown()
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+import struct
+
+import pytest
+from dnslib import DNSRecord
+
+from packets import query
+from wire import BlockTemplates, edns_options, parse_question
+
+
+def test_parse_question_reads_name_type_and_end():
+    packet = query("WWW.Example.ORG", qtype=28, txid=0xBEEF)
+    question = parse_question(packet)
+    assert question.txid == 0xBEEF
+    assert question.qname == "www.example.org"
+    assert (question.qtype, question.qclass) == (28, 1)
+    assert question.end == len(packet)
+
+
+def test_parse_question_ignores_opt_record():
+    packet = query("example.org", udp_size=4096)
+    question = parse_question(packet)
+    assert question.qname == "example.org"
+    assert question.end == len(packet) - 11
+
+
+@pytest.mark.parametrize("packet", [
+    b"\x12\x34",                                                       # kürzer als der Header
+    query("example.org")[:-3],                                         # Frage abgeschnitten
+    b"\x12\x34\x81\x80" + query("example.org")[4:],                    # Antwort statt Anfrage
+    b"\x12\x34\x28\x00" + query("example.org")[4:],                    # Opcode UPDATE
+    query("example.org")[:4] + b"\x00\x02" + query("example.org")[6:],  # zwei Fragen
+])
+def test_parse_question_rejects_unusual_packets(packet):
+    assert parse_question(packet) is None
+
+
+def test_edns_options():
+    plain = query("example.org")
+    assert edns_options(plain, parse_question(plain)) == (False, False, 512)
+    signed = query("example.org", udp_size=1232, do=True)
+    assert edns_options(signed, parse_question(signed)) == (True, True, 1232)
+    tiny = query("example.org", udp_size=100)
+    assert edns_options(tiny, parse_question(tiny)) == (True, False, 512)
+
+
+def test_block_templates_null_mode():
+    templates = BlockTemplates("null", ttl=60)
+    for qtype, address in ((1, "0.0.0.0"), (28, "::")):
+        packet = query("Ads.Example.com", qtype=qtype, txid=0x4242)
+        record = DNSRecord.parse(templates.response(packet, parse_question(packet)))
+        assert record.header.id == 0x4242
+        assert record.header.rcode == 0
+        assert str(record.q.qname) == "Ads.Example.com."
+        assert [(str(rr.rdata), rr.ttl) for rr in record.rr] == [(address, 60)]
+
+    # Andere Typen (z.B. HTTPS) bekommen eine leere Antwort
+    packet = query("ads.example.com", qtype=65)
+    record = DNSRecord.parse(templates.response(packet, parse_question(packet)))
+    assert record.header.rcode == 0 and not record.rr
+
+
+@pytest.mark.parametrize("mode, rcode", [("nxdomain", 3), ("nodata", 0)])
+def test_block_templates_empty_modes(mode, rcode):
+    packet = query("ads.example.com")
+    response = BlockTemplates(mode).response(packet, parse_question(packet))
+    _, flags, qdcount, ancount = struct.unpack_from("!HHHH", response)
+    assert flags & 0x8000 and flags & 0x000F == rcode
+    assert (qdcount, ancount) == (1, 0)
+    assert response[12:] == packet[12:]
+
+
+def test_block_templates_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        BlockTemplates("sinkhole")
+
+
+def test_randomize_case_only_flips_letters():
+    from wire import question_end, randomize_case
+    packet = query("a1-b2.Example.ORG", udp_size=1232)
+    end = question_end(packet)
+    assert end == parse_question(packet).end
+    variants = {randomize_case(packet, end) for _ in range(50)}
+    assert len(variants) > 1
+    for wire in variants:
+        assert wire[:12] == packet[:12] and wire[end:] == packet[end:]
+        assert wire[12:end].lower() == packet[12:end].lower()